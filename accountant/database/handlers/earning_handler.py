@@ -1,11 +1,23 @@
 import logging
 from uuid import UUID
 
-from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy import delete, insert, select, update
 
 import accountant.schemas.earning_schemas as schemas
+from accountant.database.handlers.rollup_handler import (
+    apply_rollup_deltas,
+    rollup_delta,
+)
 from accountant.database.orms.earnings_orm import Earning as EarningDB
+from accountant.database.orms.earnings_orm import EarningRollup as EarningRollupDB
 from accountant.root.database import async_session
+from accountant.services.service_utils.dashboard_utils import build_dashboard
+from accountant.root.utils.abstract_schema import CountMode
+from accountant.services.service_utils.pagination_utils import (
+    DEFAULT_PAGE_SIZE,
+    fetch_page,
+    forget_counts,
+)
 from accountant.services.service_utils.accountant_exceptions import (
     DeleteError,
     NotFoundError,
@@ -31,7 +43,14 @@ async def create_earning(earnings: list[schemas.EarningExtended]):
             await session.rollback()
             return schemas.PaginatedEarningProfile()
 
+        await apply_rollup_deltas(
+            session=session,
+            rollup=EarningRollupDB,
+            deltas=[rollup_delta(row=x) for x in result],
+        )
+
         await session.commit()
+        await forget_counts(*{f"earnings-{x.user_uid}" for x in result})
 
         return schemas.PaginatedEarningProfile(
             result_set=[schemas.EarningProfile(**x.as_dict()) for x in result],
@@ -39,28 +58,32 @@ async def create_earning(earnings: list[schemas.EarningExtended]):
         )
 
 
-async def get_earnings(user_uid: UUID, **kwargs):
+async def get_earnings(
+    user_uid: UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after=None,
+    count_mode: CountMode = CountMode.exact,
+):
 
     async with async_session() as session:
-        stmt = select(EarningDB).filter(EarningDB.user_uid == user_uid)
-
-        result = (await session.execute(statement=stmt)).scalars().all()
-
-        if not result:
-
-            return schemas.PaginatedEarningProfile()
-
-        result_size = (
-            await session.execute(
-                statement=select(func.count(EarningDB.user_uid)).filter(
-                    EarningDB.user_uid == user_uid
-                )
-            )
-        ).scalar()
+        result, next_cursor, result_size = await fetch_page(
+            session=session,
+            stmt=select(EarningDB).filter(EarningDB.user_uid == user_uid),
+            total_stmt=select(EarningDB.earning_uid).filter(
+                EarningDB.user_uid == user_uid
+            ),
+            created_column=EarningDB.date_created_utc,
+            uid_column=EarningDB.earning_uid,
+            limit=limit,
+            after=after,
+            count_mode=count_mode,
+            count_key=f"earnings-{user_uid}",
+        )
 
         return schemas.PaginatedEarningProfile(
             result_set=[schemas.EarningProfile(**x.as_dict()) for x in result],
             result_size=result_size,
+            next_cursor=next_cursor,
         )
 
 
@@ -80,33 +103,77 @@ async def get_earning(user_uid: UUID, earning_uid: UUID):
         return schemas.EarningProfile(**result.as_dict())
 
 
-async def update_earning(earning_uid: UUID, earn_update: schemas.EarningUpdate):
+async def update_earning(
+    user_uid: UUID, earning_uid: UUID, earn_update: schemas.EarningUpdate
+):
     async with async_session() as session:
+        # The row is locked and read as it was before the update in the same
+        # statement, so the rollup can back out the old values.
+        previous = (
+            select(
+                EarningDB.earning_uid,
+                EarningDB.currency,
+                EarningDB.year,
+                EarningDB.month,
+                EarningDB.amount,
+            )
+            .filter(
+                EarningDB.earning_uid == earning_uid, EarningDB.user_uid == user_uid
+            )
+            .with_for_update()
+            .subquery("previous")
+        )
+
         stmt = (
             update(EarningDB)
-            .filter(EarningDB.earning_uid == earning_uid)
+            .filter(EarningDB.earning_uid == previous.c.earning_uid)
             .values(**earn_update.model_dump(exclude_none=True))
-            .returning(EarningDB)
+            .returning(
+                EarningDB,
+                previous.c.currency.label("previous_currency"),
+                previous.c.year.label("previous_year"),
+                previous.c.month.label("previous_month"),
+                previous.c.amount.label("previous_amount"),
+            )
+            .execution_options(synchronize_session=False)
         )
 
-        result = (await session.execute(statement=stmt)).scalar_one_or_none()
+        row = (await session.execute(statement=stmt)).one_or_none()
 
-        if result is None:
+        if row is None:
 
             await session.rollback()
             raise UpdateError
 
+        result = row[0]
+        previous_delta = (
+            user_uid,
+            row.previous_currency,
+            row.previous_year,
+            row.previous_month,
+            -row.previous_amount,
+            -1,
+        )
+
+        await apply_rollup_deltas(
+            session=session,
+            rollup=EarningRollupDB,
+            deltas=[previous_delta, rollup_delta(row=result)],
+        )
+
         await session.commit()
 
         return schemas.EarningProfile(**result.as_dict())
 
 
-async def delete_earning(earning_uid: UUID):
+async def delete_earning(user_uid: UUID, earning_uid: UUID):
 
     async with async_session() as session:
         stmt = (
             delete(EarningDB)
-            .filter(EarningDB.earning_uid == earning_uid)
+            .filter(
+                EarningDB.earning_uid == earning_uid, EarningDB.user_uid == user_uid
+            )
             .returning(EarningDB)
         )
 
@@ -117,7 +184,14 @@ async def delete_earning(earning_uid: UUID):
             await session.rollback()
             raise DeleteError
 
+        await apply_rollup_deltas(
+            session=session,
+            rollup=EarningRollupDB,
+            deltas=[rollup_delta(row=result, sign=-1)],
+        )
+
         await session.commit()
+        await forget_counts(f"earnings-{user_uid}")
 
         return schemas.EarningProfile(**result.as_dict())
 
@@ -126,53 +200,21 @@ async def earning_dashboard(user_uid: UUID, **kwargs):
     async with async_session() as session:
 
         summary_stmt = (
-            select(EarningDB)
+            select(
+                EarningRollupDB.currency,
+                EarningRollupDB.year,
+                EarningRollupDB.month,
+                EarningRollupDB.amount,
+            )
             .filter(
-                EarningDB.user_uid == user_uid,
+                EarningRollupDB.user_uid == user_uid,
+                EarningRollupDB.entry_count > 0,
             )
-            .order_by(EarningDB.year.asc())
+            .order_by(EarningRollupDB.year.asc())
         )
 
-        summary_result = (await session.execute(statement=summary_stmt)).scalars().all()
+        summary_result = (await session.execute(statement=summary_stmt)).all()
 
-    summary = {}
-    year_trend = {}
+    summary, year_trend = build_dashboard(rows=summary_result)
 
-    for row in summary_result:
-        amount, month, year, currency = row.amount, row.month, row.year, row.currency
-        if currency not in summary:
-            summary[currency] = {year: amount}
-
-        elif currency in summary:
-            if summary[currency].get(year) is None:
-                summary[currency] = {year: amount}
-            else:
-                summary[currency][year] += amount
-
-        if year not in year_trend:
-            year_trend = {
-                year: {currency: {month: {"amount": amount, "percentage_change": 0}}}
-            }
-
-        elif year in year_trend:
-            if year_trend[year].get(currency) is None:
-
-                year_trend[year][currency] = {
-                    month: {
-                        "amount": amount,
-                    }
-                }
-
-            elif year_trend[year].get(currency):
-                if year_trend[year][currency].get(month):
-
-                    year_trend[year][currency][month]["amount"] += amount
-
-                else:
-
-                    year_trend[year][currency][month] = {
-                        "amount": amount,
-                    }
-
-    return schemas.EarningDashBoard(summary=summary, yearly_chart=year_trend)
     return schemas.EarningDashBoard(summary=summary, yearly_chart=year_trend)
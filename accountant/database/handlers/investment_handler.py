@@ -1,7 +1,10 @@
-from uuid import UUID
+from datetime import datetime
+from uuid import UUID, uuid4
 
-from sqlalchemy import delete, func, insert, select, update
-from sqlalchemy.orm import joinedload
+from sqlalchemy import cast, delete, exists, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
 
 import accountant.schemas.investment_schemas as schemas
 from accountant.database.orms.investments_orm import Investment as InvestmentDB
@@ -10,39 +13,57 @@ from accountant.database.orms.investments_orm import (
 )
 from accountant.database.orms.investments_orm import Platform as PlatformDB
 from accountant.root.database import async_session
+from accountant.services.service_utils.dashboard_utils import (
+    build_investment_dashboard,
+)
 from accountant.services.service_utils.accountant_exceptions import (
     CreateError,
     DeleteError,
     NotFoundError,
     UpdateError,
 )
+from accountant.root.utils.abstract_schema import CountMode
+from accountant.services.service_utils.pagination_utils import (
+    DEFAULT_PAGE_SIZE,
+    fetch_page,
+    forget_counts,
+)
+
+
+def select_values(model, columns: dict):
+    # Cast, as bare parameters in a select list are typed as text.
+    return [
+        cast(value, model.__table__.c[name].type) for name, value in columns.items()
+    ]
 
 
-async def check_platform(name: str, user_group_uid: UUID):
+async def check_platform_owner(user_group_uid: UUID, platform_uid: UUID):
 
     async with async_session() as session:
 
-        stmt = select(PlatformDB).filter(
-            PlatformDB.user_group_uid == user_group_uid,
-            PlatformDB.name == name,
+        stmt = select(
+            exists().where(
+                PlatformDB.platform_uid == platform_uid,
+                PlatformDB.user_group_uid == user_group_uid,
+            )
         )
 
-        result = (await session.execute(statement=stmt)).scalar_one_or_none()
-
-        if result is None:
+        if not await session.scalar(statement=stmt):
 
             raise NotFoundError
 
-        return schemas.PlatformProfile(**result.as_dict())
-
 
 async def create_platform_record(user_group_uid: UUID, platform: schemas.Platform):
 
     async with async_session() as session:
 
+        # A name the group already uses comes back as no row.
         stmt = (
-            insert(PlatformDB)
+            pg_insert(PlatformDB)
             .values(**platform.model_dump(), user_group_uid=user_group_uid)
+            .on_conflict_do_nothing(
+                index_elements=[PlatformDB.user_group_uid, PlatformDB.name]
+            )
             .returning(PlatformDB)
         )
 
@@ -98,6 +119,42 @@ async def get_platforms(user_group_uid: UUID):
         )
 
 
+async def investment_dashboard(user_group_uid: UUID):
+
+    async with async_session() as session:
+
+        stmt = (
+            select(
+                PlatformDB.name,
+                InvestmentTrackerDB.currency,
+                func.sum(InvestmentTrackerDB.amount).filter(
+                    InvestmentTrackerDB.transaction_type
+                    == schemas.TransactionType.credit.value
+                ),
+                func.sum(InvestmentTrackerDB.amount).filter(
+                    InvestmentTrackerDB.transaction_type
+                    == schemas.TransactionType.debit.value
+                ),
+            )
+            .select_from(PlatformDB)
+            .outerjoin(
+                InvestmentDB, InvestmentDB.platform_uid == PlatformDB.platform_uid
+            )
+            .outerjoin(
+                InvestmentTrackerDB,
+                InvestmentTrackerDB.investment_uid == InvestmentDB.investment_uid,
+            )
+            .filter(PlatformDB.user_group_uid == user_group_uid)
+            .group_by(
+                PlatformDB.platform_uid, PlatformDB.name, InvestmentTrackerDB.currency
+            )
+        )
+
+        result = (await session.execute(statement=stmt)).all()
+
+    return schemas.InvestmentDashboard(result=build_investment_dashboard(rows=result))
+
+
 async def get_platform(user_group_uid: UUID, platform_uid: UUID):
 
     async with async_session() as session:
@@ -128,7 +185,9 @@ async def get_platform(user_group_uid: UUID, platform_uid: UUID):
         )
 
 
-async def update_platform(platform_uid: UUID, platform_update: schemas.PlatformUpdate):
+async def update_platform(
+    user_group_uid: UUID, platform_uid: UUID, platform_update: schemas.PlatformUpdate
+):
 
     async with async_session() as session:
 
@@ -136,28 +195,35 @@ async def update_platform(platform_uid: UUID, platform_update: schemas.PlatformU
             update(PlatformDB)
             .filter(
                 PlatformDB.platform_uid == platform_uid,
+                PlatformDB.user_group_uid == user_group_uid,
             )
             .values(**platform_update.model_dump(exclude_none=True))
             .returning(PlatformDB)
         )
 
-        result = (await session.execute(statement=stmt)).scalar_one_or_none()
+        try:
+            result = (await session.execute(statement=stmt)).scalar_one_or_none()
+        except IntegrityError:
+            # The new name is already one of the group's platforms.
+            await session.rollback()
+            raise UpdateError
 
         if result is None:
             await session.rollback()
-            raise UpdateError
+            raise NotFoundError
 
         await session.commit()
         return schemas.PlatformProfile(**result.as_dict())
 
 
-async def delete_platform(platform_uid: UUID):
+async def delete_platform(user_group_uid: UUID, platform_uid: UUID):
     async with async_session() as session:
 
         stmt = (
             delete(PlatformDB)
             .filter(
                 PlatformDB.platform_uid == platform_uid,
+                PlatformDB.user_group_uid == user_group_uid,
             )
             .returning(PlatformDB)
         )
@@ -175,35 +241,31 @@ async def delete_platform(platform_uid: UUID):
 ################################ Investment #################################
 
 
-async def check_investment(platform_uid: UUID, user_group_uid: UUID, plan_name: str):
-
-    async with async_session() as session:
-        stmt = select(InvestmentDB).filter(
-            InvestmentDB.user_group_uid == user_group_uid,
-            InvestmentDB.platform_uid == platform_uid,
-            InvestmentDB.plan_name == plan_name,
-        )
-
-        result = (await session.execute(statement=stmt)).scalar_one_or_none()
-
-        if result is None:
-
-            raise NotFoundError
-
-        return schemas.InvestmentProfile(**result.as_dict())
-
-
 async def create_investment(
     platform_uid: UUID, user_group_uid: UUID, investment: schemas.Investment
 ):
     async with async_session() as session:
 
+        # Insert from the owning platform, so a foreign platform and a plan name
+        # already on it both come back as no row, in one round trip.
+        columns = {
+            **investment.model_dump(),
+            "investment_uid": uuid4(),
+            "date_created_utc": datetime.utcnow(),
+        }
+        source = select(
+            *select_values(model=InvestmentDB, columns=columns),
+            PlatformDB.platform_uid,
+            PlatformDB.user_group_uid,
+        ).filter(
+            PlatformDB.platform_uid == platform_uid,
+            PlatformDB.user_group_uid == user_group_uid,
+        )
         stmt = (
-            insert(InvestmentDB)
-            .values(
-                user_group_uid=user_group_uid,
-                platform_uid=platform_uid,
-                **investment.model_dump(),
+            pg_insert(InvestmentDB)
+            .from_select([*columns, "platform_uid", "user_group_uid"], source)
+            .on_conflict_do_nothing(
+                index_elements=[InvestmentDB.platform_uid, InvestmentDB.plan_name]
             )
             .returning(InvestmentDB)
         )
@@ -217,39 +279,43 @@ async def create_investment(
             raise CreateError
 
         await session.commit()
+        await forget_counts(f"investments-{platform_uid}")
+
         return schemas.InvestmentProfile(**result.as_dict())
 
 
-async def get_investments(platform_uid: UUID):
+async def get_investments(
+    platform_uid: UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after=None,
+    count_mode: CountMode = CountMode.exact,
+):
 
     async with async_session() as session:
 
-        stmt = (
-            select(InvestmentDB)
-            .options(joinedload(InvestmentDB.trackers))
-            .filter(InvestmentDB.platform_uid == platform_uid)
+        result, next_cursor, result_size = await fetch_page(
+            session=session,
+            stmt=select(InvestmentDB)
+            .options(selectinload(InvestmentDB.trackers))
+            .filter(InvestmentDB.platform_uid == platform_uid),
+            total_stmt=select(InvestmentDB.investment_uid).filter(
+                InvestmentDB.platform_uid == platform_uid
+            ),
+            created_column=InvestmentDB.date_created_utc,
+            uid_column=InvestmentDB.investment_uid,
+            limit=limit,
+            after=after,
+            count_mode=count_mode,
+            count_key=f"investments-{platform_uid}",
         )
 
-        result = (await session.execute(statement=stmt)).unique().scalars().all()
-
-        if not result:
-
-            return schemas.PaginatedInvestmentProfile()
-
-        result_size = (
-            await session.execute(
-                statement=select(func.count(InvestmentDB.platform_uid)).filter(
-                    InvestmentDB.platform_uid == platform_uid
-                )
-            )
-        ).scalar()
-
         return schemas.PaginatedInvestmentProfile(
             result_set=[
                 schemas.InvestmentProfile(**x.as_dict(), activities=x.trackers)
                 for x in result
             ],
             result_size=result_size,
+            next_cursor=next_cursor,
         )
 
 
@@ -299,40 +365,60 @@ async def get_investment(platform_uid: UUID, investment_uid: UUID):
 
 
 async def update_investment(
-    investment_uid: UUID, investment_update: schemas.InvestmentUpdate
+    user_group_uid: UUID,
+    platform_uid: UUID,
+    investment_uid: UUID,
+    investment_update: schemas.InvestmentUpdate,
 ):
 
     async with async_session() as session:
 
+        # Ownership is the platform's; investment.user_group_uid is only a copy.
         stmt = (
             update(InvestmentDB)
-            .filter(InvestmentDB.investment_uid == investment_uid)
+            .filter(
+                InvestmentDB.investment_uid == investment_uid,
+                InvestmentDB.platform_uid == platform_uid,
+                PlatformDB.platform_uid == InvestmentDB.platform_uid,
+                PlatformDB.user_group_uid == user_group_uid,
+            )
             .values(**investment_update.model_dump(exclude_none=True))
             .returning(InvestmentDB)
+            .execution_options(synchronize_session=False)
         )
 
-        result = (await session.execute(statement=stmt)).scalar_one_or_none()
+        try:
+            result = (await session.execute(statement=stmt)).scalar_one_or_none()
+        except IntegrityError:
+            # The new plan name is already on this platform.
+            await session.rollback()
+            raise UpdateError
 
         if result is None:
 
             await session.rollback()
-            raise UpdateError
+            raise NotFoundError
 
         await session.commit()
 
         return schemas.InvestmentProfile(**result.as_dict())
 
 
-async def delete_investment(investment_uid: UUID, user_group_uid: UUID):
+async def delete_investment(
+    user_group_uid: UUID, platform_uid: UUID, investment_uid: UUID
+):
     async with async_session() as session:
 
         stmt = (
             delete(InvestmentDB)
             .filter(
                 InvestmentDB.investment_uid == investment_uid,
-                InvestmentDB.user_group_uid == user_group_uid,
+                InvestmentDB.platform_uid == platform_uid,
+                PlatformDB.platform_uid == InvestmentDB.platform_uid,
+                PlatformDB.user_group_uid == user_group_uid,
             )
             .returning(InvestmentDB)
+            .execution_options(synchronize_session=False)
         )
 
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
@@ -343,6 +429,7 @@ async def delete_investment(investment_uid: UUID, user_group_uid: UUID):
             raise DeleteError
 
         await session.commit()
+        await forget_counts(f"investments-{platform_uid}")
 
         return schemas.InvestmentProfile(**result.as_dict())
 
@@ -351,16 +438,36 @@ async def delete_investment(investment_uid: UUID, user_group_uid: UUID):
 
 
 async def create_investment_tracker(
-    investment_uid: UUID, investment_tracker: schemas.InvestmentTracker
+    user_group_uid: UUID,
+    platform_uid: UUID,
+    investment_uid: UUID,
+    investment_tracker: schemas.InvestmentTracker,
 ):
 
     async with async_session() as session:
+        # Insert from the owning investment so the ownership check and the
+        # user_group_uid copy come from the same row as the write.
+        columns = {
+            **investment_tracker.model_dump(),
+            "uid": uuid4(),
+            "date_created_utc": datetime.utcnow(),
+        }
+        source = (
+            select(
+                *select_values(model=InvestmentTrackerDB, columns=columns),
+                InvestmentDB.investment_uid,
+                PlatformDB.user_group_uid,
+            )
+            .join(PlatformDB, PlatformDB.platform_uid == InvestmentDB.platform_uid)
+            .filter(
+                InvestmentDB.investment_uid == investment_uid,
+                InvestmentDB.platform_uid == platform_uid,
+                PlatformDB.user_group_uid == user_group_uid,
+            )
+        )
         stmt = (
             insert(InvestmentTrackerDB)
-            .values(
-                **investment_tracker.model_dump(),
-                investment_uid=investment_uid,
-            )
+            .from_select([*columns, "investment_uid", "user_group_uid"], source)
             .returning(InvestmentTrackerDB)
         )
 
@@ -370,47 +477,66 @@ async def create_investment_tracker(
 
             await session.rollback()
 
-            raise CreateError
+            raise NotFoundError
 
         await session.commit()
+        await forget_counts(f"investment-trackers-{investment_uid}")
+
         return schemas.InvestmentTrackerProfile(**result.as_dict())
 
 
-async def get_investment_trackers(investment_uid: UUID):
+async def get_investment_trackers(
+    user_group_uid: UUID,
+    platform_uid: UUID,
+    investment_uid: UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after=None,
+    count_mode: CountMode = CountMode.exact,
+):
 
     async with async_session() as session:
 
-        stmt = select(InvestmentTrackerDB).filter(
-            InvestmentTrackerDB.investment_uid == investment_uid
+        result, next_cursor, result_size = await fetch_page(
+            session=session,
+            stmt=select(InvestmentTrackerDB).filter(
+                InvestmentTrackerDB.investment_uid == investment_uid,
+                InvestmentTrackerDB.user_group_uid == user_group_uid,
+            ),
+            total_stmt=select(InvestmentTrackerDB.uid).filter(
+                InvestmentTrackerDB.investment_uid == investment_uid,
+                InvestmentTrackerDB.user_group_uid == user_group_uid,
+            ),
+            created_column=InvestmentTrackerDB.date_created_utc,
+            uid_column=InvestmentTrackerDB.uid,
+            limit=limit,
+            after=after,
+            count_mode=count_mode,
+            count_key=f"investment-trackers-{investment_uid}",
+            # The investment must sit on this platform, and the platform must
+            # be the group's; otherwise NotFoundError, not an empty page.
+            scope=exists().where(
+                InvestmentDB.investment_uid == investment_uid,
+                InvestmentDB.platform_uid == platform_uid,
+                PlatformDB.platform_uid == platform_uid,
+                PlatformDB.user_group_uid == user_group_uid,
+            ),
         )
 
-        result = (await session.execute(statement=stmt)).scalars().all()
-
-        if not result:
-
-            return schemas.PaginatedInvestmentTrackerProfile()
-
-        result_size = (
-            await session.execute(
-                statement=select(func.count(InvestmentTrackerDB.investment_uid)).filter(
-                    InvestmentTrackerDB.investment_uid == investment_uid
-                )
-            )
-        ).scalar()
-
         return schemas.PaginatedInvestmentTrackerProfile(
             result_set=[
                 schemas.InvestmentTrackerProfile(**x.as_dict()) for x in result
             ],
             result_size=result_size,
+            next_cursor=next_cursor,
         )
 
 
-async def get_investment_tracker(investment_uid: UUID, uid: UUID):
+async def get_investment_tracker(user_group_uid: UUID, investment_uid: UUID, uid: UUID):
     async with async_session() as session:
         stmt = select(InvestmentTrackerDB).filter(
             InvestmentTrackerDB.investment_uid == investment_uid,
             InvestmentTrackerDB.uid == uid,
+            InvestmentTrackerDB.user_group_uid == user_group_uid,
         )
 
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
@@ -422,13 +548,20 @@ async def get_investment_tracker(investment_uid: UUID, uid: UUID):
 
 
 async def update_investment_tracker(
-    uid: UUID, investment_tracker_update: schemas.InvestmentTrackerUpdate
+    user_group_uid: UUID,
+    investment_uid: UUID,
+    uid: UUID,
+    investment_tracker_update: schemas.InvestmentTrackerUpdate,
 ):
 
     async with async_session() as session:
         stmt = (
             update(InvestmentTrackerDB)
-            .filter(InvestmentTrackerDB.uid == uid)
+            .filter(
+                InvestmentTrackerDB.uid == uid,
+                InvestmentTrackerDB.investment_uid == investment_uid,
+                InvestmentTrackerDB.user_group_uid == user_group_uid,
+            )
             .values(**investment_tracker_update.model_dump(exclude_none=True))
             .returning(InvestmentTrackerDB)
         )
@@ -444,12 +577,18 @@ async def update_investment_tracker(
         return schemas.InvestmentTrackerProfile(**result.as_dict())
 
 
-async def delete_investment_tracker(uid: UUID):
+async def delete_investment_tracker(
+    user_group_uid: UUID, investment_uid: UUID, uid: UUID
+):
 
     async with async_session() as session:
         stmt = (
             delete(InvestmentTrackerDB)
-            .filter(InvestmentTrackerDB.uid == uid)
+            .filter(
+                InvestmentTrackerDB.uid == uid,
+                InvestmentTrackerDB.investment_uid == investment_uid,
+                InvestmentTrackerDB.user_group_uid == user_group_uid,
+            )
             .returning(InvestmentTrackerDB)
         )
 
@@ -460,6 +599,7 @@ async def delete_investment_tracker(uid: UUID):
             raise DeleteError
 
         await session.commit()
+        await forget_counts(f"investment-trackers-{investment_uid}")
 
         return schemas.InvestmentTrackerProfile(**result.as_dict())
         return schemas.InvestmentTrackerProfile(**result.as_dict())
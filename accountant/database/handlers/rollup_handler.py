@@ -0,0 +1,222 @@
+import hashlib
+import logging
+from datetime import datetime
+
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from accountant.root.database import async_session
+
+LOGGER = logging.getLogger(__name__)
+
+
+def rollup_delta(row, sign: int = 1):
+    return (
+        row.user_uid,
+        row.currency,
+        row.year,
+        row.month,
+        sign * row.amount,
+        sign,
+    )
+
+
+def rollup_lock_key(rollup, user_uid) -> int:
+    digest = hashlib.blake2b(
+        f"{rollup.__tablename__}:{user_uid}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+async def lock_rollup_owners(session, rollup, user_uids, shared: bool = True):
+    """Take the owners' rollup advisory locks until the transaction ends.
+
+    Writers share the lock; a rebuild takes it exclusively, so it waits for
+    in-flight deltas to commit and holds new ones off until it has committed.
+    Keys are taken in order so two lockers cannot deadlock on each other.
+    """
+
+    lock = func.pg_advisory_xact_lock_shared if shared else func.pg_advisory_xact_lock
+    keys = sorted({rollup_lock_key(rollup, user_uid) for user_uid in user_uids})
+
+    if keys:
+        await session.execute(statement=select(*[lock(key) for key in keys]))
+
+
+async def apply_rollup_deltas(session, rollup, deltas):
+    """Add (user_uid, currency, year, month, amount, count) deltas to a rollup table.
+
+    Runs on the caller's session so the rollup moves in the same transaction as
+    the base rows.
+    """
+
+    totals = {}
+    for user_uid, currency, year, month, amount, count in deltas:
+        key = (user_uid, currency, year, month)
+        total_amount, total_count = totals.get(key, (0, 0))
+        totals[key] = (total_amount + amount, total_count + count)
+
+    # ON CONFLICT cannot touch the same row twice, so keys are folded above.
+    values = [
+        {
+            "user_uid": user_uid,
+            "currency": currency,
+            "year": year,
+            "month": month,
+            "amount": amount,
+            "entry_count": count,
+        }
+        for (user_uid, currency, year, month), (amount, count) in totals.items()
+        if amount != 0 or count != 0
+    ]
+
+    if not values:
+        return
+
+    await lock_rollup_owners(
+        session=session, rollup=rollup, user_uids=[row["user_uid"] for row in values]
+    )
+
+    stmt = pg_insert(rollup).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[rollup.user_uid, rollup.currency, rollup.year, rollup.month],
+        set_={
+            "amount": rollup.amount + stmt.excluded.amount,
+            "entry_count": rollup.entry_count + stmt.excluded.entry_count,
+            "date_updated_utc": datetime.utcnow(),
+        },
+    )
+
+    await session.execute(statement=stmt)
+
+
+def aggregate_stmt(base, user_uids):
+    return (
+        select(
+            base.user_uid,
+            base.currency,
+            base.year,
+            base.month,
+            func.sum(base.amount).label("amount"),
+            func.count().label("entry_count"),
+        )
+        .filter(base.user_uid.in_(user_uids))
+        .group_by(base.user_uid, base.currency, base.year, base.month)
+    )
+
+
+async def get_rollup_user_chunk(base, rollup, chunk_size: int, after=None):
+
+    def owner_stmt(table):
+        stmt = (
+            select(table.user_uid).distinct().order_by(table.user_uid).limit(chunk_size)
+        )
+        if after is not None:
+            stmt = stmt.filter(table.user_uid > after)
+
+        return stmt.subquery()
+
+    base_owners, rollup_owners = owner_stmt(base), owner_stmt(rollup)
+    owners = (
+        select(base_owners.c.user_uid)
+        .union(select(rollup_owners.c.user_uid))
+        .subquery()
+    )
+
+    stmt = select(owners.c.user_uid).order_by(owners.c.user_uid).limit(chunk_size)
+
+    async with async_session() as session:
+        return (await session.execute(statement=stmt)).scalars().all()
+
+
+async def rebuild_rollup_chunk(base, rollup, user_uids):
+
+    async with async_session() as session:
+        # Without the lock a delta could upsert a row between the delete and
+        # the insert, or commit after the aggregate was read and be lost.
+        await lock_rollup_owners(
+            session=session, rollup=rollup, user_uids=user_uids, shared=False
+        )
+
+        await session.execute(
+            statement=delete(rollup).filter(rollup.user_uid.in_(user_uids))
+        )
+        await session.execute(
+            statement=insert(rollup).from_select(
+                [
+                    rollup.user_uid,
+                    rollup.currency,
+                    rollup.year,
+                    rollup.month,
+                    rollup.amount,
+                    rollup.entry_count,
+                ],
+                aggregate_stmt(base=base, user_uids=user_uids),
+            )
+        )
+
+        await session.commit()
+
+
+async def check_rollup_chunk(base, rollup, user_uids):
+
+    expected = aggregate_stmt(base=base, user_uids=user_uids).subquery("expected")
+    stored = select(rollup).filter(rollup.user_uid.in_(user_uids)).subquery("stored")
+    keys = ["user_uid", "currency", "year", "month"]
+
+    # Rows missing on either side count as zero, so a month whose base rows
+    # are gone is drift unless its rollup row was also brought down to zero.
+    stmt = (
+        select(func.coalesce(stored.c.user_uid, expected.c.user_uid).label("user_uid"))
+        .select_from(
+            stored.join(
+                expected,
+                and_(*[stored.c[key] == expected.c[key] for key in keys]),
+                full=True,
+            )
+        )
+        .filter(
+            or_(
+                func.coalesce(stored.c.amount, 0)
+                != func.coalesce(expected.c.amount, 0),
+                func.coalesce(stored.c.entry_count, 0)
+                != func.coalesce(expected.c.entry_count, 0),
+            )
+        )
+        .distinct()
+        .order_by("user_uid")
+    )
+
+    async with async_session() as session:
+        return (await session.execute(statement=stmt)).scalars().all()
+
+
+async def rebuild_rollup(base, rollup, chunk_size: int = 500, check_only=False):
+    """Recompute a rollup table from its base table, chunk_size owners at a time.
+
+    With check_only the rollup is left untouched and the owners whose stored
+    totals drifted from the base rows are returned instead.
+    """
+
+    drifted = []
+    after = None
+
+    while True:
+        user_uids = await get_rollup_user_chunk(
+            base=base, rollup=rollup, chunk_size=chunk_size, after=after
+        )
+
+        if not user_uids:
+            break
+
+        if check_only:
+            drifted.extend(
+                await check_rollup_chunk(base=base, rollup=rollup, user_uids=user_uids)
+            )
+        else:
+            await rebuild_rollup_chunk(base=base, rollup=rollup, user_uids=user_uids)
+
+        LOGGER.info(f"{rollup.__tablename__}: processed {len(user_uids)} owners")
+        after = user_uids[-1]
+
+    return drifted
@@ -0,0 +1,113 @@
+import hashlib
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from accountant.database.orms.scheduler_orm import ScheduledJobRun as ScheduledJobRunDB
+from accountant.root.database import async_session, engine_connect_args
+from accountant.root.settings import Settings
+
+LOGGER = logging.getLogger(__name__)
+settings = Settings()
+
+RUNNING = "running"
+
+# A session-level advisory lock belongs to the connection that took it, so
+# leadership is held on a connection of its own: outside the request pool,
+# in autocommit so no transaction stays open while a job runs. NullPool
+# closes it on release, and Postgres drops the lock with it, also when the
+# node dies mid-job. A transaction pooler would move the lock between server
+# connections, hence the separate URL for PgBouncer deployments.
+lock_engine = create_async_engine(
+    url=str(settings.scheduler_lock_url or settings.postgres_url),
+    poolclass=NullPool,
+    isolation_level="AUTOCOMMIT",
+    connect_args=engine_connect_args(),
+)
+
+
+def job_lock_key(job_name: str) -> int:
+    # Advisory locks take a bigint; hash() is salted per process, so derive a
+    # key every node agrees on.
+    digest = hashlib.blake2b(job_name.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+async def claim_job_tick(job_name: str, tick: datetime) -> bool:
+    """Record the tick as running and commit, or report it already ran."""
+
+    now = datetime.utcnow()
+
+    async with async_session() as session:
+        stmt = pg_insert(ScheduledJobRunDB).values(
+            job_name=job_name,
+            last_tick_utc=tick,
+            last_status=RUNNING,
+            date_created_utc=now,
+        )
+        claimed = await session.scalar(
+            stmt.on_conflict_do_update(
+                index_elements=[ScheduledJobRunDB.job_name],
+                set_={
+                    "last_tick_utc": tick,
+                    "last_status": RUNNING,
+                    "date_updated_utc": now,
+                },
+                where=ScheduledJobRunDB.last_tick_utc < tick,
+            ).returning(ScheduledJobRunDB.job_name)
+        )
+
+        if claimed is None:
+            await session.rollback()
+            return False
+
+        await session.commit()
+        return True
+
+
+async def finish_job_tick(job_name: str, tick: datetime, status: str):
+    async with async_session() as session:
+        await session.execute(
+            update(ScheduledJobRunDB)
+            .where(
+                ScheduledJobRunDB.job_name == job_name,
+                ScheduledJobRunDB.last_tick_utc == tick,
+            )
+            .values(last_status=status, last_finished_utc=datetime.utcnow())
+        )
+        await session.commit()
+
+
+async def run_job_tick(
+    job_name: str, tick: datetime, run: Callable[[], Awaitable[str]]
+) -> Optional[str]:
+    """Run one scheduled tick of a job on at most one node.
+
+    The node holding the job's advisory lock is its leader for the run, so a
+    slow job never overlaps itself; the run row makes each tick fire once
+    even when nodes reach it at different times. The claim and the status
+    are short transactions of their own, and the pooled connections go back
+    while the job runs. Returns run's status, or None when another node has
+    the job or already ran the tick.
+    """
+
+    async with lock_engine.connect() as connection:
+        locked = await connection.scalar(
+            select(func.pg_try_advisory_lock(job_lock_key(job_name)))
+        )
+        if not locked:
+            return None
+
+        if not await claim_job_tick(job_name=job_name, tick=tick):
+            return None
+
+        status = await run()
+
+        await finish_job_tick(job_name=job_name, tick=tick, status=status)
+
+        return status
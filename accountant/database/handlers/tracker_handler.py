@@ -1,10 +1,22 @@
 from uuid import UUID
 
-from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy import delete, insert, select, update
 
 import accountant.schemas.tracker_schemas as schemas
+from accountant.database.handlers.rollup_handler import (
+    apply_rollup_deltas,
+    rollup_delta,
+)
 from accountant.database.orms.tracker_orm import Tracker as TrackerDB
+from accountant.database.orms.tracker_orm import TrackerRollup as TrackerRollupDB
 from accountant.root.database import async_session
+from accountant.services.service_utils.dashboard_utils import build_dashboard
+from accountant.root.utils.abstract_schema import CountMode
+from accountant.services.service_utils.pagination_utils import (
+    DEFAULT_PAGE_SIZE,
+    fetch_page,
+    forget_counts,
+)
 from accountant.services.service_utils.accountant_exceptions import (
     DeleteError,
     NotFoundError,
@@ -29,7 +41,14 @@ async def create_record(track_set: list[schemas.TrackerExtended]):
 
             return schemas.PaginatedTrackerProfile()
 
+        await apply_rollup_deltas(
+            session=session,
+            rollup=TrackerRollupDB,
+            deltas=[rollup_delta(row=x) for x in result],
+        )
+
         await session.commit()
+        await forget_counts(*{f"trackers-{x.user_uid}" for x in result})
 
         return schemas.PaginatedTrackerProfile(
             result_set=[schemas.TrackerProfile(**x.as_dict()) for x in result],
@@ -37,27 +56,32 @@ async def create_record(track_set: list[schemas.TrackerExtended]):
         )
 
 
-async def get_trackings(user_uid: UUID, **kwargs):
+async def get_trackings(
+    user_uid: UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after=None,
+    count_mode: CountMode = CountMode.exact,
+):
 
     async with async_session() as session:
-        stmt = select(TrackerDB).filter(TrackerDB.user_uid == user_uid)
-
-        result = (await session.execute(statement=stmt)).scalars().all()
-
-        if not result:
-            return schemas.PaginatedTrackerProfile()
-
-        result_size = (
-            await session.execute(
-                statement=select(func.count(TrackerDB.user_uid)).filter(
-                    TrackerDB.user_uid == user_uid
-                )
-            )
-        ).scalar()
+        result, next_cursor, result_size = await fetch_page(
+            session=session,
+            stmt=select(TrackerDB).filter(TrackerDB.user_uid == user_uid),
+            total_stmt=select(TrackerDB.tracker_uid).filter(
+                TrackerDB.user_uid == user_uid
+            ),
+            created_column=TrackerDB.date_created_utc,
+            uid_column=TrackerDB.tracker_uid,
+            limit=limit,
+            after=after,
+            count_mode=count_mode,
+            count_key=f"trackers-{user_uid}",
+        )
 
         return schemas.PaginatedTrackerProfile(
             result_set=[schemas.TrackerProfile(**x.as_dict()) for x in result],
             result_size=result_size,
+            next_cursor=next_cursor,
         )
 
 
@@ -77,32 +101,76 @@ async def get_tracking(user_uid: UUID, tracker_uid: UUID):
         return schemas.TrackerProfile(**result.as_dict())
 
 
-async def update_tracking(tracker_uid: UUID, tracking_update: schemas.TrackerUpdate):
+async def update_tracking(
+    user_uid: UUID, tracker_uid: UUID, tracking_update: schemas.TrackerUpdate
+):
 
     async with async_session() as session:
+        # The row is locked and read as it was before the update in the same
+        # statement, so the rollup can back out the old values.
+        previous = (
+            select(
+                TrackerDB.tracker_uid,
+                TrackerDB.currency,
+                TrackerDB.year,
+                TrackerDB.month,
+                TrackerDB.amount,
+            )
+            .filter(
+                TrackerDB.tracker_uid == tracker_uid, TrackerDB.user_uid == user_uid
+            )
+            .with_for_update()
+            .subquery("previous")
+        )
+
         stmt = (
             update(TrackerDB)
-            .filter(TrackerDB.tracker_uid == tracker_uid)
+            .filter(TrackerDB.tracker_uid == previous.c.tracker_uid)
             .values(tracking_update.model_dump(exclude_none=True))
-            .returning(TrackerDB)
+            .returning(
+                TrackerDB,
+                previous.c.currency.label("previous_currency"),
+                previous.c.year.label("previous_year"),
+                previous.c.month.label("previous_month"),
+                previous.c.amount.label("previous_amount"),
+            )
+            .execution_options(synchronize_session=False)
         )
 
-        result = (await session.execute(statement=stmt)).scalar_one_or_none()
+        row = (await session.execute(statement=stmt)).one_or_none()
 
-        if result is None:
+        if row is None:
             await session.rollback()
             raise UpdateError
 
+        result = row[0]
+        previous_delta = (
+            user_uid,
+            row.previous_currency,
+            row.previous_year,
+            row.previous_month,
+            -row.previous_amount,
+            -1,
+        )
+
+        await apply_rollup_deltas(
+            session=session,
+            rollup=TrackerRollupDB,
+            deltas=[previous_delta, rollup_delta(row=result)],
+        )
+
         await session.commit()
         return schemas.TrackerProfile(**result.as_dict())
 
 
-async def delete_tracking(tracker_uid: UUID):
+async def delete_tracking(user_uid: UUID, tracker_uid: UUID):
 
     async with async_session() as session:
         stmt = (
             delete(TrackerDB)
-            .filter(TrackerDB.tracker_uid == tracker_uid)
+            .filter(
+                TrackerDB.tracker_uid == tracker_uid, TrackerDB.user_uid == user_uid
+            )
             .returning(TrackerDB)
         )
 
@@ -112,59 +180,36 @@ async def delete_tracking(tracker_uid: UUID):
             await session.rollback()
             raise DeleteError
 
+        await apply_rollup_deltas(
+            session=session,
+            rollup=TrackerRollupDB,
+            deltas=[rollup_delta(row=result, sign=-1)],
+        )
+
         await session.commit()
+        await forget_counts(f"trackers-{user_uid}")
         return schemas.TrackerProfile(**result.as_dict())
 
 
 async def tracking_dashboard(user_uid: UUID):
 
     async with async_session() as session:
-        summary_stmt = select(TrackerDB).filter(TrackerDB.user_uid == user_uid)
-
-        summary_result = (await session.execute(statement=summary_stmt)).scalars().all()
-
-        summary = {}
-        year_trend = {}
-        for result in summary_result:
-
-            amount, month, year, currency = (
-                result.amount,
-                result.month,
-                result.year,
-                result.currency,
+        summary_stmt = (
+            select(
+                TrackerRollupDB.currency,
+                TrackerRollupDB.year,
+                TrackerRollupDB.month,
+                TrackerRollupDB.amount,
             )
+            .filter(
+                TrackerRollupDB.user_uid == user_uid,
+                TrackerRollupDB.entry_count > 0,
+            )
+            .order_by(TrackerRollupDB.year.asc())
+        )
 
-            if currency not in summary:
-                summary[currency] = {year: amount}
-            elif currency in summary:
-                if summary[currency].get(year) is None:
-                    summary[currency][year] = amount
-                else:
-                    summary[currency][year] += amount
-
-            if year not in year_trend:
-                year_trend = {year: {currency: {month: {"amount": amount}}}}
-
-            elif year in year_trend:
-                if year_trend[year].get(currency) is None:
-
-                    year_trend[year][currency] = {
-                        month: {
-                            "amount": amount,
-                        }
-                    }
-
-                elif year_trend[year].get(currency):
-                    if year_trend[year][currency].get(month):
-
-                        year_trend[year][currency][month]["amount"] += amount
-
-                    else:
-
-                        year_trend[year][currency][month] = {
-                            "amount": amount,
-                        }
+        summary_result = (await session.execute(statement=summary_stmt)).all()
 
-        return schemas.TrackingDashBoard(summary=summary, yearly_chart=year_trend)
+    summary, year_trend = build_dashboard(rows=summary_result)
 
-        return schemas.TrackingDashBoard(summary=summary, yearly_chart=year_trend)
+    return schemas.TrackingDashBoard(summary=summary, yearly_chart=year_trend)
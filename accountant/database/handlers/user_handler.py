@@ -1,7 +1,10 @@
 import logging
+from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import and_, delete, insert, select, update
+from sqlalchemy import and_, delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 
 import accountant.schemas.user_schemas as schemas
@@ -9,7 +12,9 @@ from accountant.database.orms.user_orm import User as UserDB
 from accountant.database.orms.user_orm import UserGroup as UserGroupDB
 from accountant.database.orms.user_orm import UserGroupInvitation as UserGroupIVDB
 from accountant.database.orms.user_orm import UserUGroup as UserUGroupDB
-from accountant.root.database import async_session
+from accountant.root.database import after_commit, async_session
+from accountant.root.settings import Settings
+from accountant.root.utils.lru_cache import LRUCache
 from accountant.services.service_utils.accountant_exceptions import (
     CreateError,
     DeleteError,
@@ -18,6 +23,22 @@ from accountant.services.service_utils.accountant_exceptions import (
 )
 
 LOGGER = logging.getLogger(__name__)
+settings = Settings()
+
+# Per-worker, so other workers may serve a changed principal until the TTL
+# runs out; writes below invalidate the local copy once they commit.
+PRINCIPALS = LRUCache(
+    maxsize=settings.principal_cache_size, ttl=settings.principal_cache_ttl
+)
+
+
+def forget_principals(user_uids):
+    for user_uid in user_uids:
+        PRINCIPALS.pop(UUID(str(user_uid)))
+
+
+async def invalidate_principal(*user_uids: UUID):
+    await after_commit(lambda: forget_principals(user_uids))
 
 
 async def create_user(user: schemas.User):
@@ -77,57 +98,61 @@ async def get_user(user_uid: UUID):
 
         return schemas.UserExtendedProfile(
             **result.as_dict(),
-            user_group=result.user_group[0] if result.user_group else None
+            user_group=result.user_group[0] if result.user_group else None,
         )
 
 
-async def update_user(user_uid: UUID, user_update: schemas.UserUpdate):
+async def get_principal(user_uid: UUID):
+    """The authenticated user with the group they own, in one query, cached."""
 
-    async with async_session() as session:
+    principal = PRINCIPALS.get(user_uid)
+    if principal is not None:
+        return principal.model_copy()
 
+    async with async_session() as session:
         stmt = (
-            update(UserDB)
+            select(UserDB, UserGroupDB)
+            .outerjoin(UserGroupDB, UserGroupDB.owner_uid == UserDB.user_uid)
             .filter(UserDB.user_uid == user_uid)
-            .values(**user_update.model_dump(exclude_none=True))
-            .returning(UserDB)
+            .limit(1)
         )
 
-        result = (await session.execute(statement=stmt)).scalar_one_or_none()
+        result = (await session.execute(statement=stmt)).one_or_none()
 
         if result is None:
-            await session.rollback()
-            raise UpdateError
+            raise NotFoundError
 
-        await session.commit()
+    user, user_group = result
+    principal = schemas.UserExtendedProfile(
+        **user.as_dict(),
+        user_group=(schemas.UserGroup(**user_group.as_dict()) if user_group else None),
+    )
+    PRINCIPALS.set(user_uid, principal)
 
-        return schemas.UserExtendedProfile(**result.as_dict())
+    return principal.model_copy()
 
 
-async def all_user_update(user_uids, user_updates: list[schemas.UserUpdate]):
+async def update_user(user_uid: UUID, user_update: schemas.UserUpdate):
 
     async with async_session() as session:
 
         stmt = (
             update(UserDB)
-            .filter(UserDB.user_uid.in_(user_uids))
-            .values(
-                *[
-                    user_update.model_dump(exclude_none=True)
-                    for user_update in user_updates
-                ]
-            )
+            .filter(UserDB.user_uid == user_uid)
+            .values(**user_update.model_dump(exclude_none=True))
             .returning(UserDB)
         )
 
-        result = (await session.execute(statement=stmt)).scalars().all()
+        result = (await session.execute(statement=stmt)).scalar_one_or_none()
 
         if result is None:
             await session.rollback()
             raise UpdateError
 
         await session.commit()
+        await invalidate_principal(user_uid)
 
-        return [schemas.UserExtendedProfile(**x.as_dict()) for x in result]
+        return schemas.UserExtendedProfile(**result.as_dict())
 
 
 async def delete_user(user_uid: UUID):
@@ -141,24 +166,49 @@ async def delete_user(user_uid: UUID):
             raise DeleteError
 
         await session.commit()
+        await invalidate_principal(user_uid)
 
         return schemas.UserExtendedProfile(**result.as_dict())
 
 
-async def get_all_user(is_alive: bool = None):
-    async with async_session() as session:
-        stmt = (
-            select(UserDB)
-            .options(joinedload(UserDB.user_group))
-            .filter(UserDB.is_alive == is_alive)
-        )
+async def sweep_alive_users(batch_size: int):
+    """Mark alive users as not alive, batch_size rows per transaction.
 
-        result = (await session.execute(statement=stmt)).unique().scalars().all()
+    Yields each committed batch as (user_uid, email) rows. SKIP LOCKED lets a
+    concurrent sweep, or a user confirming in the meantime, pass over rows
+    already being updated instead of waiting on them. Users confirmed or
+    created after the sweep started are left alive, so a sweep always ends.
+    """
 
-        if result is None:
-            return []
+    cutoff = datetime.utcnow()
+    last_seen_utc = func.coalesce(
+        UserDB.date_updated_utc, UserDB.date_created_utc, datetime.min
+    )
+
+    while True:
+        async with async_session() as session:
+            batch = (
+                select(UserDB.user_uid)
+                .filter(UserDB.is_alive, last_seen_utc < cutoff)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            stmt = (
+                update(UserDB)
+                .filter(UserDB.user_uid.in_(batch.scalar_subquery()))
+                .values(is_alive=False)
+                .returning(UserDB.user_uid, UserDB.email)
+                .execution_options(synchronize_session=False)
+            )
+
+            result = (await session.execute(statement=stmt)).all()
+            await session.commit()
+
+        if not result:
+            return
 
-        return [schemas.UserExtendedProfile(**x.as_dict()) for x in result]
+        await invalidate_principal(*[user.user_uid for user in result])
+        yield result
 
 
 # UserGroup
@@ -177,6 +227,7 @@ async def create_user_group(user_uid: UUID):
             raise CreateError
 
         await session.commit()
+        await invalidate_principal(user_uid)
 
         return schemas.UserGroup(**result.as_dict())
 
@@ -208,14 +259,19 @@ async def add_user_to_group(user_group_memb: schemas.UserGroupMember):
             raise CreateError
 
         await session.commit()
+        await invalidate_principal(user_group_memb.user_uid)
+
         return schemas.UserGroupMemberProfile(**result.as_dict())
 
 
-async def delete_from_user_group(user_uid: UUID):
+async def delete_from_user_group(user_uid: UUID, user_group_uid: UUID):
     async with async_session() as session:
         stmt = (
             delete(UserUGroupDB)
-            .filter(UserUGroupDB.user_uid == user_uid)
+            .filter(
+                UserUGroupDB.user_uid == user_uid,
+                UserUGroupDB.user_group_uid == user_group_uid,
+            )
             .returning(UserUGroupDB)
         )
 
@@ -226,6 +282,8 @@ async def delete_from_user_group(user_uid: UUID):
             raise DeleteError
 
         await session.commit()
+        await invalidate_principal(user_uid)
+
         return schemas.UserGroupMemberProfile(**result.as_dict())
 
 
@@ -272,7 +330,7 @@ async def check_dependent(email: str, user_group_uid: UUID):
         stmt = select(UserGroupIVDB).filter(
             and_(
                 UserGroupIVDB.user_group_uid == user_group_uid,
-                UserGroupIVDB.email == email,
+                func.lower(UserGroupIVDB.email) == email.lower(),
             )
         )
 
@@ -287,9 +345,17 @@ async def check_dependent(email: str, user_group_uid: UUID):
 async def create_dependent(user_g_iv: list[schemas.UserGroupInvitation]):
     async with async_session() as session:
 
+        # Addresses the group has already invited are skipped rather than
+        # failing the batch; only new invitations come back.
         stmt = (
-            insert(UserGroupIVDB)
+            pg_insert(UserGroupIVDB)
             .values([u_g_iv.model_dump() for u_g_iv in user_g_iv])
+            .on_conflict_do_nothing(
+                index_elements=[
+                    UserGroupIVDB.user_group_uid,
+                    func.lower(UserGroupIVDB.email),
+                ]
+            )
             .returning(UserGroupIVDB)
         )
 
@@ -324,6 +390,44 @@ async def get_all_dependents(user_group_uid: UUID):
         )
 
 
+async def stream_pending_invitations(batch_size: int):
+    """Unaccepted invitations with their group owner's name, one group at a time.
+
+    Yields (user_group_uid, owner_name, emails). Rows come off a server-side
+    cursor batch_size at a time and arrive ordered by group, so only the group
+    being assembled is held in memory.
+    """
+
+    async with async_session() as session:
+        stmt = (
+            select(UserGroupIVDB.user_group_uid, UserGroupIVDB.email, UserDB.name)
+            .join(
+                UserGroupDB,
+                UserGroupDB.user_group_uid == UserGroupIVDB.user_group_uid,
+            )
+            .join(UserDB, UserDB.user_uid == UserGroupDB.owner_uid)
+            .filter(UserGroupIVDB.is_accepted.is_(False))
+            .order_by(UserGroupIVDB.user_group_uid)
+        )
+
+        result = await session.stream(
+            statement=stmt, execution_options={"yield_per": batch_size}
+        )
+
+        group_uid, owner_name, emails = None, None, []
+        async for rows in result.partitions():
+            for row in rows:
+                if row.user_group_uid != group_uid:
+                    if emails:
+                        yield group_uid, owner_name, emails
+                    group_uid, owner_name, emails = row.user_group_uid, row.name, []
+
+                emails.append(row.email)
+
+        if emails:
+            yield group_uid, owner_name, emails
+
+
 async def get_dependent(user_group_uid: UUID, uid: UUID):
     async with async_session() as session:
         stmt = select(UserGroupIVDB).filter(
@@ -353,11 +457,16 @@ async def update_dependent(
             .returning(UserGroupIVDB)
         )
 
-        result = (await session.execute(statement=stmt)).scalar_one_or_none()
+        try:
+            result = (await session.execute(statement=stmt)).scalar_one_or_none()
+        except IntegrityError:
+            # The new email is already invited to this group.
+            await session.rollback()
+            raise UpdateError
 
         if result is None:
             await session.rollback()
-            raise UpdateError
+            raise NotFoundError
 
         await session.commit()
         return schemas.UserGroupIVProfile(**result.as_dict())
@@ -1,6 +1,7 @@
 from uuid import UUID
 
-from sqlalchemy import delete, select, insert, update, func
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import joinedload
 import accountant.schemas.will_schemas as schemas
 from accountant.root.database import async_session
@@ -11,13 +12,36 @@ from accountant.services.service_utils.accountant_exceptions import (
     NotFoundError,
     UpdateError,
 )
+from accountant.root.utils.abstract_schema import CountMode
+from accountant.services.service_utils.pagination_utils import (
+    DEFAULT_PAGE_SIZE,
+    fetch_page,
+    forget_counts,
+)
+
+
+def wills_count_key(owner_uid: UUID = None, assigned_uid: UUID = None):
+    return f"wills-{owner_uid}-{assigned_uid}"
+
+
+async def forget_will_counts(will):
+    await forget_counts(
+        wills_count_key(owner_uid=will.owner_uid),
+        wills_count_key(assigned_uid=will.assigned_uid),
+    )
 
 
 async def create_will_allotment(will: schemas.Will):
 
     async with async_session() as session:
 
-        stmt = insert(WillDB).values(**will.model_dump()).returning(WillDB)
+        # An investment that is already willed out comes back as no row.
+        stmt = (
+            pg_insert(WillDB)
+            .values(**will.model_dump())
+            .on_conflict_do_nothing(index_elements=[WillDB.investment_uid])
+            .returning(WillDB)
+        )
 
         result = (await session.execute(statement=stmt)).scalar_one_or_none()
 
@@ -27,25 +51,18 @@ async def create_will_allotment(will: schemas.Will):
             raise CreateError
 
         await session.commit()
+        await forget_will_counts(will=result)
 
         return schemas.WillProfile(**result.as_dict())
         ...
 
 
-async def check_investment_will_allotment(investment_uid: UUID):
-
-    async with async_session() as session:
-        stmt = select(WillDB).filter(WillDB.investment_uid == investment_uid)
-
-        result = (await session.execute(statement=stmt)).scalar_one_or_none()
-
-        if result is None:
-            raise NotFoundError
-
-        return schemas.WillProfile(**result.as_dict())
-
-
-async def get_wills(**kwargs):
+async def get_wills(
+    limit: int = DEFAULT_PAGE_SIZE,
+    after=None,
+    count_mode: CountMode = CountMode.exact,
+    **kwargs,
+):
 
     owner_uid = kwargs.get("owner_uid")
     assigned_uid = kwargs.get("assigned_uid")
@@ -60,28 +77,27 @@ async def get_wills(**kwargs):
 
     async with async_session() as session:
 
-        stmt = (
-            select(WillDB).options(joinedload(WillDB.investment)).filter(*filter_case)
+        result, next_cursor, result_size = await fetch_page(
+            session=session,
+            stmt=select(WillDB)
+            .options(joinedload(WillDB.investment))
+            .filter(*filter_case),
+            total_stmt=select(WillDB.will_uid).filter(*filter_case),
+            created_column=WillDB.date_created_utc,
+            uid_column=WillDB.will_uid,
+            limit=limit,
+            after=after,
+            count_mode=count_mode,
+            count_key=wills_count_key(owner_uid=owner_uid, assigned_uid=assigned_uid),
         )
 
-        result = (await session.execute(statement=stmt)).scalars().all()
-
-        if not result:
-
-            return schemas.PaginatedWillProfile()
-
-        result_size = (
-            await session.execute(
-                statement=select(func.count(WillDB.will_uid)).filter(*filter_case)
-            )
-        ).scalar()
-
         return schemas.PaginatedWillProfile(
             result_set=[
                 schemas.WillExtendedProfile(**x.as_dict(), investment=x.investment)
                 for x in result
             ],
             result_size=result_size,
+            next_cursor=next_cursor,
         )
 
 
@@ -140,5 +156,6 @@ async def delete_will(will_uid: UUID, owner_uid: UUID):
             raise DeleteError
 
         await session.commit()
+        await forget_will_counts(will=result)
 
         return schemas.WillProfile(**result.as_dict())
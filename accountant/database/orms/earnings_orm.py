@@ -1,5 +1,5 @@
 from accountant.root.utils.abstract_base import AbstractBase
-from sqlalchemy import Column, DECIMAL, Date, String, ForeignKey, Integer
+from sqlalchemy import Column, DECIMAL, Date, String, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from uuid import uuid4
@@ -8,6 +8,15 @@ from uuid import uuid4
 class Earning(AbstractBase):
 
     __tablename__ = "earnings"
+    __table_args__ = (
+        Index(
+            "ix_earnings_user_uid_created",
+            "user_uid",
+            "date_created_utc",
+            "earning_uid",
+        ),
+        Index("ix_earnings_user_uid_year_month", "user_uid", "year", "month"),
+    )
     earning_uid = Column(UUID, primary_key=True, default=uuid4)
     amount = Column(DECIMAL, nullable=False)
     currency = Column(String, nullable=False)
@@ -20,3 +29,18 @@ class Earning(AbstractBase):
     user = relationship("User")
 
     # percentage_change_from_last_month
+
+
+class EarningRollup(AbstractBase):
+
+    __tablename__ = "earnings_monthly_rollup"
+    user_uid = Column(
+        UUID,
+        ForeignKey("users.user_uid", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    currency = Column(String, primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(String, primary_key=True)
+    amount = Column(DECIMAL, nullable=False, default=0)
+    entry_count = Column(Integer, nullable=False, default=0)
@@ -1,5 +1,5 @@
 from accountant.root.utils.abstract_base import AbstractBase
-from sqlalchemy import Column, DECIMAL, Date, String, ForeignKey, Boolean
+from sqlalchemy import Column, DECIMAL, Date, String, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from uuid import uuid4
@@ -7,6 +7,11 @@ from uuid import uuid4
 
 class Platform(AbstractBase):
     __tablename__ = "platforms"
+    __table_args__ = (
+        Index(
+            "ux_platforms_user_group_uid_name", "user_group_uid", "name", unique=True
+        ),
+    )
 
     platform_uid = Column(UUID, primary_key=True, default=uuid4)
     platform_website = Column(String, nullable=False)
@@ -17,6 +22,7 @@ class Platform(AbstractBase):
         UUID,
         ForeignKey("user_group.user_group_uid", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     investment = relationship("Investment", back_populates="platform")
 
@@ -24,6 +30,20 @@ class Platform(AbstractBase):
 class Investment(AbstractBase):
 
     __tablename__ = "investment"
+    __table_args__ = (
+        Index(
+            "ix_investment_platform_uid_created",
+            "platform_uid",
+            "date_created_utc",
+            "investment_uid",
+        ),
+        Index(
+            "ux_investment_platform_uid_plan_name",
+            "platform_uid",
+            "plan_name",
+            unique=True,
+        ),
+    )
 
     investment_uid = Column(UUID, primary_key=True, default=uuid4)
     return_on_investment = Column(DECIMAL, nullable=False)
@@ -38,6 +58,7 @@ class Investment(AbstractBase):
         UUID,
         ForeignKey("user_group.user_group_uid", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     platform = relationship("Platform")
     trackers = relationship("InvestmentTracker", back_populates="investment")
@@ -45,6 +66,14 @@ class Investment(AbstractBase):
 
 class InvestmentTracker(AbstractBase):
     __tablename__ = "investment tracker"
+    __table_args__ = (
+        Index(
+            "ix_investment_tracker_investment_uid_created",
+            "investment_uid",
+            "date_created_utc",
+            "uid",
+        ),
+    )
 
     uid = Column(UUID, primary_key=True, default=uuid4)
     amount = Column(DECIMAL, nullable=False)
@@ -55,4 +84,12 @@ class InvestmentTracker(AbstractBase):
         nullable=False,
     )
     transaction_type = Column(String, nullable=False)
+    # Copied from the platform on insert so reads and writes can be scoped to
+    # the group without joining back through investment and platforms.
+    user_group_uid = Column(
+        UUID,
+        ForeignKey("user_group.user_group_uid", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
     investment = relationship("Investment")
@@ -0,0 +1,11 @@
+from accountant.root.utils.abstract_base import AbstractBase
+from sqlalchemy import Column, DateTime, String
+
+
+class ScheduledJobRun(AbstractBase):
+
+    __tablename__ = "scheduled_job_runs"
+    job_name = Column(String, primary_key=True)
+    last_tick_utc = Column(DateTime(), nullable=False)
+    last_status = Column(String)
+    last_finished_utc = Column(DateTime())
@@ -1,5 +1,5 @@
 from accountant.root.utils.abstract_base import AbstractBase
-from sqlalchemy import Column, DECIMAL, String, Integer
+from sqlalchemy import Column, DECIMAL, Index, String, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from uuid import uuid4
 
@@ -7,6 +7,15 @@ from uuid import uuid4
 class Tracker(AbstractBase):
 
     __tablename__ = "trackers"
+    __table_args__ = (
+        Index(
+            "ix_trackers_user_uid_created",
+            "user_uid",
+            "date_created_utc",
+            "tracker_uid",
+        ),
+        Index("ix_trackers_user_uid_year_month", "user_uid", "year", "month"),
+    )
     tracker_uid = Column(UUID, primary_key=True, default=uuid4)
     amount = Column(DECIMAL, nullable=False)
     label = Column(String, nullable=True)
@@ -15,3 +24,14 @@ class Tracker(AbstractBase):
     description = Column(String, nullable=True)
     currency = Column(String, nullable=False)
     user_uid = Column(UUID, nullable=False)
+
+
+class TrackerRollup(AbstractBase):
+
+    __tablename__ = "trackers_monthly_rollup"
+    user_uid = Column(UUID, primary_key=True)
+    currency = Column(String, primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(String, primary_key=True)
+    amount = Column(DECIMAL, nullable=False, default=0)
+    entry_count = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Boolean
+from sqlalchemy import Column, String, ForeignKey, Boolean, Index, func, text
 from sqlalchemy.orm import relationship
 from uuid import uuid4
 from sqlalchemy.dialects.postgresql import UUID
@@ -7,6 +7,11 @@ from accountant.root.utils.abstract_base import AbstractBase
 
 class User(AbstractBase):
     __tablename__ = "users"
+    __table_args__ = (
+        # Only rows the liveness sweep still has to visit; they drop out of
+        # the index as the sweep flips them.
+        Index("ix_users_alive", "user_uid", postgresql_where=text("is_alive")),
+    )
     user_uid = Column(UUID, primary_key=True, default=uuid4)
     name = Column(String, nullable=False)
     email = Column(String, nullable=False, unique=True)
@@ -21,7 +26,10 @@ class UserGroup(AbstractBase):
     __tablename__ = "user_group"
     user_group_uid = Column(UUID, primary_key=True, default=uuid4)
     owner_uid = Column(
-        UUID, ForeignKey("users.user_uid", ondelete="CASCADE"), nullable=False
+        UUID,
+        ForeignKey("users.user_uid", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
     user_ugroup = relationship("UserUGroup", back_populates="user_group")
     user = relationship("User")
@@ -41,6 +49,7 @@ class UserUGroup(AbstractBase):
         ForeignKey("users.user_uid", ondelete="CASCADE"),
         nullable=False,
         primary_key=True,
+        index=True,
     )
     user_group = relationship("UserGroup")
     user = relationship("User")
@@ -50,9 +59,18 @@ class UserGroupInvitation(AbstractBase):
     __tablename__ = "user_group_invitation"
     uid = Column(UUID, primary_key=True, default=uuid4)
     user_group_uid = Column(
-        UUID, ForeignKey("user_group.user_group_uid"), default=uuid4
+        UUID, ForeignKey("user_group.user_group_uid"), default=uuid4, index=True
     )
     email = Column(String, nullable=False)
     is_accepted = Column(
         Boolean, nullable=False, default=False, server_default=str(False)
     )
+
+
+# One invitation per address and group, whatever case it was typed in.
+Index(
+    "ux_user_group_invitation_group_email",
+    UserGroupInvitation.user_group_uid,
+    func.lower(UserGroupInvitation.email),
+    unique=True,
+)
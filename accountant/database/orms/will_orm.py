@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Date, Boolean, String
+from sqlalchemy import Column, ForeignKey, Date, Boolean, Index, String
 from sqlalchemy.orm import relationship
 from uuid import uuid4
 from sqlalchemy.dialects.postgresql import UUID
@@ -8,6 +8,17 @@ from accountant.root.utils.abstract_base import AbstractBase
 class Will(AbstractBase):
 
     __tablename__ = "will"
+    __table_args__ = (
+        Index("ix_will_owner_uid_created", "owner_uid", "date_created_utc", "will_uid"),
+        Index(
+            "ix_will_assigned_uid_created",
+            "assigned_uid",
+            "date_created_utc",
+            "will_uid",
+        ),
+        # An investment can only be willed out once.
+        Index("ux_will_investment_uid", "investment_uid", unique=True),
+    )
     will_uid = Column(UUID, primary_key=True, default=uuid4)
     instruction = Column(String, nullable=True)
     investment_uid = Column(
@@ -16,7 +27,10 @@ class Will(AbstractBase):
         nullable=False,
     )
     invitation_uid = Column(
-        UUID, ForeignKey("user_group_invitation.uid", ondelete="CASCADE"), nullable=True
+        UUID,
+        ForeignKey("user_group_invitation.uid", ondelete="CASCADE"),
+        nullable=True,
+        index=True,
     )
     assigned_uid = Column(
         UUID, ForeignKey("users.user_uid", ondelete="CASCADE"), nullable=True
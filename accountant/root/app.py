@@ -1,16 +1,37 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 from accountant.root.app_router import api_router as api
 import time
 from accountant.root.settings import Settings
+from accountant.root.database import engine
+from accountant.root.redis_manager import redis_pool
+from accountant.root.scheduler import SCHEDULER
+from accountant.services.service_utils.blacklist_utils import REVOKED_TOKENS
 
 
 settings = Settings()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background_tasks = [asyncio.create_task(REVOKED_TOKENS.sync_forever())]
+    if settings.scheduler_in_app:
+        background_tasks.append(asyncio.create_task(SCHEDULER.run_forever()))
+
+    yield
+
+    for task in background_tasks:
+        task.cancel()
+    await redis_pool.aclose()
+    await engine.dispose()
+
+
 def intialize() -> FastAPI:
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
 
     ORIGINS = [
         "http://localhost:5173",
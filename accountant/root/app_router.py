@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from accountant.routers.auth_router import api_router as auth_router
 from accountant.routers.earning_router import api_router as earning_router
@@ -10,9 +10,11 @@ from accountant.routers.tracker_router import api_router as tracker_router
 from accountant.routers.ums_router import api_router as ums_router
 from accountant.routers.dependent_router import api_router as dependent_router
 from accountant.routers.will_route import api_router as will_router
+from accountant.routers.metrics_router import api_router as metrics_router
+from accountant.root.database import unit_of_work
 
 
-api_router = APIRouter()
+api_router = APIRouter(dependencies=[Depends(unit_of_work)])
 
 
 api_router.include_router(router=auth_router)
@@ -23,3 +25,4 @@ api_router.include_router(router=tracker_router)
 api_router.include_router(router=investment_router)
 api_router.include_router(router=investment_dashboard_router)
 api_router.include_router(router=will_router)
+api_router.include_router(router=metrics_router)
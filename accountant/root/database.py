@@ -1,17 +1,166 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from inspect import isawaitable
+from typing import Awaitable, Callable, Optional
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from accountant.root.settings import Settings
+from accountant.root.utils.db_pool import InstrumentedAsyncPool
 
 from alembic import command
 from alembic.config import Config
 from sqlalchemy import MetaData, create_engine, inspect
 from accountant.root.utils.abstract_base import AbstractBase
 
+LOGGER = logging.getLogger(__name__)
 settings = Settings()
 
-engine = create_async_engine(url=str(settings.postgres_url))
 
+def engine_connect_args() -> dict:
+    if settings.db_pgbouncer_mode:
+        # A transaction pooler hands each transaction a different server
+        # connection, so named prepared statements must neither be cached nor
+        # collide with ones another client left behind.
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
 
-async_session = async_sessionmaker(engine, expire_on_commit=False)
+    return {
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+    }
+
+
+engine = create_async_engine(
+    url=str(settings.postgres_url),
+    poolclass=InstrumentedAsyncPool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    connect_args=engine_connect_args(),
+)
+
+
+session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+request_session: ContextVar[Optional[AsyncSession]] = ContextVar(
+    "request_session", default=None
+)
+
+
+class ScopedSession:
+    """A handler's view of the request session.
+
+    commit only flushes; the unit of work commits once at the end of the
+    request. rollback undoes this handler's own statements, leaving earlier
+    work in the request alone.
+    """
+
+    def __init__(self, session: AsyncSession, savepoint=None):
+        self._session = session
+        self._savepoint = savepoint
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    async def commit(self):
+        await self._session.flush()
+
+    async def rollback(self):
+        if self._savepoint is None:
+            await self._session.rollback()
+
+        elif self._savepoint.is_active:
+            await self._savepoint.rollback()
+
+
+@asynccontextmanager
+async def async_session():
+    session = request_session.get()
+
+    if session is None:
+        async with session_factory() as session:
+            yield session
+        return
+
+    # Nothing to protect yet if the request has not touched the database, so
+    # the savepoint round trips are only paid once there is earlier work.
+    savepoint = await session.begin_nested() if session.in_transaction() else None
+
+    try:
+        yield ScopedSession(session=session, savepoint=savepoint)
+
+    except Exception:
+        if savepoint is not None and savepoint.is_active:
+            await savepoint.rollback()
+        raise
+
+    if savepoint is not None and savepoint.is_active:
+        await savepoint.commit()
+
+
+AFTER_COMMIT = "after_commit"
+
+
+async def run_callbacks(callbacks: list[Callable[[], Optional[Awaitable]]]):
+    # The data is already committed; a failed cache drop must not fail the
+    # request that made the change.
+    for callback in callbacks:
+        try:
+            result = callback()
+            if isawaitable(result):
+                await result
+
+        except Exception as e:
+            LOGGER.exception(e)
+
+
+async def after_commit(callback: Callable[[], Optional[Awaitable]]):
+    """Run callback once the current changes are committed.
+
+    In a request that is when the unit of work commits, so caches are not
+    dropped while other requests can still read the old rows. Outside one
+    the handler has already committed its own session and it runs now.
+    """
+
+    session = request_session.get()
+
+    if session is None:
+        await run_callbacks([callback])
+        return
+
+    session.info.setdefault(AFTER_COMMIT, []).append(callback)
+
+
+async def unit_of_work():
+    """Share one session across every handler a request calls.
+
+    Commits once when the request succeeds and rolls everything back when it
+    raises, so multi-step flows are atomic and hold a single connection.
+    """
+
+    async with session_factory() as session:
+        token = request_session.set(session)
+
+        try:
+            yield session
+            await session.commit()
+
+        except Exception:
+            session.info.pop(AFTER_COMMIT, None)
+            await session.rollback()
+            raise
+
+        finally:
+            request_session.reset(token)
+
+        await run_callbacks(session.info.pop(AFTER_COMMIT, []))
 
 
 def create_migration():
@@ -21,6 +170,10 @@ def create_migration():
         alembic_ini_path = "alembic.ini"
         alembic_config = Config(alembic_ini_path)
 
+        # Apply the checked-in revisions first; autogenerate needs the
+        # database at head before it can diff it against the models.
+        command.upgrade(alembic_config, "heads")
+
         metadata = MetaData()
         postgres_url = str(settings.postgres_url).split("//")
 
@@ -1,4 +1,4 @@
-import redis
+import redis.asyncio as redis
 from accountant.root.settings import Settings
 
 
@@ -6,5 +6,12 @@ settings = Settings()
 
 
 redis_url = str(settings.redis_url)
-acc_redis = redis.Redis(decode_responses=True)
-acc_redis.from_url(url=redis_url, decode_responses=True)
+redis_pool = redis.ConnectionPool.from_url(
+    url=redis_url,
+    decode_responses=True,
+    max_connections=settings.redis_max_connections,
+    socket_timeout=settings.redis_socket_timeout,
+    socket_connect_timeout=settings.redis_socket_connect_timeout,
+    health_check_interval=settings.redis_health_check_interval,
+)
+acc_redis = redis.Redis(connection_pool=redis_pool)
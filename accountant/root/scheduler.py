@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import random
+from datetime import datetime
+from typing import Awaitable, Callable
+
+import accountant.database.handlers.scheduler_handler as scheduler_handler
+import accountant.services.auth_service as auth_service
+from accountant.root.settings import Settings
+from accountant.root.utils.cron import CronSchedule
+
+LOGGER = logging.getLogger(__name__)
+settings = Settings()
+
+MAX_IDLE_SECONDS = 60
+
+
+class ScheduledJob:
+    def __init__(
+        self,
+        name: str,
+        cron: str,
+        func: Callable[[], Awaitable],
+        timeout: float,
+        jitter: float = settings.scheduler_jitter_seconds,
+    ):
+        self.name = name
+        self.schedule = CronSchedule(cron)
+        self.func = func
+        self.timeout = timeout
+        self.jitter = jitter
+
+
+class Scheduler:
+    """Fires cron-scheduled coroutines on the current event loop.
+
+    Every node runs the same loop; scheduler_handler.run_job_tick elects the
+    node that runs a given tick with a Postgres advisory lock.
+    """
+
+    def __init__(self, jobs: list[ScheduledJob]):
+        self.jobs = jobs
+        self.running = set()
+
+    async def execute(self, job: ScheduledJob) -> str:
+        try:
+            await asyncio.wait_for(job.func(), timeout=job.timeout)
+            return "succeeded"
+
+        except asyncio.TimeoutError:
+            LOGGER.error(f"job {job.name} timed out after {job.timeout}s")
+            return "timed_out"
+
+        except Exception as e:
+            LOGGER.exception(e)
+            return "failed"
+
+    async def run_job(self, job: ScheduledJob, tick: datetime):
+        # Spread the lock attempts so nodes do not hit the database together.
+        await asyncio.sleep(random.uniform(0, job.jitter))
+
+        try:
+            status = await scheduler_handler.run_job_tick(
+                job_name=job.name, tick=tick, run=lambda: self.execute(job)
+            )
+
+        except Exception as e:
+            LOGGER.exception(e)
+            LOGGER.error(f"job {job.name} could not be scheduled for {tick}")
+            return
+
+        if status is not None:
+            LOGGER.info(f"job {job.name} {status} for {tick}")
+
+    async def run_forever(self):
+        next_ticks = {
+            job.name: job.schedule.next_after(datetime.utcnow()) for job in self.jobs
+        }
+
+        try:
+            while True:
+                now = datetime.utcnow()
+
+                for job in self.jobs:
+                    tick = next_ticks[job.name]
+                    if tick > now:
+                        continue
+
+                    task = asyncio.create_task(self.run_job(job=job, tick=tick))
+                    self.running.add(task)
+                    task.add_done_callback(self.running.discard)
+
+                    # Ticks missed while the loop was busy are skipped.
+                    next_ticks[job.name] = job.schedule.next_after(max(tick, now))
+
+                if not next_ticks:
+                    await asyncio.sleep(MAX_IDLE_SECONDS)
+                    continue
+
+                wait = (min(next_ticks.values()) - datetime.utcnow()).total_seconds()
+                await asyncio.sleep(min(max(wait, 0), MAX_IDLE_SECONDS))
+
+        finally:
+            for task in self.running:
+                task.cancel()
+
+
+SCHEDULER = Scheduler(
+    jobs=[
+        ScheduledJob(
+            name="liveness-sweep",
+            cron=settings.liveness_sweep_cron,
+            func=auth_service.update_all_to_non_alive_users,
+            timeout=60 * 30,
+        ),
+        ScheduledJob(
+            name="dependent-invitations",
+            cron=settings.invitation_cron,
+            func=auth_service.send_invitation,
+            timeout=60 * 30,
+        ),
+    ]
+)
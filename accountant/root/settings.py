@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings
 from pydantic import PostgresDsn, RedisDsn
 
@@ -15,6 +17,46 @@ class Settings(BaseSettings):
     mail_server: str
     mail_from_name: str
     db_migration_env: bool = True
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    # PgBouncer in transaction pooling mode: no server-side statement caching.
+    db_pgbouncer_mode: bool = False
+    redis_max_connections: int = 50
+    redis_socket_timeout: float = 2
+    redis_socket_connect_timeout: float = 2
+    redis_health_check_interval: int = 30
+    token_bloom_capacity: int = 100000
+    token_bloom_error_rate: float = 0.001
+    token_bloom_rebuild_seconds: int = 3600
+    token_cache_size: int = 10000
+    token_cache_ttl: int = 300
+    principal_cache_size: int = 10000
+    principal_cache_ttl: int = 30
+    password_hash_rounds: int = 12
+    password_hash_workers: int = 4
+    # legacy: JWT wrapped in an itsdangerous signature. compact: bare JWT.
+    # Both are always accepted; this only picks what new logins receive.
+    token_format: Literal["legacy", "compact"] = "legacy"
+    mail_outbox_batch_size: int = 50
+    mail_outbox_max_attempts: int = 6
+    mail_outbox_retry_seconds: int = 30
+    mail_outbox_claim_idle_seconds: int = 300
+    # Run the job scheduler inside the API process instead of job_scheduler.py.
+    scheduler_in_app: bool = False
+    scheduler_jitter_seconds: float = 30
+    # Direct Postgres URL for the scheduler's advisory lock when postgres_url
+    # goes through PgBouncer in transaction mode; defaults to postgres_url.
+    scheduler_lock_url: Optional[PostgresDsn] = None
+    liveness_sweep_cron: str = "0 9 1 * *"
+    liveness_sweep_batch_size: int = 500
+    invitation_cron: str = "0 10 * * 1"
+    invitation_batch_size: int = 1000
+    # Operator bearer token for /v1/metrics; unset, the metrics routes 404.
+    metrics_token: Optional[str] = None
 
     class Config:
         env_file = ".env"
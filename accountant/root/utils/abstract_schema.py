@@ -31,6 +31,12 @@ class Month(str, Enum):
     ...
 
 
+class CountMode(str, Enum):
+    exact = "exact"
+    cached = "cached"
+    estimated = "estimated"
+
+
 class Trend(AbstractModel):
     amount: float
     # percentage_chanage: condecimal(ge=0, le=100) = 0
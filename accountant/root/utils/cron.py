@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+# minute, hour, day of month, month, day of week (0 or 7 is Sunday)
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+# Long enough to reach the next 29th of February.
+SEARCH_LIMIT = timedelta(days=366 * 8)
+
+
+def parse_field(field: str, low: int, high: int) -> set[int]:
+    values = set()
+
+    for part in field.split(","):
+        values_range, _, step = part.partition("/")
+        step = int(step) if step else 1
+
+        if values_range == "*":
+            start, end = low, high
+        elif "-" in values_range:
+            start, end = (int(value) for value in values_range.split("-", 1))
+        else:
+            start = int(values_range)
+            end = high if step > 1 else start
+
+        if not low <= start <= end <= high or step < 1:
+            raise ValueError(f"cron field {field!r} is outside {low}-{high}")
+
+        values.update(range(start, end + 1, step))
+
+    return values
+
+
+class CronSchedule:
+    """Five-field cron expression (minute hour day month weekday) in UTC.
+
+    Supports *, lists, ranges and steps. As in cron, when both day of month
+    and day of week are restricted a day matching either one fires.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression {expression!r} needs 5 fields")
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            parse_field(field, low, high)
+            for field, (low, high) in zip(fields, FIELD_RANGES)
+        )
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        # isoweekday is 1 for Monday .. 7 for Sunday; cron counts from Sunday.
+        weekday = moment.isoweekday() % 7 in self.weekdays
+
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after moment."""
+
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + SEARCH_LIMIT
+
+        while candidate <= limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1) + timedelta(days=32)).replace(
+                    day=1, hour=0, minute=0
+                )
+            elif not self.day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+
+        raise ValueError(f"cron expression {self.expression!r} never fires")
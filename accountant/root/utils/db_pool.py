@@ -0,0 +1,67 @@
+import logging
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+LOGGER = logging.getLogger(__name__)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long checkouts wait on the pool."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.checkout_wait_last = 0.0
+
+    def recreate(self):
+        # Keep the gauges across dispose()/recreate so a reset pool stays visible.
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.checkout_timeouts = self.checkout_timeouts
+        pool.checkout_wait_total = self.checkout_wait_total
+        pool.checkout_wait_max = self.checkout_wait_max
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+
+        try:
+            connection = super()._do_get()
+
+        except exc.TimeoutError:
+            self.checkout_timeouts += 1
+            LOGGER.warning(
+                f"db pool exhausted after {time.perf_counter() - started:.2f}s: "
+                f"size={self.size()} checked_out={self.checkedout()} "
+                f"overflow={self.overflow()} timeouts={self.checkout_timeouts}"
+            )
+            raise
+
+        waited = time.perf_counter() - started
+        self.checkouts += 1
+        self.checkout_wait_total += waited
+        self.checkout_wait_last = waited
+        self.checkout_wait_max = max(self.checkout_wait_max, waited)
+
+        return connection
+
+    def metrics(self) -> dict:
+        wait_avg = self.checkout_wait_total / self.checkouts if self.checkouts else 0
+
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "checkout_wait_last_ms": round(self.checkout_wait_last * 1000, 3),
+            "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 3),
+            "checkout_wait_avg_ms": round(wait_avg * 1000, 3),
+        }
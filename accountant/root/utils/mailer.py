@@ -1,53 +1,83 @@
-from fastapi import UploadFile
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
-from accountant.root.settings import Settings
-from typing import List
+from email.message import EmailMessage
+from email.utils import formataddr
 from pathlib import Path
+from typing import List
 import logging
 
+import aiosmtplib
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from accountant.root.settings import Settings
+
 
 settings = Settings()
 
 LOGGER = logging.getLogger(__name__)
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.mail_username,
-    MAIL_PASSWORD=settings.mail_password,
-    MAIL_FROM=settings.mail_from,
-    MAIL_PORT=settings.mail_port,
-    MAIL_SERVER=settings.mail_server,
-    MAIL_FROM_NAME=settings.mail_from_name,
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=False,
-    TEMPLATE_FOLDER=Path(__file__).parent.parent / "templates/",
+TEMPLATE_FOLDER = Path(__file__).parent.parent / "templates/"
+
+# Compiled templates are kept by the environment; with auto_reload off they are
+# not re-checked on disk for every message.
+TEMPLATES = Environment(
+    loader=FileSystemLoader(TEMPLATE_FOLDER),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
 )
 
 
-async def send_mail(
-    subject: str,
-    reciepients: List[str],
-    payload: dict,
-    template: str,
-    attachments: List[UploadFile] = [],
-):
-    message = MessageSchema(
-        subject=subject,
-        recipients=reciepients,
-        subtype=MessageType.html,
-        attachments=attachments,
-        template_body=payload,
+def render_mail(
+    subject: str, reciepients: List[str], payload: dict, template: str
+) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = formataddr((settings.mail_from_name, settings.mail_from))
+    message["To"] = ", ".join(reciepients)
+    message.set_content(
+        TEMPLATES.get_template(template).render(**payload), subtype="html"
     )
 
-    fm = FastMail(conf)
+    return message
+
+
+class SMTPMailer:
+    """One SMTP session reused across messages.
+
+    The session is opened on first send and kept until close(); if the server
+    has dropped it in the meantime it is reopened once before giving up.
+    """
+
+    def __init__(self):
+        self.smtp = None
+
+    async def connect(self):
+        self.smtp = aiosmtplib.SMTP(
+            hostname=settings.mail_server,
+            port=settings.mail_port,
+            username=settings.mail_username,
+            password=settings.mail_password,
+            start_tls=True,
+            validate_certs=False,
+        )
+        await self.smtp.connect()
+
+    async def send(self, message: EmailMessage):
+        for attempt in range(2):
+            if self.smtp is None or not self.smtp.is_connected:
+                await self.connect()
+
+            try:
+                return await self.smtp.send_message(message)
+
+            except aiosmtplib.SMTPServerDisconnected:
+                self.smtp = None
+                if attempt:
+                    raise
 
-    try:
-        # send mail
-        await fm.send_message(message, template_name=template)
-        LOGGER.info("mail sent")
+    async def close(self):
+        if self.smtp is not None and self.smtp.is_connected:
+            try:
+                await self.smtp.quit()
+            except aiosmtplib.SMTPException as e:
+                LOGGER.exception(e)
 
-    except ConnectionErrors as e:
-        LOGGER.exception(e)
-        LOGGER.error(f"mail failed to send for {payload}, with subject: {subject}")
+        self.smtp = None
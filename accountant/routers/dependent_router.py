@@ -15,7 +15,7 @@ api_router = APIRouter(prefix="/v1/dependent", tags=["Dependent Management"])
 
 @api_router.post(
     path="",
-    response_model=schemas.PaginatedUserGroupIVProfile,
+    response_model=schemas.DependentInvitationResult,
     status_code=status.HTTP_201_CREATED,
 )
 async def add_dependent(
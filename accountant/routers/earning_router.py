@@ -1,9 +1,15 @@
+from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, status, Depends
+from fastapi import APIRouter, status, Depends, Query
 from accountant.schemas.user_schemas import UserExtendedProfile
 import accountant.services.earning_service as earning_service
 import accountant.schemas.earning_schemas as schemas
 from accountant.services.service_utils.auth_utils import get_current_user
+from accountant.root.utils.abstract_schema import CountMode
+from accountant.services.service_utils.pagination_utils import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+)
 
 
 api_router = APIRouter(prefix="/v1/earning", tags=["Earnings"])
@@ -29,10 +35,18 @@ async def create_earning(
     response_model=schemas.PaginatedEarningProfile,
 )
 async def get_earnings(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    count_mode: CountMode = CountMode.exact,
     user_profile: UserExtendedProfile = Depends(get_current_user),
 ):
 
-    return await earning_service.get_earnings(user_uid=user_profile.user_uid)
+    return await earning_service.get_earnings(
+        user_uid=user_profile.user_uid,
+        limit=limit,
+        after=after,
+        count_mode=count_mode,
+    )
 
 
 @api_router.get(
@@ -1,6 +1,7 @@
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Body, Depends, status
+from fastapi import APIRouter, Body, Depends, Query, status
 
 import accountant.schemas.investment_schemas as schemas
 import accountant.services.investment_service as investment_service
@@ -9,6 +10,11 @@ from accountant.services.service_utils.auth_utils import (
     get_current_user,
     get_user_group_uid,
 )
+from accountant.root.utils.abstract_schema import CountMode
+from accountant.services.service_utils.pagination_utils import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+)
 
 api_router = APIRouter(prefix="/v1/investment", tags=["Investment"])
 
@@ -136,12 +142,18 @@ async def create_investment(
 )
 async def get_investments(
     platform_uid: UUID,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    count_mode: CountMode = CountMode.exact,
     user_profile: UserExtendedProfile = Depends(get_current_user),
     user_group_uid: UUID = Depends(get_user_group_uid),
 ):
     return await investment_service.get_investments(
         platform_uid=platform_uid,
         user_group_uid=user_group_uid,
+        limit=limit,
+        after=after,
+        count_mode=count_mode,
     )
 
 
@@ -231,6 +243,9 @@ async def create_investment_tracker(
 async def get_investment_trackers(
     platform_uid: UUID,
     investment_uid: UUID,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    count_mode: CountMode = CountMode.exact,
     user_group_uid: UUID = Depends(get_user_group_uid),
     user_profile: UserExtendedProfile = Depends(get_current_user),
 ):
@@ -238,6 +253,9 @@ async def get_investment_trackers(
         platform_uid=platform_uid,
         investment_uid=investment_uid,
         user_group_uid=user_group_uid,
+        limit=limit,
+        after=after,
+        count_mode=count_mode,
     )
 
 
@@ -250,8 +268,10 @@ async def get_investment_tracker(
     investment_uid: UUID,
     tracker_uid: UUID,
     user_profile: UserExtendedProfile = Depends(get_current_user),
+    user_group_uid: UUID = Depends(get_user_group_uid),
 ):
     return await investment_service.get_investment_tracker(
+        user_group_uid=user_group_uid,
         investment_uid=investment_uid,
         tracker_uid=tracker_uid,
     )
@@ -267,8 +287,10 @@ async def update_investment_tracker(
     tracker_uid: UUID,
     tracker_update: schemas.InvestmentTrackerUpdate,
     user_profile: UserExtendedProfile = Depends(get_current_user),
+    user_group_uid: UUID = Depends(get_user_group_uid),
 ):
     return await investment_service.update_investment_tracker(
+        user_group_uid=user_group_uid,
         investment_uid=investment_uid,
         tracker_uid=tracker_uid,
         investment_tracker_update=tracker_update,
@@ -283,8 +305,10 @@ async def delete_investment_tracker(
     investment_uid: UUID,
     tracker_uid: UUID,
     user_profile: UserExtendedProfile = Depends(get_current_user),
+    user_group_uid: UUID = Depends(get_user_group_uid),
 ):
     return await investment_service.delete_invest_tracker(
+        user_group_uid=user_group_uid,
         investment_uid=investment_uid,
         tracker_uid=tracker_uid,
     )
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, status
+
+import accountant.schemas.metrics_schemas as schemas
+from accountant.root.database import engine
+from accountant.services.service_utils.auth_utils import (
+    VERIFIED_TOKENS,
+    get_operator,
+)
+
+api_router = APIRouter(
+    prefix="/v1/metrics",
+    tags=["Metrics"],
+    dependencies=[Depends(get_operator)],
+)
+
+
+@api_router.get(
+    path="/db-pool",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.DBPoolMetrics,
+)
+async def get_db_pool_metrics():
+    return engine.pool.metrics()
+
+
+@api_router.get(
+    path="/token-cache",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas.CacheMetrics,
+)
+async def get_token_cache_metrics():
+    return VERIFIED_TOKENS.metrics()
@@ -1,11 +1,17 @@
+from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 
 import accountant.schemas.tracker_schemas as schemas
 import accountant.services.tracker_service as tracker_service
 from accountant.schemas.user_schemas import UserExtendedProfile
 from accountant.services.service_utils.auth_utils import get_current_user
+from accountant.root.utils.abstract_schema import CountMode
+from accountant.services.service_utils.pagination_utils import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+)
 
 api_router = APIRouter(prefix="/v1/tracker", tags=["Tracker"])
 
@@ -30,10 +36,16 @@ async def create_tracker(
     response_model=schemas.PaginatedTrackerProfile,
 )
 async def get_trackers(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    count_mode: CountMode = CountMode.exact,
     user_profile: UserExtendedProfile = Depends(get_current_user),
 ):
     return await tracker_service.get_trackers(
         user_uid=user_profile.user_uid,
+        limit=limit,
+        after=after,
+        count_mode=count_mode,
     )
 
 
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, status, Depends, Body
+from fastapi import APIRouter, status, Depends, Body, Query
 from accountant.schemas.user_schemas import UserExtendedProfile
 import accountant.services.will_service as will_service
 import accountant.schemas.will_schemas as schemas
@@ -6,6 +6,12 @@ from accountant.services.service_utils.auth_utils import (
     get_current_user,
     get_user_group_uid,
 )
+from accountant.root.utils.abstract_schema import CountMode
+from accountant.services.service_utils.pagination_utils import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+)
+from typing import Optional
 from uuid import UUID
 
 
@@ -37,9 +43,17 @@ async def create_will_allotment(
     status_code=status.HTTP_200_OK,
 )
 async def get_user_wills(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    count_mode: CountMode = CountMode.exact,
     user_profile: UserExtendedProfile = Depends(get_current_user),
 ):
-    return await will_service.get_user_wills(user_uid=user_profile.user_uid)
+    return await will_service.get_user_wills(
+        user_uid=user_profile.user_uid,
+        limit=limit,
+        after=after,
+        count_mode=count_mode,
+    )
 
 
 @api_router.get(
@@ -48,9 +62,17 @@ async def get_user_wills(
     status_code=status.HTTP_200_OK,
 )
 async def get_assigned_wills(
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    count_mode: CountMode = CountMode.exact,
     user_profile: UserExtendedProfile = Depends(get_current_user),
 ):
-    return await will_service.get_user_allotments(user_uid=user_profile.user_uid)
+    return await will_service.get_user_allotments(
+        user_uid=user_profile.user_uid,
+        limit=limit,
+        after=after,
+        count_mode=count_mode,
+    )
 
 
 @api_router.get(
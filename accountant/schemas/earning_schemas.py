@@ -40,6 +40,7 @@ class EarningProfile(EarningExtended):
 class PaginatedEarningProfile(AbstractModel):
     result_set: list[EarningProfile] = []
     result_size: conint(ge=0) = 0
+    next_cursor: Optional[str] = None
 
 
 class EarningDashBoard(DashBoard): ...
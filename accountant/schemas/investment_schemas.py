@@ -35,6 +35,7 @@ class InvestmentTrackerProfile(InvestmentTracker):
 class PaginatedInvestmentTrackerProfile(AbstractModel):
     result_set: list[InvestmentTrackerProfile] = []
     result_size: conint(ge=0) = 0
+    next_cursor: Optional[str] = None
 
 
 class InvestmentTrackerUpdate(AbstractModel):
@@ -61,6 +62,7 @@ class InvestmentProfile(Investment):
 class PaginatedInvestmentProfile(AbstractModel):
     result_set: list[InvestmentProfile] = []
     result_size: conint(ge=0) = 0
+    next_cursor: Optional[str] = None
 
 
 class InvestmentUpdate(AbstractModel):
@@ -0,0 +1,23 @@
+from pydantic import conint, confloat
+
+from accountant.root.utils.abstract_schema import AbstractModel
+
+
+class DBPoolMetrics(AbstractModel):
+    size: conint(ge=0)
+    max_overflow: int
+    checked_out: conint(ge=0)
+    checked_in: conint(ge=0)
+    overflow: conint(ge=0)
+    checkouts: conint(ge=0)
+    checkout_timeouts: conint(ge=0)
+    checkout_wait_last_ms: confloat(ge=0)
+    checkout_wait_max_ms: confloat(ge=0)
+    checkout_wait_avg_ms: confloat(ge=0)
+
+
+class CacheMetrics(AbstractModel):
+    size: conint(ge=0)
+    maxsize: conint(ge=0)
+    hits: conint(ge=0)
+    misses: conint(ge=0)
@@ -32,6 +32,7 @@ class TrackerProfile(TrackerExtended):
 class PaginatedTrackerProfile(AbstractModel):
     result_set: list[TrackerProfile] = []
     result_size: conint(ge=0) = 0
+    next_cursor: Optional[str] = None
 
 
 class TrackerUpdate(AbstractModel):
@@ -40,6 +40,13 @@ class UserExtendedProfile(UserProfile):
     password: ClassVar[str]
     user_group: Optional[UserGroup] = None
 
+    @property
+    def effective_user_group_uid(self) -> Optional[UUID]:
+        if self.added_to_user_group_uid is not None:
+            return self.added_to_user_group_uid
+
+        return self.user_group.user_group_uid if self.user_group else None
+
 
 class UserGroupMember(AbstractModel):
     user_uid: UUID
@@ -82,6 +89,10 @@ class PaginatedUserGroupIVProfile(AbstractModel):
     result_size: conint(ge=0) = 0
 
 
+class DependentInvitationResult(PaginatedUserGroupIVProfile):
+    already_invited: list[str] = []
+
+
 class TokenData(AbstractModel):
     user_uid: UUID
 
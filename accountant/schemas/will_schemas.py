@@ -35,3 +35,4 @@ class WillExtendedProfile(WillProfile):
 class PaginatedWillProfile(AbstractModel):
     result_set: list[WillExtendedProfile] = []
     result_size: conint(ge=0) = 0
+    next_cursor: Optional[str] = None
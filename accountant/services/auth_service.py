@@ -6,12 +6,19 @@ from fastapi import HTTPException, status
 import accountant.database.handlers.user_handler as user_db_handler
 import accountant.schemas.user_schemas as schemas
 import accountant.services.service_utils.auth_utils as auth_utils
+import accountant.services.service_utils.blacklist_utils as blacklist_utils
 import accountant.services.service_utils.redis_utils as redis_utils
-from accountant.root.utils.mailer import send_mail
-from accountant.services.service_utils.accountant_exceptions import NotFoundError
+from accountant.root.settings import Settings
+from accountant.services.service_utils.accountant_exceptions import (
+    DeleteError,
+    NotFoundError,
+    UpdateError,
+)
+from accountant.services.service_utils.mail_outbox import enqueue_mail, enqueue_mails
 from accountant.services.service_utils.token_utils import gr_token_gen
 
 LOGGER = logging.getLogger(__name__)
+settings = Settings()
 
 
 async def check_user(**kwargs):
@@ -39,7 +46,7 @@ async def create_user(user: schemas.User, user_group_token: str = None):
 
     except NotFoundError:
 
-        user.password = auth_utils.hash_password(plain_password=user.password)
+        user.password = await auth_utils.hash_password(plain_password=user.password)
         user_profile = await user_db_handler.create_user(user=user)
 
         await user_db_handler.create_user_group(user_uid=user_profile.user_uid)
@@ -95,10 +102,10 @@ async def create_user(user: schemas.User, user_group_token: str = None):
             await create_user_group(user_uid=user_profile.user_uid)
 
         user_token = gr_token_gen()
-        redis_utils.add_user_verification_token(
+        await redis_utils.add_user_verification_token(
             user_uid=user_profile.user_uid, token=user_token
         )
-        await send_mail(
+        await enqueue_mail(
             subject="Verify your account on The Accountant",
             reciepients=[user_profile.email],
             payload={"token": user_token},
@@ -110,10 +117,10 @@ async def create_user(user: schemas.User, user_group_token: str = None):
         )
 
 
-async def get_user(user_uid: UUID):
+async def get_principal(user_uid: UUID):
 
     try:
-        return await user_db_handler.get_user(user_uid=user_uid)
+        return await user_db_handler.get_principal(user_uid=user_uid)
 
     except NotFoundError:
         raise HTTPException(
@@ -121,34 +128,31 @@ async def get_user(user_uid: UUID):
         )
 
 
-async def verify_user(token: str):
+async def get_user(user_uid: UUID):
 
-    user_uid = redis_utils.get_verification_token_user(token=token)
+    try:
+        return await user_db_handler.get_user(user_uid=user_uid)
 
-    if user_uid is None:
+    except NotFoundError:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="token is invalid"
+            status_code=status.HTTP_404_NOT_FOUND, detail="user not found"
         )
 
-    stored_token = redis_utils.get_user_verification_token(user_uid=user_uid)
 
-    if stored_token is None:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="token is invalid"
-        )
+async def verify_user(token: str):
 
-    if stored_token == token:
-        await get_user(user_uid=UUID(user_uid))
-        redis_utils.remove_user_verification_token(user_uid=user_uid)
-        redis_utils.remove_verification_token_user(token=token)
-        return await user_db_handler.update_user(
-            user_uid=UUID(user_uid), user_update=schemas.UserUpdate(is_verified=True)
-        )
-    else:
+    user_uid = await redis_utils.consume_verification_token(token=token)
+
+    if user_uid is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="token is invalid/expired"
         )
 
+    await get_user(user_uid=UUID(user_uid))
+    return await user_db_handler.update_user(
+        user_uid=UUID(user_uid), user_update=schemas.UserUpdate(is_verified=True)
+    )
+
 
 async def resend_verification_token(email: str):
 
@@ -158,11 +162,11 @@ async def resend_verification_token(email: str):
             status_code=status.HTTP_400_BAD_REQUEST, detail="user is already verified"
         )
     user_token = gr_token_gen()
-    redis_utils.add_user_verification_token(
+    await redis_utils.add_user_verification_token(
         user_uid=user_profile.user_uid, token=user_token
     )
 
-    await send_mail(
+    await enqueue_mail(
         subject="Verify your account on The Accountant",
         reciepients=[user_profile.email],
         payload={"token": user_token},
@@ -173,9 +177,13 @@ async def resend_verification_token(email: str):
 
 
 async def logout(access_token: str, refresh_token: str):
+    auth_utils.forget_verified_token(token=access_token)
 
-    redis_utils.add_token_blacklist(
-        access_token=access_token, refresh_token=refresh_token
+    await blacklist_utils.revoke_tokens(
+        token_ttls={
+            access_token: auth_utils.token_ttl(token=access_token),
+            refresh_token: auth_utils.token_ttl(token=refresh_token, refresh=True),
+        }
     )
 
     return {}
@@ -186,18 +194,23 @@ async def login(login_cred: schemas.Login):
 
     user_profile = await check_user(email=login_cred.email)
 
-    if (
-        auth_utils.verify_password(
-            plain_password=login_cred.password, hashed_password=user_profile.password
-        )
-        is False
-    ):
+    is_valid, new_hash = await auth_utils.verify_and_update_password(
+        plain_password=login_cred.password, hashed_password=user_profile.password
+    )
+
+    if is_valid is False:
 
         raise HTTPException(
-            status=status.HTTP_401_UNAUTHORIZED,
+            status_code=status.HTTP_401_UNAUTHORIZED,
             detail="invalid email or password credential",
         )
 
+    if new_hash:
+        await user_db_handler.update_user(
+            user_uid=user_profile.user_uid,
+            user_update=schemas.UserUpdate(password=new_hash),
+        )
+
     if user_profile.is_verified is False:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="user is not verified"
@@ -236,9 +249,9 @@ async def forgot_password(email: str):
     # Create a Token 4 OTP
     token = gr_token_gen()
 
-    redis_utils.add_forget_token(token=token, email=email)
+    await redis_utils.add_forget_token(token=token, email=email)
     # send mail
-    await send_mail(
+    await enqueue_mail(
         subject="Forgot Password",
         reciepients=[email],
         payload={"token": token},
@@ -248,7 +261,7 @@ async def forgot_password(email: str):
 
 
 async def reset_password(token: str, new_password: str):
-    email = redis_utils.get_forget_token(token=token)
+    email = await redis_utils.consume_forget_token(token=token)
 
     if not email:
         raise HTTPException(
@@ -257,24 +270,15 @@ async def reset_password(token: str, new_password: str):
 
     user_profile = await check_user(email=email)
 
-    new_password = auth_utils.hash_password(plain_password=new_password)
+    new_password = await auth_utils.hash_password(plain_password=new_password)
     updated_user_profile = await update_user(
         user_update=schemas.UserUpdate(password=new_password),
         user_uid=user_profile.user_uid,
     )
 
-    redis_utils.delete_forget_token(token=token)
     return updated_user_profile
 
 
-async def all_user_update(user_uids: UUID):
-
-    return await user_db_handler.all_user_update(
-        user_uids=user_uids,
-        user_updates=[schemas.UserUpdate(is_alive=False)] * len(user_uids),
-    )
-
-
 ########################################## User Group ##########################################################
 
 
@@ -356,7 +360,7 @@ async def change_password(old_password: str, new_password: str, user_uid: UUID):
     user_profile = await check_user(user_uid=user_uid)
 
     if (
-        auth_utils.verify_password(
+        await auth_utils.verify_password(
             plain_password=old_password, hashed_password=user_profile.password
         )
         is False
@@ -365,7 +369,7 @@ async def change_password(old_password: str, new_password: str, user_uid: UUID):
             status_code=status.HTTP_400_BAD_REQUEST, detail="incorrect information"
         )
 
-    user_profile.password = auth_utils.hash_password(plain_password=new_password)
+    user_profile.password = await auth_utils.hash_password(plain_password=new_password)
     return await update_user(
         user_uid=user_uid,
         user_update=schemas.UserUpdate(password=user_profile.password),
@@ -390,23 +394,27 @@ async def dependent_check(email: str, user_group_uid: UUID):
 
 async def add_dependent(emails: list[str], user_group_uid: UUID):
 
-    uninvited = []
-    for email in emails:
-
-        try:
-            await dependent_check(email=email, user_group_uid=user_group_uid)
-        except NotFoundError:
+    emails = list(dict.fromkeys(email.strip().lower() for email in emails))
 
-            uninvited.append(
-                schemas.UserGroupInvitation(email=email, user_group_uid=user_group_uid)
-            )
-    if len(uninvited) == 0:
+    invited = await user_db_handler.create_dependent(
+        user_g_iv=[
+            schemas.UserGroupInvitation(email=email, user_group_uid=user_group_uid)
+            for email in emails
+        ]
+    )
+    if invited.result_size == 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="all dependents have been added previously",
         )
 
-    return await user_db_handler.create_dependent(user_g_iv=uninvited)
+    invited_emails = {dependent.email for dependent in invited.result_set}
+
+    return schemas.DependentInvitationResult(
+        result_set=invited.result_set,
+        result_size=invited.result_size,
+        already_invited=[email for email in emails if email not in invited_emails],
+    )
 
 
 async def get_dependents(user_group_uid: UUID):
@@ -435,57 +443,100 @@ async def update_dependent(
     dependent_invitation: schemas.UserGroupInvitationUpdate,
 ):
 
-    await get_dependent(user_group_uid=user_group_uid, uid=uid)
+    if dependent_invitation.email:
+        dependent_invitation.email = dependent_invitation.email.lower()
 
-    return await user_db_handler.update_dependent(
-        user_group_uid=user_group_uid,
-        uid=uid,
-        dependent_invitation_update=dependent_invitation,
-    )
+    try:
+        return await user_db_handler.update_dependent(
+            user_group_uid=user_group_uid,
+            uid=uid,
+            dependent_invitation_update=dependent_invitation,
+        )
 
+    except NotFoundError:
 
-async def delete_dependent(uid: UUID, user_group_uid: UUID):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="record of invitation not found",
+        )
 
-    await get_dependent(user_group_uid=user_group_uid, uid=uid)
+    except UpdateError:
 
-    await user_db_handler.delete_dependent(user_group_uid=user_group_uid, uid=uid)
-    return {}
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="dependent has been added previously",
+        )
 
 
-##################################  ACTIONS #####################################################
+async def delete_dependent(uid: UUID, user_group_uid: UUID):
 
+    try:
+        await user_db_handler.delete_dependent(user_group_uid=user_group_uid, uid=uid)
 
-async def send_invitation():
+    except DeleteError:
+
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="record of invitation not found",
+        )
 
-    user_profiles = await user_db_handler.get_all_user()
+    return {}
 
-    for user_profile in user_profiles:
 
-        # This can be lazy loaded to make this on true loop
+##################################  ACTIONS #####################################################
 
-        # user_dependents =
-        await get_dependents(user_group_uid=user_profile.user_group.user_group_uid)
 
-        # dependent_emails = [dependent.email for dependent in user_dependents.result_set]
+async def send_invitation():
+    """Remind every pending dependent to join the user group that invited them."""
 
-        # ug_token = auth_utils.sign_token(jwt_token=str(user_profile.user_group_uid))
+    mails = []
 
-        # TODO Send to Mailer Job
+    invitations = user_db_handler.stream_pending_invitations(
+        batch_size=settings.invitation_batch_size
+    )
+    async for user_group_uid, owner_name, emails in invitations:
+        ug_token = auth_utils.sign_token(jwt_token=str(user_group_uid))
+
+        mails.extend(
+            {
+                "subject": f"{owner_name} invited you to The Accountant",
+                "reciepients": [email],
+                "payload": {"token": ug_token},
+                "template": "user_auth/token_email_template.html",
+            }
+            for email in emails
+        )
 
+        if len(mails) >= settings.invitation_batch_size:
+            await enqueue_mails(mails=mails)
+            mails = []
 
-async def update_all_to_non_alive_users():
+    await enqueue_mails(mails=mails)
 
-    user_profiles = await user_db_handler.get_all_user(is_alive=True)
-    user_uids = []
-    user_emails = []
 
-    for user in user_profiles:
-        user_uids.append(user.user_uid)
-        user_emails.append(user.email)
+async def update_all_to_non_alive_users():
+    """Reset every user to not alive and mail each one an i_am_alive token.
 
-    await all_user_update(user_uids=user_uids)
+    Batches are committed before their mails are queued, so a crash between
+    the two can leave a batch unmailed but never mails an unchanged user.
+    """
 
-    # send to Mail JOB
+    async for users in user_db_handler.sweep_alive_users(
+        batch_size=settings.liveness_sweep_batch_size
+    ):
+        await enqueue_mails(
+            mails=[
+                {
+                    "subject": "Are you still there? Confirm on The Accountant",
+                    "reciepients": [user.email],
+                    "payload": {
+                        "token": auth_utils.sign_token(jwt_token=str(user.user_uid))
+                    },
+                    "template": "user_auth/token_email_template.html",
+                }
+                for user in users
+            ]
+        )
 
     # Send PUSH NOTIFICATION
 
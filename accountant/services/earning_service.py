@@ -1,8 +1,18 @@
 import accountant.schemas.earning_schemas as schemas
 import accountant.database.handlers.earning_handler as earning_handler
 from fastapi import HTTPException, status
-from accountant.services.service_utils.accountant_exceptions import NotFoundError
+from accountant.services.service_utils.accountant_exceptions import (
+    DeleteError,
+    NotFoundError,
+    UpdateError,
+)
+from accountant.root.utils.abstract_schema import CountMode
+from accountant.services.service_utils.pagination_utils import (
+    DEFAULT_PAGE_SIZE,
+    decode_cursor,
+)
 from datetime import date
+from typing import Optional
 from uuid import UUID
 
 
@@ -18,9 +28,19 @@ async def create_earning_records(user_uid: UUID, earning_set: list[schemas.Earni
     return await earning_handler.create_earning(earnings=earnings)
 
 
-async def get_earnings(user_uid: UUID, **kwargs):
+async def get_earnings(
+    user_uid: UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    count_mode: CountMode = CountMode.exact,
+):
 
-    return await earning_handler.get_earnings(user_uid=user_uid, **kwargs)
+    return await earning_handler.get_earnings(
+        user_uid=user_uid,
+        limit=limit,
+        after=decode_cursor(cursor=after) if after else None,
+        count_mode=count_mode,
+    )
 
 
 async def get_earning(user_uid: UUID, earning_uid: UUID):
@@ -40,16 +60,26 @@ async def update_earning(
     user_uid: UUID, earning_uid: UUID, earning_update: schemas.EarningUpdate
 ):
 
-    await get_earning(user_uid=user_uid, earning_uid=earning_uid)
+    try:
+        return await earning_handler.update_earning(
+            user_uid=user_uid, earning_uid=earning_uid, earn_update=earning_update
+        )
 
-    return await earning_handler.update_earning(
-        earning_uid=earning_uid, earn_update=earning_update
-    )
+    except UpdateError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="earning not found"
+        )
 
 
 async def delete_earning(user_uid: UUID, earning_uid: UUID):
-    await get_earning(user_uid=user_uid, earning_uid=earning_uid)
-    await earning_handler.delete_earning(earning_uid=earning_uid)
+
+    try:
+        await earning_handler.delete_earning(user_uid=user_uid, earning_uid=earning_uid)
+
+    except DeleteError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="earning not found"
+        )
 
     return {}
 
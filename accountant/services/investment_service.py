@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
@@ -7,42 +8,40 @@ import accountant.schemas.investment_schemas as schemas
 import accountant.services.auth_service as user_service
 import accountant.services.service_utils.auth_utils as auth_utils
 import accountant.services.service_utils.investment_utils as investment_utils
-from accountant.services.service_utils.accountant_exceptions import NotFoundError
-
-
-async def check_platform(platform_name: str, user_group_uid: UUID):
-
-    try:
-        return await investment_handler.check_platform(
-            name=platform_name, user_group_uid=user_group_uid
-        )
-
-    except NotFoundError as e:
-        raise e
+from accountant.services.service_utils.accountant_exceptions import (
+    CreateError,
+    DeleteError,
+    NotFoundError,
+    UpdateError,
+)
+from accountant.root.utils.abstract_schema import CountMode
+from accountant.services.service_utils.pagination_utils import (
+    DEFAULT_PAGE_SIZE,
+    decode_cursor,
+)
 
 
 async def create_platform(user_group_uid: UUID, platform: schemas.Platform):
 
     platform.name = platform.name.lower()
 
-    try:
-        await check_platform(platform_name=platform.name, user_group_uid=user_group_uid)
-        raise HTTPException(
-            detail="user has added this platform",
-            status_code=status.HTTP_400_BAD_REQUEST,
-        )
-    except NotFoundError:
-
-        # Encoding the platform access credentials.
+    # Encoding the platform access credentials.
 
-        platform = investment_utils.platform_encoder(
-            platform=platform, user_group_uid=user_group_uid
-        )
+    platform = investment_utils.platform_encoder(
+        platform=platform, user_group_uid=user_group_uid
+    )
 
+    try:
         return await investment_handler.create_platform_record(
             user_group_uid=user_group_uid, platform=platform
         )
 
+    except CreateError:
+        raise HTTPException(
+            detail="user has added this platform",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
 
 async def get_platforms(user_group_uid: UUID):
 
@@ -63,6 +62,20 @@ async def get_platform(user_group_uid: UUID, platform_uid: UUID):
         )
 
 
+async def check_platform_owner(user_group_uid: UUID, platform_uid: UUID):
+
+    try:
+        await investment_handler.check_platform_owner(
+            user_group_uid=user_group_uid, platform_uid=platform_uid
+        )
+
+    except NotFoundError:
+
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="platform is not found"
+        )
+
+
 async def decode_platform(
     user_group_uid: UUID, platform_uid: UUID, user_password: str, user_uid: UUID
 ):
@@ -74,7 +87,7 @@ async def decode_platform(
     user_profile = await user_service.check_user(user_uid=user_uid)
 
     if (
-        auth_utils.verify_password(
+        await auth_utils.verify_password(
             plain_password=user_password, hashed_password=user_profile.password
         )
         is False
@@ -91,30 +104,47 @@ async def update_platform(
     user_group_uid: UUID, platform_uid: UUID, platform_update: schemas.PlatformUpdate
 ):
 
-    await get_platform(user_group_uid=user_group_uid, platform_uid=platform_uid)
+    # Normalized as on create, so the unique index compares like with like.
+    if platform_update.name is not None:
+        platform_update.name = platform_update.name.lower()
 
-    return await investment_handler.update_platform(
-        platform_uid=platform_uid, platform_update=platform_update
-    )
+    try:
+        return await investment_handler.update_platform(
+            user_group_uid=user_group_uid,
+            platform_uid=platform_uid,
+            platform_update=platform_update,
+        )
 
+    except NotFoundError:
 
-async def delete_platform(user_group_uid: UUID, platform_uid: UUID):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="platform is not found"
+        )
 
-    await get_platform(user_group_uid=user_group_uid, platform_uid=platform_uid)
+    except UpdateError:
 
-    await investment_handler.delete_platform(platform_uid=platform_uid)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="platform already exists"
+        )
 
-    return {}
 
+async def delete_platform(user_group_uid: UUID, platform_uid: UUID):
 
-# ######################################### Investment ##################################################
+    try:
+        await investment_handler.delete_platform(
+            user_group_uid=user_group_uid, platform_uid=platform_uid
+        )
 
+    except DeleteError:
 
-async def check_investment(plan_name: str, platform_uid: UUID, user_group_uid: UUID):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="platform is not found"
+        )
 
-    return await investment_handler.check_investment(
-        plan_name=plan_name, platform_uid=platform_uid, user_group_uid=user_group_uid
-    )
+    return {}
+
+
+# ######################################### Investment ##################################################
 
 
 async def create_investment(
@@ -124,27 +154,38 @@ async def create_investment(
     investment.plan_name = investment.plan_name.capitalize().strip()
 
     try:
-        await check_investment(
-            plan_name=investment.plan_name,
+        return await investment_handler.create_investment(
+            investment=investment,
             platform_uid=platform_uid,
             user_group_uid=user_group_uid,
         )
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="plan already exists"
+
+    except CreateError:
+        # Only a failed insert pays for telling the two causes apart.
+        await check_platform_owner(
+            user_group_uid=user_group_uid, platform_uid=platform_uid
         )
-    except NotFoundError:
 
-        return await investment_handler.create_investment(
-            investment=investment,
-            platform_uid=platform_uid,
-            user_group_uid=user_group_uid,
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="plan already exists"
         )
 
 
-async def get_investments(platform_uid: UUID, user_group_uid: UUID):
-    await get_platform(user_group_uid=user_group_uid, platform_uid=platform_uid)
+async def get_investments(
+    platform_uid: UUID,
+    user_group_uid: UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    count_mode: CountMode = CountMode.exact,
+):
+    await check_platform_owner(user_group_uid=user_group_uid, platform_uid=platform_uid)
 
-    return await investment_handler.get_investments(platform_uid=platform_uid)
+    return await investment_handler.get_investments(
+        platform_uid=platform_uid,
+        limit=limit,
+        after=decode_cursor(cursor=after) if after else None,
+        count_mode=count_mode,
+    )
 
 
 async def get_investment_via_investment_uid(investment_uid: UUID):
@@ -158,7 +199,7 @@ async def get_investment(
     platform_uid: UUID, user_group_uid: UUID, investment_uid: UUID
 ):
 
-    await get_platform(user_group_uid=user_group_uid, platform_uid=platform_uid)
+    await check_platform_owner(user_group_uid=user_group_uid, platform_uid=platform_uid)
 
     try:
         return await investment_handler.get_investment(
@@ -175,29 +216,47 @@ async def get_investment(
 async def update_investment(
     platform_uid: UUID,
     investment_uid: UUID,
+    user_group_uid: UUID,
     investment_update: schemas.InvestmentUpdate,
 ):
 
-    await get_investment(platform_uid=platform_uid, investment_uid=investment_uid)
+    if investment_update.plan_name is not None:
+        investment_update.plan_name = investment_update.plan_name.capitalize().strip()
 
-    return await investment_handler.update_investment(
-        investment_uid=investment_uid, investment_update=investment_update
-    )
+    try:
+        return await investment_handler.update_investment(
+            user_group_uid=user_group_uid,
+            platform_uid=platform_uid,
+            investment_uid=investment_uid,
+            investment_update=investment_update,
+        )
+
+    except NotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="investment plan not found"
+        )
+
+    except UpdateError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="plan already exists"
+        )
 
 
 async def delete_investment(
     platform_uid: UUID, investment_uid: UUID, user_group_uid: UUID
 ):
 
-    await get_investment(
-        platform_uid=platform_uid,
-        user_group_uid=user_group_uid,
-        investment_uid=investment_uid,
-    )
+    try:
+        await investment_handler.delete_investment(
+            user_group_uid=user_group_uid,
+            platform_uid=platform_uid,
+            investment_uid=investment_uid,
+        )
 
-    await investment_handler.delete_investment(
-        investment_uid=investment_uid, user_group_uid=user_group_uid
-    )
+    except DeleteError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="investment plan not found"
+        )
 
     return {}
 
@@ -212,38 +271,53 @@ async def create_investment_tracker(
     investment_tracker: schemas.InvestmentTracker,
 ):
 
-    await get_investment(
-        investment_uid=investment_uid,
-        user_group_uid=user_group_uid,
-        platform_uid=platform_uid,
-    )
+    try:
+        return await investment_handler.create_investment_tracker(
+            user_group_uid=user_group_uid,
+            platform_uid=platform_uid,
+            investment_uid=investment_uid,
+            investment_tracker=investment_tracker,
+        )
 
-    return await investment_handler.create_investment_tracker(
-        investment_uid=investment_uid, investment_tracker=investment_tracker
-    )
+    except NotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="investment plan not found"
+        )
 
 
 async def get_investment_trackers(
     investment_uid: UUID,
     user_group_uid: UUID,
     platform_uid: UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    count_mode: CountMode = CountMode.exact,
 ):
 
-    await get_investment(
-        investment_uid=investment_uid,
-        user_group_uid=user_group_uid,
-        platform_uid=platform_uid,
-    )
+    try:
+        return await investment_handler.get_investment_trackers(
+            user_group_uid=user_group_uid,
+            platform_uid=platform_uid,
+            investment_uid=investment_uid,
+            limit=limit,
+            after=decode_cursor(cursor=after) if after else None,
+            count_mode=count_mode,
+        )
 
-    return await investment_handler.get_investment_trackers(
-        investment_uid=investment_uid
-    )
+    except NotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="investment plan not found"
+        )
 
 
-async def get_investment_tracker(investment_uid: UUID, tracker_uid: UUID):
+async def get_investment_tracker(
+    user_group_uid: UUID, investment_uid: UUID, tracker_uid: UUID
+):
     try:
         return await investment_handler.get_investment_tracker(
-            investment_uid=investment_uid, uid=tracker_uid
+            user_group_uid=user_group_uid,
+            investment_uid=investment_uid,
+            uid=tracker_uid,
         )
 
     except NotFoundError:
@@ -254,80 +328,46 @@ async def get_investment_tracker(investment_uid: UUID, tracker_uid: UUID):
 
 
 async def update_investment_tracker(
+    user_group_uid: UUID,
     investment_uid: UUID,
     tracker_uid: UUID,
     investment_tracker_update: schemas.InvestmentTracker,
 ):
 
-    await get_investment_tracker(
-        investment_uid=investment_uid,
-        tracker_uid=tracker_uid,
-    )
+    try:
+        return await investment_handler.update_investment_tracker(
+            user_group_uid=user_group_uid,
+            investment_uid=investment_uid,
+            uid=tracker_uid,
+            investment_tracker_update=investment_tracker_update,
+        )
 
-    return await investment_handler.update_investment_tracker(
-        uid=tracker_uid, investment_tracker_update=investment_tracker_update
-    )
+    except UpdateError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="investment tracker record not found",
+        )
 
 
-async def delete_invest_tracker(investment_uid: UUID, tracker_uid: UUID):
-    await get_investment_tracker(investment_uid=investment_uid, tracker_uid=tracker_uid)
+async def delete_invest_tracker(
+    user_group_uid: UUID, investment_uid: UUID, tracker_uid: UUID
+):
+    try:
+        await investment_handler.delete_investment_tracker(
+            user_group_uid=user_group_uid,
+            investment_uid=investment_uid,
+            uid=tracker_uid,
+        )
 
-    await investment_handler.delete_investment_tracker(uid=tracker_uid)
+    except DeleteError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="investment tracker record not found",
+        )
 
     return {}
 
 
 async def investment_dashboard(user_group_uid: UUID):
 
-    investment_dashboard_profile = {}
-
-    platform_profiles = await get_platforms(user_group_uid=user_group_uid)
-
-    for platform in platform_profiles.result_set:
-
-        if investment_dashboard_profile.get(platform.name) is None:
-            investment_dashboard_profile[platform.name] = {
-                "cash_in": {},
-                "cash_out": {},
-            }
-
-        for plans in platform.investment_plans:
-            for tracker in plans.activities:
-
-                if tracker.transaction_type == schemas.TransactionType.credit.value:
-
-                    if (
-                        investment_dashboard_profile[platform.name]["cash_in"].get(
-                            tracker.currency
-                        )
-                        is None
-                    ):
-
-                        investment_dashboard_profile[platform.name]["cash_in"][
-                            tracker.currency
-                        ] = tracker.amount
-
-                    else:
-                        investment_dashboard_profile[platform.name]["cash_in"][
-                            tracker.currency
-                        ] += tracker.amount
-
-                else:
-
-                    if (
-                        investment_dashboard_profile[platform.name]["cash_in"].get(
-                            tracker.currency
-                        )
-                        is None
-                    ):
-
-                        investment_dashboard_profile[platform.name]["cash_in"][
-                            tracker.currency
-                        ] = tracker.amount
-
-                    else:
-                        investment_dashboard_profile[platform.name]["cash_in"][
-                            tracker.currency
-                        ] += tracker.amount
-
-    return schemas.InvestmentDashboard(result=investment_dashboard_profile)
+    return await investment_handler.investment_dashboard(user_group_uid=user_group_uid)
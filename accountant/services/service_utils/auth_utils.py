@@ -1,5 +1,11 @@
+import asyncio
+import hashlib
+import hmac
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional
 from uuid import UUID
 import jwt
 from jwt.exceptions import InvalidTokenError, InvalidSignatureError
@@ -14,23 +20,59 @@ from itsdangerous import (
 from passlib.context import CryptContext
 import accountant.services.auth_service as user_service
 
-import accountant.services.service_utils.redis_utils as redis_utils
+import accountant.services.service_utils.blacklist_utils as blacklist_utils
 from accountant.root.settings import Settings
+from accountant.root.utils.lru_cache import LRUCache
 from accountant.schemas.user_schemas import TokenData, UserExtendedProfile
 
 LOGGER = logging.getLogger(__name__)
 settings = Settings()
 
 # PASSWORD HASHING AND VALIDATOR
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min and max to the configured cost makes verify_and_update flag
+# hashes made at any other cost, whichever way the setting moved.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.password_hash_rounds,
+    bcrypt__min_rounds=settings.password_hash_rounds,
+    bcrypt__max_rounds=settings.password_hash_rounds,
+)
+
+# bcrypt releases the GIL, so a small thread pool hashes in parallel while the
+# event loop keeps serving. The semaphore queues callers on the loop rather
+# than piling work into the executor.
+PASSWORD_HASH_POOL = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers, thread_name_prefix="password-hash"
+)
+PASSWORD_HASH_SLOTS = asyncio.Semaphore(settings.password_hash_workers)
+
+
+async def run_password_hasher(fn, *args):
+    async with PASSWORD_HASH_SLOTS:
+        return await asyncio.get_running_loop().run_in_executor(
+            PASSWORD_HASH_POOL, fn, *args
+        )
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await run_password_hasher(
+        pwd_context.verify, plain_password, hashed_password
+    )
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """(valid, new_hash); new_hash is set when the stored hash used another cost."""
+
+    return await run_password_hasher(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
 
 
-def hash_password(plain_password: str) -> str:
-    return pwd_context.hash(plain_password)
+async def hash_password(plain_password: str) -> str:
+    return await run_password_hasher(pwd_context.hash, plain_password)
 
 
 # AUTHENTICATION
@@ -42,59 +84,136 @@ REFRESH_SECRET_KEY = settings.ref_jwt_secret_key
 REFRESH_TOKEN_EXPIRE_MINUTES = 60 * 60 * 24 * 14
 
 
+# Compact tokens are a bare JWT; legacy ones wrap the JWT in an itsdangerous
+# signature, whose base64 never starts like a JWT header does.
+COMPACT_TOKEN_PREFIX = "eyJ"
+
+
 # TOP_LEVEL_SIGNER
 ITS_DANGEROUS_TOKEN_KEY = settings.second_signer_key
+TOKEN_SIGNER = URLSafeTimedSerializer(secret_key=ITS_DANGEROUS_TOKEN_KEY)
 
 
 def sign_token(jwt_token: str) -> str:
-    token_signer = URLSafeTimedSerializer(secret_key=ITS_DANGEROUS_TOKEN_KEY)
-    token = token_signer.dumps(obj=jwt_token)
-    return token
+    return TOKEN_SIGNER.dumps(obj=jwt_token)
 
 
-def resolve_token(signed_token: str, max_age: int = None):
-    token_signer = URLSafeTimedSerializer(secret_key=ITS_DANGEROUS_TOKEN_KEY)
+def resolve_token(
+    signed_token: str, max_age: int = None, return_timestamp: bool = False
+):
     try:
-        return token_signer.loads(s=signed_token, max_age=max_age)
+        return TOKEN_SIGNER.loads(
+            s=signed_token, max_age=max_age, return_timestamp=return_timestamp
+        )
     except (BadTimeSignature, BadSignature, SignatureExpired) as e:
         LOGGER.exception(e)
         raise Exception
 
 
-def create_access_token(data: dict):
-    expire = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES) + datetime.utcnow()
+def encode_token(data: dict, key: str, max_age: int) -> str:
+    if settings.token_format == "compact":
+        # max_age is what the legacy signer enforced, in seconds; the JWT exp
+        # alone carries it now.
+        data.update({"exp": datetime.utcnow() + timedelta(seconds=max_age)})
+        return jwt.encode(payload=data, key=key, algorithm=ALGORITHM)
+
+    expire = timedelta(minutes=max_age) + datetime.utcnow()
     data.update({"exp": expire})
-    encoded_jwt = jwt.encode(payload=data, key=SECRET_KEY, algorithm=ALGORITHM)
-    dangerous_access_token = sign_token(jwt_token=encoded_jwt)
+    encoded_jwt = jwt.encode(payload=data, key=key, algorithm=ALGORITHM)
 
-    return dangerous_access_token
+    return sign_token(jwt_token=encoded_jwt)
 
 
-def create_refresh_token(data: dict):
-    expire = timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES) + datetime.utcnow()
-    data.update({"exp": expire})
-    encoded_jwt = jwt.encode(payload=data, key=REFRESH_SECRET_KEY, algorithm=ALGORITHM)
+def decode_token(token: str, key: str, max_age: int) -> tuple[dict, float]:
+    """Check either token format and return (payload, expires_at).
 
-    # add signed_token
-    dangerous_refresh_token = sign_token(jwt_token=encoded_jwt)
-    return dangerous_refresh_token
+    Raises InvalidTokenError for a bad JWT and Exception for a bad legacy
+    outer signature.
+    """
 
+    if token.startswith(COMPACT_TOKEN_PREFIX):
+        payload = jwt.decode(
+            jwt=token, key=key, algorithms=[ALGORITHM], options={"require": ["exp"]}
+        )
+        return payload, payload["exp"]
+
+    jwt_token, signed_at = resolve_token(
+        signed_token=token, max_age=max_age, return_timestamp=True
+    )
+    payload = jwt.decode(jwt=jwt_token, key=key, algorithms=[ALGORITHM])
+
+    return payload, token_expires_at(signed_at, max_age, payload)
+
+
+def token_ttl(token: str, refresh: bool = False) -> int:
+    """Seconds until token stops being accepted, 0 if it already is not.
+
+    A legacy token dies at whichever comes first: the JWT exp, or the top
+    level signer's timestamp plus the max_age verify_*_token passes it.
+    """
+
+    key, max_age = (
+        (REFRESH_SECRET_KEY, REFRESH_TOKEN_EXPIRE_MINUTES)
+        if refresh
+        else (SECRET_KEY, ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
 
-async def verify_access_token(token: str):
-    cache_token = redis_utils.get_token_blacklist(token=token)
-    if cache_token:
-        raise HTTPException(detail="access has been revoked, login", status_code=401)
     try:
-        jwt_token = resolve_token(
-            signed_token=token, max_age=ACCESS_TOKEN_EXPIRE_MINUTES
-        )
+        _, expires_at = decode_token(token=token, key=key, max_age=max_age)
+
     except Exception:
-        LOGGER.error("Access_token top level signer decrypt failed")
+        return 0
 
-        credentials_exception()
+    return max(int(expires_at - time.time()), 0)
+
+
+def token_expires_at(signed_at: datetime, max_age: int, payload: dict) -> float:
+    expires_at = signed_at.timestamp() + max_age
+    if payload.get("exp"):
+        expires_at = min(expires_at, payload["exp"])
+
+    return expires_at
+
+
+# VERIFIED ACCESS TOKENS
+VERIFIED_TOKENS = LRUCache(
+    maxsize=settings.token_cache_size, ttl=settings.token_cache_ttl
+)
+
+
+def verified_token_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def forget_verified_token(token: str):
+    VERIFIED_TOKENS.pop(verified_token_key(token=token))
+
+
+def create_access_token(data: dict):
+    return encode_token(data=data, key=SECRET_KEY, max_age=ACCESS_TOKEN_EXPIRE_MINUTES)
+
+
+def create_refresh_token(data: dict):
+    return encode_token(
+        data=data, key=REFRESH_SECRET_KEY, max_age=REFRESH_TOKEN_EXPIRE_MINUTES
+    )
+
+
+async def verify_access_token(token: str):
+    if await blacklist_utils.is_token_revoked(token=token):
+        raise HTTPException(detail="access has been revoked, login", status_code=401)
+
+    # Revocation is checked above on every request; the cache only skips
+    # re-checking signatures of a token already seen to be valid.
+    cache_key = verified_token_key(token=token)
+    token_data = VERIFIED_TOKENS.get(cache_key)
+    if token_data is not None:
+        return token_data
 
     try:
-        payload = jwt.decode(jwt=jwt_token, key=SECRET_KEY, algorithms=[ALGORITHM])
+        payload, expires_at = decode_token(
+            token=token, key=SECRET_KEY, max_age=ACCESS_TOKEN_EXPIRE_MINUTES
+        )
 
         id: str = payload.get("user_uid")
         if id is None:
@@ -106,6 +225,13 @@ async def verify_access_token(token: str):
         LOGGER.exception(e)
         LOGGER.error("JWT Decryption Error")
         credentials_exception()
+    except HTTPException:
+        raise
+    except Exception:
+        LOGGER.error("Access_token top level signer decrypt failed")
+        credentials_exception()
+
+    VERIFIED_TOKENS.set(cache_key, token_data, ttl=expires_at - time.time())
 
     return token_data
 
@@ -116,22 +242,12 @@ async def ws_access_token(token: str):
 
 
 async def verify_refresh_token(token: str):
-    cache_token = redis_utils.get_token_blacklist(token=token)
-    if cache_token:
+    if await blacklist_utils.is_token_revoked(token=token):
         raise HTTPException(detail="access has been revoked, login", status_code=401)
-    try:
-        jwt_token = resolve_token(
-            signed_token=token, max_age=REFRESH_TOKEN_EXPIRE_MINUTES
-        )
-
-    except Exception:
-        LOGGER.error("Access_token top level signer decrypt failed")
-
-        credentials_exception()
 
     try:
-        payload = jwt.decode(
-            jwt=jwt_token, key=REFRESH_SECRET_KEY, algorithms=ALGORITHM
+        payload, _ = decode_token(
+            token=token, key=REFRESH_SECRET_KEY, max_age=REFRESH_TOKEN_EXPIRE_MINUTES
         )
         id: str = payload.get("user_uid")
         if id is None:
@@ -141,6 +257,11 @@ async def verify_refresh_token(token: str):
     except (InvalidTokenError, InvalidSignatureError) as e:
         LOGGER.exception(e)
         credentials_exception()
+    except HTTPException:
+        raise
+    except Exception:
+        LOGGER.error("Refresh_token top level signer decrypt failed")
+        credentials_exception()
 
     return token_data
 
@@ -173,7 +294,7 @@ async def abstract_token(
 async def get_current_user(
     token: TokenData = Depends(abstract_token),
 ):
-    user = await user_service.get_user(user_uid=token.user_uid)
+    user = await user_service.get_principal(user_uid=token.user_uid)
     if user.is_verified is False:
         raise HTTPException(
             detail="account is not verified",
@@ -183,20 +304,27 @@ async def get_current_user(
     return user
 
 
-async def get_user_group_uid(
-    user_profile: UserExtendedProfile = Depends(get_current_user),
+async def get_operator(
+    auth_credential: HTTPAuthorizationCredentials = Depends(bearer),
 ):
+    # Pool and cache state is operator telemetry; a user's access token does
+    # not open it, only the deployment's metrics token.
+    if not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="not found")
+
+    if not hmac.compare_digest(
+        auth_credential.credentials.encode(), settings.metrics_token.encode()
+    ):
+        credentials_exception()
 
-    if user_profile.added_to_user_group_uid is None:
-
-        user_group = await user_service.get_user_group(user_uid=user_profile.user_uid)
 
-        if user_group.owner_uid != user_profile.user_uid:
-            raise HTTPException(
-                detail="user has no access to this user_group",
-                status_code=status.HTTP_400_BAD_REQUEST,
-            )
+async def get_user_group_uid(
+    user_profile: UserExtendedProfile = Depends(get_current_user),
+):
 
-        return user_group.user_group_uid
+    if user_profile.effective_user_group_uid is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="user group not found"
+        )
 
-    return user_profile.added_to_user_group_uid
+    return user_profile.effective_user_group_uid
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+
+import accountant.services.service_utils.redis_utils as redis_utils
+from accountant.root.settings import Settings
+from accountant.root.utils.bloom_filter import BloomFilter
+
+LOGGER = logging.getLogger(__name__)
+settings = Settings()
+
+SYNC_RETRY_SECONDS = 5
+
+
+class RevokedTokenFilter:
+    """Per-worker Bloom filter of blacklist keys, fed by the revocation stream.
+
+    A miss means the token is not revoked and Redis is skipped; a hit is
+    confirmed against Redis. Until the first load succeeds, or after the
+    stream connection fails, every lookup goes to Redis.
+    """
+
+    def __init__(self):
+        self.bloom = None
+        self.last_id = None
+        self.built_at = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.bloom is not None
+
+    def add(self, key: str):
+        if self.bloom is not None:
+            self.bloom.add(key)
+
+    def might_contain(self, token: str) -> bool:
+        return (
+            redis_utils.black_list_bearer_tokens(access_token=token) in self.bloom
+            or redis_utils.legacy_black_list_bearer_tokens(access_token=token)
+            in self.bloom
+        )
+
+    async def rebuild(self):
+        # Take the stream position first so nothing revoked during the scan
+        # is missed; it is replayed from the stream afterwards.
+        last_id = await redis_utils.get_black_list_stream_head()
+
+        bloom = BloomFilter(
+            capacity=settings.token_bloom_capacity,
+            error_rate=settings.token_bloom_error_rate,
+        )
+        async for key in redis_utils.scan_black_list_keys():
+            bloom.add(key)
+
+        self.bloom, self.last_id, self.built_at = bloom, last_id, time.monotonic()
+        LOGGER.info(f"revoked token filter rebuilt with {bloom.count} keys")
+
+    async def sync_forever(self):
+        while True:
+            try:
+                # Bloom filters cannot forget, so expired keys are shed by a
+                # periodic rebuild.
+                if (
+                    not self.ready
+                    or time.monotonic() - self.built_at
+                    > settings.token_bloom_rebuild_seconds
+                ):
+                    await self.rebuild()
+
+                for entry_id, key in await redis_utils.read_black_list_stream(
+                    last_id=self.last_id
+                ):
+                    self.bloom.add(key)
+                    self.last_id = entry_id
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                LOGGER.exception(e)
+                LOGGER.error("revoked token filter out of sync, using Redis")
+                self.bloom = None
+                await asyncio.sleep(SYNC_RETRY_SECONDS)
+
+
+REVOKED_TOKENS = RevokedTokenFilter()
+
+
+async def is_token_revoked(token: str) -> bool:
+    if REVOKED_TOKENS.ready and not REVOKED_TOKENS.might_contain(token=token):
+        return False
+
+    return bool(await redis_utils.get_token_blacklist(token=token))
+
+
+async def revoke_tokens(token_ttls: dict[str, int]):
+    await redis_utils.add_token_blacklist(token_ttls=token_ttls)
+
+    for token, ttl in token_ttls.items():
+        if ttl > 0:
+            REVOKED_TOKENS.add(redis_utils.black_list_bearer_tokens(access_token=token))
@@ -0,0 +1,37 @@
+def build_dashboard(rows):
+    """Fold (currency, year, month, amount) aggregate rows into the DashBoard shape."""
+
+    summary = {}
+    year_trend = {}
+
+    for currency, year, month, amount in rows:
+
+        summary.setdefault(currency, {})
+        summary[currency][year] = summary[currency].get(year, 0) + amount
+
+        month_trend = year_trend.setdefault(year, {}).setdefault(currency, {})
+
+        if month_trend.get(month) is None:
+            month_trend[month] = {"amount": amount}
+        else:
+            month_trend[month]["amount"] += amount
+
+    return summary, year_trend
+
+
+def build_investment_dashboard(rows):
+    """Fold (platform name, currency, cash_in, cash_out) aggregate rows into the
+    InvestmentDashboard shape. Platforms sharing a name are merged."""
+
+    dashboard = {}
+
+    for name, currency, cash_in, cash_out in rows:
+
+        platform = dashboard.setdefault(name, {"cash_in": {}, "cash_out": {}})
+
+        # A platform without activity still comes back once, with no currency.
+        for side, amount in (("cash_in", cash_in), ("cash_out", cash_out)):
+            if currency is not None and amount is not None:
+                platform[side][currency] = platform[side].get(currency, 0) + amount
+
+    return dashboard
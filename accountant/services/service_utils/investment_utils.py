@@ -4,6 +4,7 @@ from itsdangerous import (
     SignatureExpired,
     URLSafeTimedSerializer,
 )
+from functools import lru_cache
 from uuid import UUID
 import logging
 
@@ -13,14 +14,19 @@ import accountant.schemas.investment_schemas as schemas
 LOGGER = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1024)
+def get_signer(user_group_uid: str) -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(secret_key=user_group_uid)
+
+
 def sign_data(data: str, user_group_uid: UUID) -> str:
-    token_signer = URLSafeTimedSerializer(secret_key=str(user_group_uid))
+    token_signer = get_signer(user_group_uid=str(user_group_uid))
     token = token_signer.dumps(obj=data)
     return token
 
 
 def resolve_token(signed_token: str, user_group_uid: UUID):
-    token_signer = URLSafeTimedSerializer(secret_key=str(user_group_uid))
+    token_signer = get_signer(user_group_uid=str(user_group_uid))
     try:
         return token_signer.loads(s=signed_token)
     except (BadTimeSignature, BadSignature, SignatureExpired) as e:
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import List
+
+import accountant.services.service_utils.redis_utils as redis_utils
+from accountant.root.settings import Settings
+from accountant.root.utils.mailer import SMTPMailer, render_mail
+
+LOGGER = logging.getLogger(__name__)
+settings = Settings()
+
+WORKER_RETRY_SECONDS = 5
+MAX_RETRY_DELAY = 60 * 60
+
+
+def mail_job(subject: str, reciepients: List[str], payload: dict, template: str):
+    return json.dumps(
+        {
+            "id": str(uuid.uuid4()),
+            "subject": subject,
+            "reciepients": reciepients,
+            "payload": payload,
+            "template": template,
+            "attempts": 0,
+        },
+        default=str,
+    )
+
+
+async def enqueue_mail(
+    subject: str, reciepients: List[str], payload: dict, template: str
+):
+    """Queue a templated mail on the outbox; delivery happens in mail_worker."""
+
+    await redis_utils.add_mail_jobs(
+        jobs=[mail_job(subject, reciepients, payload, template)]
+    )
+
+
+async def enqueue_mails(mails: List[dict]):
+    """Queue many mails in one round trip; each item takes enqueue_mail's
+    arguments."""
+
+    if mails:
+        await redis_utils.add_mail_jobs(jobs=[mail_job(**mail) for mail in mails])
+
+
+def retry_delay(attempts: int) -> float:
+    delay = settings.mail_outbox_retry_seconds * 2 ** (attempts - 1)
+    return min(delay, MAX_RETRY_DELAY)
+
+
+class MailOutboxWorker:
+    """Drains the outbox stream as one member of the mail consumer group.
+
+    Each batch goes out over a single SMTP session. Failed jobs are retried
+    with exponential backoff and land on the dead-letter stream after
+    mail_outbox_max_attempts.
+    """
+
+    def __init__(self, consumer: str, mailer: SMTPMailer = None):
+        self.consumer = consumer
+        self.mailer = mailer or SMTPMailer()
+
+    async def next_batch(self):
+        batch_size = settings.mail_outbox_batch_size
+
+        await redis_utils.release_due_mail_retries(now=time.time(), count=batch_size)
+
+        return await redis_utils.claim_stale_mail_jobs(
+            consumer=self.consumer,
+            min_idle=settings.mail_outbox_claim_idle_seconds * 1000,
+            count=batch_size,
+        ) or await redis_utils.read_mail_outbox(
+            consumer=self.consumer, count=batch_size
+        )
+
+    async def deliver(self, entries: list[tuple[str, str]]):
+        retries, dead = {}, []
+
+        for entry_id, raw_job in entries:
+            try:
+                job = json.loads(raw_job)
+                message = render_mail(
+                    subject=job["subject"],
+                    reciepients=job["reciepients"],
+                    payload=job["payload"],
+                    template=job["template"],
+                )
+
+            except Exception as e:
+                LOGGER.exception(e)
+                LOGGER.error(f"mail job {entry_id} is malformed, dead-lettering")
+                dead.append(raw_job or "")
+                continue
+
+            try:
+                await self.mailer.send(message)
+                LOGGER.info("mail sent")
+
+            except Exception as e:
+                LOGGER.exception(e)
+                job["attempts"] += 1
+
+                if job["attempts"] >= settings.mail_outbox_max_attempts:
+                    LOGGER.error(
+                        f"mail failed to send for {job['payload']}, "
+                        f"with subject: {job['subject']}"
+                    )
+                    dead.append(json.dumps(job))
+                else:
+                    retries[json.dumps(job)] = time.time() + retry_delay(
+                        job["attempts"]
+                    )
+
+        await redis_utils.settle_mail_jobs(
+            entry_ids=[entry_id for entry_id, _ in entries], retries=retries, dead=dead
+        )
+
+    async def run_forever(self):
+        await redis_utils.create_mail_outbox_group()
+
+        try:
+            while True:
+                try:
+                    entries = await self.next_batch()
+                    if entries:
+                        await self.deliver(entries)
+
+                except asyncio.CancelledError:
+                    raise
+
+                except Exception as e:
+                    LOGGER.exception(e)
+                    await asyncio.sleep(WORKER_RETRY_SECONDS)
+
+        finally:
+            await self.mailer.close()
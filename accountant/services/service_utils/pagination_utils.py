@@ -0,0 +1,173 @@
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, null, select, true, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+import accountant.services.service_utils.redis_utils as redis_utils
+from accountant.root.database import after_commit
+from accountant.root.utils.abstract_schema import CountMode
+from accountant.services.service_utils.accountant_exceptions import NotFoundError
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(date_created_utc: datetime, uid: UUID) -> str:
+    raw = json.dumps([date_created_utc.isoformat(), str(uid)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        date_created_utc, uid = json.loads(raw)
+        return datetime.fromisoformat(date_created_utc), UUID(uid)
+
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="invalid page cursor"
+        )
+
+
+def keyset_page(stmt, created_column, uid_column, limit: int, after=None):
+    """Newest first, one extra row so the caller knows whether a next page exists."""
+
+    if after is not None:
+        stmt = stmt.filter(tuple_(created_column, uid_column) < tuple_(*after))
+
+    return stmt.order_by(created_column.desc(), uid_column.desc()).limit(limit + 1)
+
+
+def page_rows(rows, limit: int, uid_field: str):
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last_row = rows[-1]
+
+    return rows, encode_cursor(
+        date_created_utc=last_row.date_created_utc, uid=getattr(last_row, uid_field)
+    )
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, keeping its bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, stmt):
+        self.stmt = stmt
+
+
+@compiles(Explain, "postgresql")
+def compile_explain(element, compiler, **kwargs):
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.stmt, **kwargs)}"
+
+
+async def estimate_count(session, total_stmt) -> int:
+    """Planner row estimate for total_stmt; reads statistics, never the rows."""
+
+    plan = (await session.execute(statement=Explain(total_stmt))).scalar()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def fetch_page(
+    session,
+    stmt,
+    total_stmt,
+    created_column,
+    uid_column,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after=None,
+    count_mode: CountMode = CountMode.exact,
+    count_key: str = None,
+    scope=None,
+):
+    """Fetch one keyset page and the owner's total.
+
+    In exact mode the total rides along as a scalar subquery column of the page
+    query, so rows and count come back in one round trip while the page itself
+    still stops at the LIMIT. An empty page has nowhere to carry it, so the
+    total is counted on its own there. cached serves the total from Redis;
+    creates and deletes drop the key, but changes that move a row between
+    lists (e.g. cascades) can show for up to LIST_COUNT_EXPIRE seconds.
+    estimated asks the planner instead of counting.
+
+    scope is an optional EXISTS the parent collection must pass (e.g. it
+    belongs to the caller). It is checked inside the page query, and
+    NotFoundError is raised when it fails, so a missing parent is not
+    reported as an empty page.
+    """
+
+    result_size = None
+
+    if count_mode == CountMode.cached and count_key:
+        result_size = await redis_utils.get_list_count(key=count_key)
+
+    elif count_mode == CountMode.estimated:
+        result_size = await estimate_count(session=session, total_stmt=total_stmt)
+
+    if scope is not None:
+        stmt = stmt.filter(scope)
+
+    stmt = keyset_page(
+        stmt=stmt,
+        created_column=created_column,
+        uid_column=uid_column,
+        limit=limit,
+        after=after,
+    )
+
+    total = select(func.count()).select_from(total_stmt.subquery()).scalar_subquery()
+    counted = result_size is None
+
+    if counted:
+        stmt = stmt.add_columns(total.label("result_size"))
+
+        rows = (await session.execute(statement=stmt)).all()
+
+        result_size = rows[0].result_size if rows else None
+        rows = [row[0] for row in rows]
+
+    else:
+        rows = (await session.execute(statement=stmt)).scalars().all()
+
+    if not rows and (counted or scope is not None):
+        # An empty page has no row to carry the total or vouch for the scope;
+        # this also keeps a cursor past the end apart from an empty collection.
+        in_scope, empty_total = (
+            await session.execute(
+                statement=select(
+                    true() if scope is None else scope,
+                    total if counted else null(),
+                )
+            )
+        ).one()
+
+        if not in_scope:
+            raise NotFoundError
+
+        if counted:
+            result_size = empty_total
+
+    if counted and count_mode == CountMode.cached and count_key:
+        await redis_utils.set_list_count(key=count_key, count=result_size)
+
+    rows, next_cursor = page_rows(rows=rows, limit=limit, uid_field=uid_column.key)
+
+    return rows, next_cursor, result_size
+
+
+async def forget_counts(*count_keys: str):
+    """Drop cached totals once the rows that changed them are committed."""
+
+    await after_commit(lambda: redis_utils.delete_list_counts(keys=count_keys))
@@ -1,5 +1,8 @@
+import hashlib
 from uuid import UUID
 
+from redis.exceptions import ResponseError
+
 import accountant.root.redis_manager as redis_bq
 
 
@@ -13,78 +16,283 @@ def forget_key_generator(token: int):
     return f"Forget-Key-{token}"
 
 
-def add_forget_token(token: int, email: str):
+async def add_forget_token(token: int, email: str):
     key = forget_key_generator(token=token)
 
-    return redis_bq.acc_redis.set(name=key, value=email, ex=FORGET_PASSWORD_EXPIRE)
+    return await redis_bq.acc_redis.set(
+        name=key, value=email, ex=FORGET_PASSWORD_EXPIRE
+    )
 
 
-def get_forget_token(token: int):
+async def consume_forget_token(token: int):
     key = forget_key_generator(token=token)
 
-    return redis_bq.acc_redis.get(name=key)
+    return await redis_bq.acc_redis.getdel(name=key)
 
 
-def delete_forget_token(token: int):
-    key = forget_key_generator(token=token)
-    return redis_bq.acc_redis.delete(key)
+BLACK_LIST_PREFIX = "black-list-token-"
+BLACK_LIST_STREAM = "token-revocations"
+BLACK_LIST_STREAM_MAXLEN = 10000
 
 
 def black_list_bearer_tokens(access_token: str):
-    return f"black-list-token-{access_token}"
+    digest = hashlib.blake2b(access_token.encode(), digest_size=16).hexdigest()
+    return f"{BLACK_LIST_PREFIX}{digest}"
 
 
-def add_token_blacklist(access_token: str, refresh_token: str):
-    for token in [access_token, refresh_token]:
-        key = black_list_bearer_tokens(access_token=token)
-        redis_bq.acc_redis.set(name=key, value=token, ex=60 * 60 * 24 * 7)
+def legacy_black_list_bearer_tokens(access_token: str):
+    # Entries written before keys were hashed used the raw token and expire
+    # within 7 days of the switch; this key can go after that.
+    return f"{BLACK_LIST_PREFIX}{access_token}"
 
 
-def get_token_blacklist(token: str):
-    key = black_list_bearer_tokens(access_token=token)
-    return redis_bq.acc_redis.get(name=key)
+async def add_token_blacklist(token_ttls: dict[str, int]):
+    """Blacklist each token for its remaining lifetime in seconds and announce
+    the new keys on the revocation stream."""
 
+    async with redis_bq.acc_redis.pipeline(transaction=False) as pipe:
+        for token, ttl in token_ttls.items():
+            if ttl <= 0:
+                continue
 
-# Vefication Token
+            key = black_list_bearer_tokens(access_token=token)
+            pipe.set(name=key, value=1, ex=ttl)
+            pipe.xadd(
+                name=BLACK_LIST_STREAM,
+                fields={"key": key},
+                maxlen=BLACK_LIST_STREAM_MAXLEN,
+                approximate=True,
+            )
 
+        return await pipe.execute()
 
-# Verification Token Generator
-def user_verification_token_generator(user_uid: UUID):
-    return f"account_verification_token_{user_uid}"
 
+async def get_token_blacklist(token: str):
+    revoked, legacy_revoked = await redis_bq.acc_redis.mget(
+        black_list_bearer_tokens(access_token=token),
+        legacy_black_list_bearer_tokens(access_token=token),
+    )
+    return revoked or legacy_revoked
 
-# Token Key Generator
-def verification_token_generator(token: str):
-    return f"verification_token_{token}"
+
+async def get_black_list_stream_head():
+    entries = await redis_bq.acc_redis.xrevrange(name=BLACK_LIST_STREAM, count=1)
+    return entries[0][0] if entries else "0-0"
+
+
+async def scan_black_list_keys():
+    async for key in redis_bq.acc_redis.scan_iter(
+        match=f"{BLACK_LIST_PREFIX}*", count=1000
+    ):
+        yield key
+
+
+async def read_black_list_stream(last_id: str, block: int = 1000):
+    """Blacklist keys announced after last_id as (entry_id, key) pairs.
+
+    block stays under the client socket timeout so an idle stream is not
+    mistaken for a dead connection.
+    """
+
+    response = await redis_bq.acc_redis.xread(
+        streams={BLACK_LIST_STREAM: last_id}, block=block, count=500
+    )
+
+    return [
+        (entry_id, fields["key"])
+        for _, entries in response or []
+        for entry_id, fields in entries
+    ]
+
+
+# LIST COUNTS
+
+
+LIST_COUNT_EXPIRE = 60
+
+
+def list_count_key_generator(key: str):
+    return f"list-count-{key}"
+
+
+async def get_list_count(key: str):
+    count = await redis_bq.acc_redis.get(name=list_count_key_generator(key=key))
+    return int(count) if count is not None else None
+
+
+async def set_list_count(key: str, count: int):
+    return await redis_bq.acc_redis.set(
+        name=list_count_key_generator(key=key), value=count, ex=LIST_COUNT_EXPIRE
+    )
+
+
+async def delete_list_counts(keys: list[str]):
+    return await redis_bq.acc_redis.delete(
+        *[list_count_key_generator(key=key) for key in keys]
+    )
 
 
-def add_token_to_store(token: str, user_uid: UUID):
-    key = verification_token_generator(token=token)
+# MAIL OUTBOX
 
-    return redis_bq.acc_redis.set(name=key, value=str(user_uid), ex=1800)
 
+MAIL_OUTBOX_STREAM = "mail-outbox"
+MAIL_OUTBOX_GROUP = "mail-workers"
+MAIL_OUTBOX_MAXLEN = 100000
+MAIL_RETRY_QUEUE = "mail-outbox-retry"
+MAIL_DEAD_LETTER_STREAM = "mail-outbox-dead"
 
-def get_verification_token_user(token: str):
-    key = verification_token_generator(token=token)
-    return redis_bq.acc_redis.get(name=key)
 
+async def add_mail_jobs(jobs: list[str]):
+    async with redis_bq.acc_redis.pipeline(transaction=False) as pipe:
+        for job in jobs:
+            pipe.xadd(
+                name=MAIL_OUTBOX_STREAM,
+                fields={"job": job},
+                maxlen=MAIL_OUTBOX_MAXLEN,
+                approximate=True,
+            )
 
-def remove_verification_token_user(token: str):
-    key = verification_token_generator(token=token)
-    return redis_bq.acc_redis.delete(key)
+        return await pipe.execute()
 
 
-def add_user_verification_token(user_uid: UUID, token: str):
-    key = user_verification_token_generator(user_uid=user_uid)
-    add_token_to_store(token=token, user_uid=user_uid)
-    return redis_bq.acc_redis.set(name=key, value=token, ex=1800)
+async def create_mail_outbox_group():
+    try:
+        await redis_bq.acc_redis.xgroup_create(
+            name=MAIL_OUTBOX_STREAM, groupname=MAIL_OUTBOX_GROUP, id="0", mkstream=True
+        )
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
 
 
-def get_user_verification_token(user_uid: UUID):
-    key = user_verification_token_generator(user_uid=user_uid)
-    return redis_bq.acc_redis.get(name=key)
+async def read_mail_outbox(consumer: str, count: int, block: int = 1000):
+    """New outbox jobs for this consumer as (entry_id, job) pairs."""
+
+    response = await redis_bq.acc_redis.xreadgroup(
+        groupname=MAIL_OUTBOX_GROUP,
+        consumername=consumer,
+        streams={MAIL_OUTBOX_STREAM: ">"},
+        count=count,
+        block=block,
+    )
+
+    return [
+        (entry_id, fields.get("job"))
+        for _, entries in response or []
+        for entry_id, fields in entries
+    ]
+
+
+async def claim_stale_mail_jobs(consumer: str, min_idle: int, count: int):
+    """Take over jobs another consumer read but never acknowledged, e.g. after
+    it crashed mid-batch."""
+
+    _, entries, *_ = await redis_bq.acc_redis.xautoclaim(
+        name=MAIL_OUTBOX_STREAM,
+        groupname=MAIL_OUTBOX_GROUP,
+        consumername=consumer,
+        min_idle_time=min_idle,
+        count=count,
+    )
+
+    return [(entry_id, fields.get("job")) for entry_id, fields in entries if fields]
+
+
+async def settle_mail_jobs(
+    entry_ids: list[str], retries: dict[str, float], dead: list[str]
+):
+    """Acknowledge a processed batch, parking failed jobs in the retry queue
+    (scored by when they are due) or the dead-letter stream."""
+
+    async with redis_bq.acc_redis.pipeline(transaction=True) as pipe:
+        if retries:
+            pipe.zadd(name=MAIL_RETRY_QUEUE, mapping=retries)
+        for job in dead:
+            pipe.xadd(name=MAIL_DEAD_LETTER_STREAM, fields={"job": job})
+        if entry_ids:
+            pipe.xack(MAIL_OUTBOX_STREAM, MAIL_OUTBOX_GROUP, *entry_ids)
+            pipe.xdel(MAIL_OUTBOX_STREAM, *entry_ids)
+
+        return await pipe.execute()
+
+
+# Pops and requeues in one step so two workers cannot both resend a job.
+RELEASE_MAIL_RETRIES = redis_bq.acc_redis.register_script(
+    """
+    local jobs = redis.call(
+        "ZRANGEBYSCORE", KEYS[1], "-inf", ARGV[1], "LIMIT", 0, ARGV[2]
+    )
+    for _, job in ipairs(jobs) do
+        redis.call("ZREM", KEYS[1], job)
+        redis.call("XADD", KEYS[2], "MAXLEN", "~", ARGV[3], "*", "job", job)
+    end
+    return #jobs
+    """
+)
+
+
+async def release_due_mail_retries(now: float, count: int):
+    return await RELEASE_MAIL_RETRIES(
+        keys=[MAIL_RETRY_QUEUE, MAIL_OUTBOX_STREAM],
+        args=[now, count, MAIL_OUTBOX_MAXLEN],
+    )
+
+
+# Vefication Token
+
+VERIFICATION_TOKEN_EXPIRE = 1800
+
+
+# Verification Token Generator
+def user_verification_token_generator(user_uid: UUID):
+    return f"account_verification_token_{user_uid}"
+
+
+# Token Key Generator
+def verification_token_generator(token: str):
+    return f"verification_token_{token}"
 
 
-def remove_user_verification_token(user_uid: UUID):
-    key = user_verification_token_generator(user_uid=user_uid)
-    return redis_bq.acc_redis.delete(key)
+async def add_user_verification_token(user_uid: UUID, token: str):
+    async with redis_bq.acc_redis.pipeline(transaction=False) as pipe:
+        pipe.set(
+            name=verification_token_generator(token=token),
+            value=str(user_uid),
+            ex=VERIFICATION_TOKEN_EXPIRE,
+        )
+        pipe.set(
+            name=user_verification_token_generator(user_uid=user_uid),
+            value=token,
+            ex=VERIFICATION_TOKEN_EXPIRE,
+        )
+        return await pipe.execute()
+
+
+# The user key is derived inside the script, so this assumes a single Redis
+# node rather than Cluster.
+CONSUME_VERIFICATION_TOKEN = redis_bq.acc_redis.register_script(
+    """
+    local user_uid = redis.call("GET", KEYS[1])
+    if not user_uid then
+        return nil
+    end
+
+    local user_key = ARGV[1] .. user_uid
+    if redis.call("GET", user_key) ~= ARGV[2] then
+        return nil
+    end
+
+    redis.call("DEL", KEYS[1], user_key)
+    return user_uid
+    """
+)
+
+
+async def consume_verification_token(token: str):
+    """Return the token's user_uid and delete both keys, or None if the token
+    is unknown or no longer the user's latest one."""
+
+    return await CONSUME_VERIFICATION_TOKEN(
+        keys=[verification_token_generator(token=token)],
+        args=[user_verification_token_generator(user_uid=""), token],
+    )
@@ -2,8 +2,18 @@ import accountant.schemas.tracker_schemas as schemas
 
 import accountant.database.handlers.tracker_handler as tracker_handler
 from fastapi import HTTPException, status
-from accountant.services.service_utils.accountant_exceptions import NotFoundError
+from accountant.services.service_utils.accountant_exceptions import (
+    DeleteError,
+    NotFoundError,
+    UpdateError,
+)
+from accountant.root.utils.abstract_schema import CountMode
+from accountant.services.service_utils.pagination_utils import (
+    DEFAULT_PAGE_SIZE,
+    decode_cursor,
+)
 from datetime import date
+from typing import Optional
 from uuid import UUID
 from accountant.services.service_utils.date_utils import month_fetch
 
@@ -23,9 +33,19 @@ async def create_tracker_records(user_uid: UUID, tracker_set: list[schemas.Track
     return await tracker_handler.create_record(track_set=trackers)
 
 
-async def get_trackers(user_uid: UUID, **kwargs):
+async def get_trackers(
+    user_uid: UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    count_mode: CountMode = CountMode.exact,
+):
 
-    return await tracker_handler.get_trackings(user_uid=user_uid, **kwargs)
+    return await tracker_handler.get_trackings(
+        user_uid=user_uid,
+        limit=limit,
+        after=decode_cursor(cursor=after) if after else None,
+        count_mode=count_mode,
+    )
 
 
 async def get_tracker(user_uid: UUID, tracker_uid: UUID):
@@ -44,17 +64,27 @@ async def update_tracker(
     user_uid: UUID, tracker_uid: UUID, tracker_update: schemas.TrackerUpdate
 ):
 
-    await get_tracker(user_uid=user_uid, tracker_uid=tracker_uid)
-
-    return await tracker_handler.update_tracking(
-        tracker_uid=tracker_uid, tracking_update=tracker_update
-    )
+    try:
+        return await tracker_handler.update_tracking(
+            user_uid=user_uid, tracker_uid=tracker_uid, tracking_update=tracker_update
+        )
+    except UpdateError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="tracker not found"
+        )
 
 
 async def delete_tracker(user_uid: UUID, tracker_uid: UUID):
-    await get_tracker(user_uid=user_uid, tracker_uid=tracker_uid)
 
-    await tracker_handler.delete_tracking(tracker_uid=tracker_uid)
+    try:
+        await tracker_handler.delete_tracking(
+            user_uid=user_uid, tracker_uid=tracker_uid
+        )
+    except DeleteError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="tracker not found"
+        )
+
     return {}
 
 
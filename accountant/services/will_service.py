@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
@@ -7,21 +8,18 @@ import accountant.database.handlers.will_handler as will_handler
 import accountant.services.investment_service as investment_service
 import accountant.services.auth_service as invitation_service
 import accountant.schemas.will_schemas as schemas
-from accountant.services.service_utils.accountant_exceptions import NotFoundError
+from accountant.services.service_utils.accountant_exceptions import (
+    CreateError,
+    NotFoundError,
+)
+from accountant.root.utils.abstract_schema import CountMode
+from accountant.services.service_utils.pagination_utils import (
+    DEFAULT_PAGE_SIZE,
+    decode_cursor,
+)
 from datetime import date
 
 
-async def check_investment_will_alotment(investment_uid: UUID):
-    try:
-
-        return await will_handler.check_investment_will_allotment(
-            investment_uid=investment_uid
-        )
-    except NotFoundError as e:
-
-        raise e
-
-
 async def create_will_allotment(
     user_group_uid: UUID, owner_uid: UUID, investment_uid: UUID, invitation_uid: UUID
 ):
@@ -46,42 +44,59 @@ async def create_will_allotment(
         user_group_uid=user_group_uid, uid=invitation_uid
     )
 
-    try:
-
-        check_will = await check_investment_will_alotment(investment_uid=investment_uid)
-        if check_will:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Investment have been willed out",
-            )
-    except NotFoundError:
+    will = schemas.Will(
+        investment_uid=investment_uid,
+        invitation_uid=invitation_uid,
+        owner_uid=owner_uid,
+    )
 
-        will = schemas.Will(
-            investment_uid=investment_uid,
-            invitation_uid=invitation_uid,
-            owner_uid=owner_uid,
+    try:
+        user_profile = await invitation_service.check_user(
+            email=invitation_profile.email
         )
 
-        try:
-            user_profile = await invitation_service.check_user(
-                email=invitation_profile.email
-            )
+        will.assigned_uid = user_profile.user_uid
+    except HTTPException:
+        ...
 
-            will.assigned_uid = user_profile.user_uid
-        except HTTPException:
-            ...
+    try:
+        return await will_handler.create_will_allotment(will=will)
 
-        return will_handler.create_will_allotment(will=will)
+    except CreateError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Investment have been willed out",
+        )
 
 
-async def get_user_wills(user_uid: UUID):
+async def get_user_wills(
+    user_uid: UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    count_mode: CountMode = CountMode.exact,
+):
 
-    return will_handler.get_wills(owner_uid=user_uid)
+    return await will_handler.get_wills(
+        owner_uid=user_uid,
+        limit=limit,
+        after=decode_cursor(cursor=after) if after else None,
+        count_mode=count_mode,
+    )
 
 
-async def get_user_allotments(user_uid: UUID):
+async def get_user_allotments(
+    user_uid: UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    count_mode: CountMode = CountMode.exact,
+):
 
-    return will_handler.get_wills(assigned_uid=user_uid)
+    return await will_handler.get_wills(
+        assigned_uid=user_uid,
+        limit=limit,
+        after=decode_cursor(cursor=after) if after else None,
+        count_mode=count_mode,
+    )
 
 
 async def get_will(will_uid: UUID):
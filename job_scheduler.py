@@ -0,0 +1,27 @@
+import asyncio
+import logging
+
+from accountant.root.database import engine
+from accountant.root.redis_manager import redis_pool
+from accountant.root.scheduler import SCHEDULER
+
+LOGGER = logging.getLogger(__name__)
+
+
+async def main():
+    LOGGER.info(f"scheduling {', '.join(job.name for job in SCHEDULER.jobs)}")
+
+    try:
+        await SCHEDULER.run_forever()
+    finally:
+        await redis_pool.aclose()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+import logging
+import os
+import socket
+
+from accountant.root.redis_manager import redis_pool
+from accountant.services.service_utils.mail_outbox import MailOutboxWorker
+
+LOGGER = logging.getLogger(__name__)
+
+
+async def main(consumer: str):
+    worker = MailOutboxWorker(consumer=consumer)
+    LOGGER.info(f"mail worker {consumer} draining the outbox")
+
+    try:
+        await worker.run_forever()
+    finally:
+        await redis_pool.aclose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(
+        description="Send the mails queued on the outbox stream."
+    )
+    parser.add_argument(
+        "--consumer",
+        default=f"{socket.gethostname()}-{os.getpid()}",
+        help="consumer name in the mail-workers group; keep it stable per worker",
+    )
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main(consumer=args.consumer))
+    except KeyboardInterrupt:
+        pass
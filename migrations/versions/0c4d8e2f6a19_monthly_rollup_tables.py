@@ -0,0 +1,75 @@
+"""monthly rollup tables
+
+Revision ID: 0c4d8e2f6a19
+Revises: f3a9c1d7e2b8
+Create Date: 2026-10-18 19:02:11.402617
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0c4d8e2f6a19"
+down_revision: Union[str, None] = "f3a9c1d7e2b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (rollup, base table, whether user_uid references users)
+ROLLUPS = [
+    ("earnings_monthly_rollup", "earnings", True),
+    ("trackers_monthly_rollup", "trackers", False),
+]
+
+
+def create_rollup_table(name: str, references_users: bool):
+    user_uid_args = (
+        [sa.ForeignKey("users.user_uid", ondelete="CASCADE")]
+        if references_users
+        else []
+    )
+
+    op.create_table(
+        name,
+        sa.Column("user_uid", postgresql.UUID(), *user_uid_args, nullable=False),
+        sa.Column("currency", sa.String(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("month", sa.String(), nullable=False),
+        sa.Column("amount", sa.DECIMAL(), nullable=False),
+        sa.Column("entry_count", sa.Integer(), nullable=False),
+        sa.Column("date_created_utc", sa.DateTime(), nullable=True),
+        sa.Column("date_updated_utc", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("user_uid", "currency", "year", "month"),
+    )
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    for name, base, references_users in ROLLUPS:
+        # A fresh database gets these from the autogenerated table revision.
+        if not inspector.has_table(base) or inspector.has_table(name):
+            continue
+
+        create_rollup_table(name=name, references_users=references_users)
+
+        # Rows written by instances still on the old code are not counted;
+        # make check-rollups / rebuild-rollups settles them after the deploy.
+        op.execute(f"""
+            INSERT INTO {name}
+                (user_uid, currency, year, month, amount, entry_count,
+                 date_created_utc)
+            SELECT user_uid, currency, year, month, sum(amount), count(*),
+                   now() AT TIME ZONE 'utc'
+            FROM {base}
+            GROUP BY user_uid, currency, year, month
+            """)
+
+
+def downgrade() -> None:
+    for name, _, _ in reversed(ROLLUPS):
+        op.execute(f"DROP TABLE IF EXISTS {name}")
@@ -0,0 +1,40 @@
+"""scheduled job runs
+
+Revision ID: 4e7a1b9c3d20
+Revises: 0c4d8e2f6a19
+Create Date: 2026-10-18 20:41:06.118254
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "4e7a1b9c3d20"
+down_revision: Union[str, None] = "0c4d8e2f6a19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table("scheduled_job_runs"):
+        return
+
+    op.create_table(
+        "scheduled_job_runs",
+        sa.Column("job_name", sa.String(), nullable=False),
+        sa.Column("last_tick_utc", sa.DateTime(), nullable=False),
+        sa.Column("last_status", sa.String(), nullable=True),
+        sa.Column("last_finished_utc", sa.DateTime(), nullable=True),
+        sa.Column("date_created_utc", sa.DateTime(), nullable=True),
+        sa.Column("date_updated_utc", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("job_name"),
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS scheduled_job_runs")
@@ -0,0 +1,47 @@
+"""users alive partial index
+
+Revision ID: 5c8e2d917a40
+Revises: b3e41f6a9c52
+Create Date: 2026-10-18 15:12:44.207318
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5c8e2d917a40"
+down_revision: Union[str, None] = "b3e41f6a9c52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    # A fresh database gets this from the autogenerated table revision.
+    if not inspector.has_table("users"):
+        return
+
+    # CONCURRENTLY cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_alive",
+            "users",
+            ["user_uid"],
+            postgresql_where=sa.text("is_alive"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_users_alive",
+            table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,82 @@
+"""keyset pagination indexes
+
+Revision ID: 7d22e7830f17
+Revises:
+Create Date: 2026-10-18 09:12:40.118273
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7d22e7830f17"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    (
+        "ix_earnings_user_uid_created",
+        "earnings",
+        ["user_uid", "date_created_utc", "earning_uid"],
+    ),
+    (
+        "ix_trackers_user_uid_created",
+        "trackers",
+        ["user_uid", "date_created_utc", "tracker_uid"],
+    ),
+    (
+        "ix_investment_platform_uid_created",
+        "investment",
+        ["platform_uid", "date_created_utc", "investment_uid"],
+    ),
+    (
+        "ix_investment_tracker_investment_uid_created",
+        "investment tracker",
+        ["investment_uid", "date_created_utc", "uid"],
+    ),
+    (
+        "ix_will_owner_uid_created",
+        "will",
+        ["owner_uid", "date_created_utc", "will_uid"],
+    ),
+    (
+        "ix_will_assigned_uid_created",
+        "will",
+        ["assigned_uid", "date_created_utc", "will_uid"],
+    ),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    # CONCURRENTLY cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            # A fresh database gets these from the autogenerated table revision.
+            if not inspector.has_table(table):
+                continue
+
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,78 @@
+"""unique dependent invitation email
+
+Revision ID: 9a1f4c6e2b73
+Revises: 5c8e2d917a40
+Create Date: 2026-10-18 16:05:19.648120
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9a1f4c6e2b73"
+down_revision: Union[str, None] = "5c8e2d917a40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Per (group, address), keep the accepted invitation if there is one, else the
+# oldest; every other row is a duplicate to fold into it.
+DUPLICATES = """
+    SELECT uid, keep_uid
+    FROM (
+        SELECT
+            uid,
+            first_value(uid) OVER (
+                PARTITION BY user_group_uid, lower(email)
+                ORDER BY is_accepted DESC, date_created_utc NULLS LAST, uid
+            ) AS keep_uid
+        FROM user_group_invitation
+    ) ranked
+    WHERE uid <> keep_uid
+"""
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    # A fresh database gets this from the autogenerated table revision.
+    if not inspector.has_table("user_group_invitation"):
+        return
+
+    if inspector.has_table("will"):
+        op.execute(f"""
+            UPDATE will SET invitation_uid = duplicates.keep_uid
+            FROM ({DUPLICATES}) duplicates
+            WHERE will.invitation_uid = duplicates.uid
+            """)
+
+    op.execute(f"""
+        DELETE FROM user_group_invitation
+        USING ({DUPLICATES}) duplicates
+        WHERE user_group_invitation.uid = duplicates.uid
+        """)
+
+    # CONCURRENTLY cannot run inside the migration transaction; the dedupe
+    # above is committed first.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ux_user_group_invitation_group_email",
+            "user_group_invitation",
+            ["user_group_uid", sa.text("lower(email)")],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ux_user_group_invitation_group_email",
+            table_name="user_group_invitation",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,68 @@
+"""owner and foreign key indexes
+
+Revision ID: b3e41f6a9c52
+Revises: 7d22e7830f17
+Create Date: 2026-10-18 11:40:02.531904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e41f6a9c52"
+down_revision: Union[str, None] = "7d22e7830f17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# earnings.user_uid, trackers.user_uid, investment.platform_uid,
+# "investment tracker".investment_uid and will.owner_uid/assigned_uid already
+# lead the keyset pagination indexes from 7d22e7830f17.
+INDEXES = [
+    ("ix_earnings_user_uid_year_month", "earnings", ["user_uid", "year", "month"]),
+    ("ix_trackers_user_uid_year_month", "trackers", ["user_uid", "year", "month"]),
+    ("ix_platforms_user_group_uid", "platforms", ["user_group_uid"]),
+    ("ix_investment_user_group_uid", "investment", ["user_group_uid"]),
+    ("ix_will_investment_uid", "will", ["investment_uid"]),
+    ("ix_will_invitation_uid", "will", ["invitation_uid"]),
+    ("ix_user_group_owner_uid", "user_group", ["owner_uid"]),
+    ("ix_user_user_group_user_uid", "user_user_group", ["user_uid"]),
+    (
+        "ix_user_group_invitation_user_group_uid",
+        "user_group_invitation",
+        ["user_group_uid"],
+    ),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    # CONCURRENTLY cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            # A fresh database gets these from the autogenerated table revision.
+            if not inspector.has_table(table):
+                continue
+
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
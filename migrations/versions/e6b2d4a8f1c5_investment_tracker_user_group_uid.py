@@ -0,0 +1,73 @@
+"""investment tracker user_group_uid
+
+Revision ID: e6b2d4a8f1c5
+Revises: 9a1f4c6e2b73
+Create Date: 2026-10-18 17:21:07.415862
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision: str = "e6b2d4a8f1c5"
+down_revision: Union[str, None] = "9a1f4c6e2b73"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "investment tracker"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    # A fresh database gets this from the autogenerated table revision.
+    if not inspector.has_table(TABLE):
+        return
+
+    if "user_group_uid" not in {c["name"] for c in inspector.get_columns(TABLE)}:
+        op.add_column(TABLE, sa.Column("user_group_uid", UUID(), nullable=True))
+
+        # The owning group is the platform's, reached through the investment.
+        op.execute("""
+            UPDATE "investment tracker" AS tracker
+            SET user_group_uid = platforms.user_group_uid
+            FROM investment
+            JOIN platforms ON platforms.platform_uid = investment.platform_uid
+            WHERE investment.investment_uid = tracker.investment_uid
+            """)
+
+        op.alter_column(TABLE, "user_group_uid", nullable=False)
+        op.create_foreign_key(
+            "investment tracker_user_group_uid_fkey",
+            TABLE,
+            "user_group",
+            ["user_group_uid"],
+            ["user_group_uid"],
+            ondelete="CASCADE",
+        )
+
+    # CONCURRENTLY cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_investment tracker_user_group_uid",
+            TABLE,
+            ["user_group_uid"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_investment tracker_user_group_uid",
+            table_name=TABLE,
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_column(TABLE, "user_group_uid")
@@ -0,0 +1,99 @@
+"""unique platform, investment and will
+
+Revision ID: f3a9c1d7e2b8
+Revises: e6b2d4a8f1c5
+Create Date: 2026-10-18 18:12:40.318904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a9c1d7e2b8"
+down_revision: Union[str, None] = "e6b2d4a8f1c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+UNIQUE_INDEXES = [
+    ("ux_platforms_user_group_uid_name", "platforms", ["user_group_uid", "name"]),
+    (
+        "ux_investment_platform_uid_plan_name",
+        "investment",
+        ["platform_uid", "plan_name"],
+    ),
+    ("ux_will_investment_uid", "will", ["investment_uid"]),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    indexes = [
+        (name, table, columns)
+        for name, table, columns in UNIQUE_INDEXES
+        if inspector.has_table(table)
+    ]
+
+    # Unlike invitations these rows carry credentials, trackers and wills, so
+    # duplicates are left for a person to merge rather than folded here.
+    for _, table, columns in indexes:
+        key = ", ".join(columns)
+        duplicates = bind.execute(
+            sa.text(
+                f"SELECT count(*) FROM (SELECT {key} FROM {table} "
+                f"GROUP BY {key} HAVING count(*) > 1) duplicates"
+            )
+        ).scalar()
+
+        if duplicates:
+            raise RuntimeError(
+                f"{table} has {duplicates} duplicated ({key}) groups; "
+                "merge them before running this migration"
+            )
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in indexes:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=True,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+        # Covered by the unique index now.
+        if inspector.has_table("will"):
+            op.drop_index(
+                "ix_will_investment_uid",
+                table_name="will",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    with op.get_context().autocommit_block():
+        if inspector.has_table("will"):
+            op.create_index(
+                "ix_will_investment_uid",
+                "will",
+                ["investment_uid"],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+        for name, table, _ in reversed(UNIQUE_INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
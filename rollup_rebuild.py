@@ -0,0 +1,61 @@
+import argparse
+import asyncio
+import logging
+
+from accountant.database.handlers.rollup_handler import rebuild_rollup
+from accountant.database.orms.earnings_orm import Earning, EarningRollup
+from accountant.database.orms.tracker_orm import Tracker, TrackerRollup
+from accountant.database.orms.user_orm import User  # noqa: F401
+
+LOGGER = logging.getLogger(__name__)
+
+ROLLUPS = {
+    "earnings": (Earning, EarningRollup),
+    "trackers": (Tracker, TrackerRollup),
+}
+
+
+async def main(tables: list[str], chunk_size: int, check_only: bool):
+    drift_found = False
+
+    for table in tables:
+        base, rollup = ROLLUPS[table]
+        drifted = await rebuild_rollup(
+            base=base, rollup=rollup, chunk_size=chunk_size, check_only=check_only
+        )
+
+        if drifted:
+            drift_found = True
+            LOGGER.warning(f"{table} rollup drifted for {len(drifted)} owners")
+            for user_uid in drifted:
+                print(f"{table}\t{user_uid}")
+
+    return drift_found
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(
+        description="Recompute the monthly earning/tracker rollups from base tables."
+    )
+    parser.add_argument(
+        "--table", choices=sorted(ROLLUPS), action="append", dest="tables"
+    )
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only report owners whose rollup drifted from the base rows",
+    )
+    args = parser.parse_args()
+
+    drift_found = asyncio.run(
+        main(
+            tables=args.tables or sorted(ROLLUPS),
+            chunk_size=args.chunk_size,
+            check_only=args.check,
+        )
+    )
+
+    raise SystemExit(1 if drift_found else 0)
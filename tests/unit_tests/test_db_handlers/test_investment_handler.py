@@ -0,0 +1,95 @@
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+import accountant.database.orms.user_orm  # noqa: F401
+import accountant.schemas.investment_schemas as schemas
+from accountant.database.handlers import investment_handler
+from accountant.services.service_utils.accountant_exceptions import (
+    CreateError,
+    NotFoundError,
+    UpdateError,
+)
+
+
+def get_session(result=None):
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+    session.execute.return_value = MagicMock(
+        scalar_one_or_none=MagicMock(return_value=result)
+    )
+    return session
+
+
+def executed_sql(session):
+    stmt = session.execute.await_args.kwargs["statement"]
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+async def test_create_investment_inserts_from_the_owned_platform():
+
+    platform_uid, user_group_uid = uuid4(), uuid4()
+    session = get_session()
+
+    with patch.object(investment_handler, "async_session", return_value=session):
+        with pytest.raises(CreateError):
+            await investment_handler.create_investment(
+                platform_uid=platform_uid,
+                user_group_uid=user_group_uid,
+                investment=schemas.Investment(
+                    plan_name="Gold",
+                    return_on_investment=5,
+                    end_date=date(2030, 1, 1),
+                    nature="LOW_RISK",
+                ),
+            )
+
+    sql = executed_sql(session)
+
+    # One statement: ownership, the duplicate check and the write.
+    session.execute.assert_awaited_once()
+    assert str(sql).startswith("INSERT INTO investment")
+    assert "FROM platforms" in str(sql)
+    assert "ON CONFLICT (platform_uid, plan_name) DO NOTHING" in str(sql)
+    assert sql.params["platform_uid_1"] == platform_uid
+    assert sql.params["user_group_uid_1"] == user_group_uid
+    session.rollback.assert_awaited_once()
+
+
+async def test_renames_into_a_taken_name_raise_update_error():
+
+    session = get_session()
+    session.execute.side_effect = IntegrityError("UPDATE", {}, Exception())
+
+    with patch.object(investment_handler, "async_session", return_value=session):
+        with pytest.raises(UpdateError):
+            await investment_handler.update_platform(
+                user_group_uid=uuid4(),
+                platform_uid=uuid4(),
+                platform_update=schemas.PlatformUpdate(name="piggyvest"),
+            )
+
+        with pytest.raises(UpdateError):
+            await investment_handler.update_investment(
+                user_group_uid=uuid4(),
+                platform_uid=uuid4(),
+                investment_uid=uuid4(),
+                investment_update=schemas.InvestmentUpdate(plan_name="Gold"),
+            )
+
+    assert session.rollback.await_count == 2
+    session.commit.assert_not_awaited()
+
+    session.execute.side_effect = None
+
+    with patch.object(investment_handler, "async_session", return_value=session):
+        with pytest.raises(NotFoundError):
+            await investment_handler.update_platform(
+                user_group_uid=uuid4(),
+                platform_uid=uuid4(),
+                platform_update=schemas.PlatformUpdate(name="piggyvest"),
+            )
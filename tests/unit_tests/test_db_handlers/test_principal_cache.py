@@ -0,0 +1,74 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+import tests.utils as general_utils
+from accountant.database.handlers import user_handler
+
+
+def get_session(user_uid):
+    user = general_utils.get_user()
+    user_row = MagicMock()
+    user_row.as_dict.return_value = {
+        **user.model_dump(),
+        "user_uid": user_uid,
+        "is_verified": True,
+        "date_created_utc": datetime.utcnow(),
+    }
+
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+    session.execute.return_value = MagicMock(
+        one_or_none=MagicMock(return_value=(user_row, None))
+    )
+    return session
+
+
+async def test_get_principal_is_cached_until_invalidated():
+
+    user_uid = uuid4()
+    session = get_session(user_uid=user_uid)
+
+    with patch.object(user_handler, "async_session", return_value=session):
+        first = await user_handler.get_principal(user_uid=user_uid)
+        second = await user_handler.get_principal(user_uid=user_uid)
+
+        assert first == second
+        assert first.effective_user_group_uid is None
+        assert session.execute.await_count == 1
+
+        await user_handler.invalidate_principal(str(user_uid))
+        await user_handler.get_principal(user_uid=user_uid)
+
+        assert session.execute.await_count == 2
+
+
+async def test_sweep_alive_users_stops_at_its_start_time():
+
+    swept = [MagicMock(user_uid=uuid4(), email="a@example.com")]
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+    session.execute.side_effect = [
+        MagicMock(all=MagicMock(return_value=swept)),
+        MagicMock(all=MagicMock(return_value=[])),
+    ]
+
+    with patch.object(user_handler, "async_session", return_value=session):
+        batches = [batch async for batch in user_handler.sweep_alive_users(10)]
+
+    assert batches == [swept]
+
+    # Users confirmed mid-sweep are newer than the cutoff and never match.
+    cutoffs = set()
+    for call in session.execute.await_args_list:
+        sql = call.kwargs["statement"].compile(dialect=postgresql.dialect())
+        assert "coalesce(users.date_updated_utc, users.date_created_utc" in str(sql)
+        cutoffs.update(
+            value
+            for value in sql.params.values()
+            if isinstance(value, datetime) and value != datetime.min
+        )
+
+    assert len(cutoffs) == 1
@@ -0,0 +1,99 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event, text
+
+from accountant.database.handlers import (
+    earning_handler,
+    investment_handler,
+    tracker_handler,
+    user_handler,
+    will_handler,
+)
+from accountant.services.service_utils.accountant_exceptions import NotFoundError
+
+HANDLER_MODULES = [
+    earning_handler,
+    investment_handler,
+    tracker_handler,
+    user_handler,
+    will_handler,
+]
+
+
+@pytest.fixture()
+async def captured_selects(session, setup_test_db):
+    """Route every handler through the test session and record the SELECTs it runs."""
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    patches = [
+        patch(f"{module.__name__}.async_session", return_value=session)
+        for module in HANDLER_MODULES
+    ]
+    for p in patches:
+        p.start()
+
+    event.listen(setup_test_db.sync_engine, "before_cursor_execute", capture)
+
+    yield statements
+
+    event.remove(setup_test_db.sync_engine, "before_cursor_execute", capture)
+    for p in patches:
+        p.stop()
+
+
+async def call_hot_handlers():
+    user_uid, user_group_uid = uuid.uuid4(), uuid.uuid4()
+
+    await earning_handler.get_earnings(user_uid=user_uid)
+    await earning_handler.earning_dashboard(user_uid=user_uid)
+    await tracker_handler.get_trackings(user_uid=user_uid)
+    await tracker_handler.tracking_dashboard(user_uid=user_uid)
+    await investment_handler.get_platforms(user_group_uid=user_group_uid)
+    await investment_handler.investment_dashboard(user_group_uid=user_group_uid)
+    await investment_handler.get_investments(platform_uid=uuid.uuid4())
+
+    with pytest.raises(NotFoundError):
+        await investment_handler.get_investment_trackers(
+            user_group_uid=user_group_uid,
+            platform_uid=uuid.uuid4(),
+            investment_uid=uuid.uuid4(),
+        )
+
+    with pytest.raises(NotFoundError):
+        await investment_handler.get_investment_tracker(
+            user_group_uid=user_group_uid, investment_uid=uuid.uuid4(), uid=uuid.uuid4()
+        )
+    await will_handler.get_wills(owner_uid=user_uid)
+    await will_handler.get_wills(assigned_uid=user_uid)
+    await user_handler.get_users_in_user_group(user_group_uid=user_group_uid)
+    await user_handler.get_all_dependents(user_group_uid=user_group_uid)
+
+    with pytest.raises(NotFoundError):
+        await user_handler.get_user_group(user_uid=user_uid)
+
+
+async def test_hot_queries_use_indexes(session, captured_selects):
+
+    await call_hot_handlers()
+
+    assert captured_selects
+
+    # Tables are empty here, so take sequential scans off the table: any that
+    # still show up have no usable index behind them.
+    connection = await session.connection()
+    await connection.execute(text("SET enable_seqscan = off"))
+
+    for statement, parameters in captured_selects:
+        plan = (
+            await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        ).all()
+        plan_text = "\n".join(row[0] for row in plan)
+
+        assert "Seq Scan" not in plan_text, f"{statement}\n{plan_text}"
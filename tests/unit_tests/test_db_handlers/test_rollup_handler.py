@@ -0,0 +1,182 @@
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+import accountant.database.orms.user_orm  # noqa: F401
+from accountant.database.handlers import earning_handler, rollup_handler
+from accountant.database.orms.earnings_orm import Earning, EarningRollup
+
+
+def compiled(stmt):
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+def get_session():
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+    return session
+
+
+def executed(session):
+    return [call.kwargs["statement"] for call in session.execute.await_args_list]
+
+
+async def test_apply_rollup_deltas_folds_keys_and_takes_shared_lock():
+
+    user_uid = uuid4()
+    session = AsyncMock()
+
+    await rollup_handler.apply_rollup_deltas(
+        session=session,
+        rollup=EarningRollup,
+        deltas=[
+            (user_uid, "Naira", 2024, "May", Decimal("10"), 1),
+            (user_uid, "Naira", 2024, "May", Decimal("-10"), -1),
+            (user_uid, "Naira", 2024, "June", Decimal("5"), 1),
+            (user_uid, "Naira", 2024, "June", Decimal("7"), 1),
+        ],
+    )
+
+    lock, upsert = executed(session)
+
+    assert "pg_advisory_xact_lock_shared" in str(compiled(lock))
+    assert compiled(lock).params == {
+        "pg_advisory_xact_lock_shared_2": rollup_handler.rollup_lock_key(
+            EarningRollup, user_uid
+        )
+    }
+
+    # May nets out to nothing, so only June is written, once.
+    sql = compiled(upsert)
+    assert "ON CONFLICT (user_uid, currency, year, month) DO UPDATE" in str(sql)
+    assert sql.params["month_m0"] == "June"
+    assert sql.params["amount_m0"] == Decimal("12")
+    assert sql.params["entry_count_m0"] == 2
+    assert "month_m1" not in sql.params
+
+
+async def test_apply_rollup_deltas_skips_cancelled_deltas():
+
+    user_uid = uuid4()
+    session = AsyncMock()
+
+    await rollup_handler.apply_rollup_deltas(
+        session=session,
+        rollup=EarningRollup,
+        deltas=[
+            (user_uid, "Naira", 2024, "May", Decimal("10"), 1),
+            (user_uid, "Naira", 2024, "May", Decimal("-10"), -1),
+        ],
+    )
+
+    session.execute.assert_not_awaited()
+
+
+def test_rollup_lock_key_is_stable_and_per_rollup():
+
+    user_uid = uuid4()
+
+    assert rollup_handler.rollup_lock_key(
+        EarningRollup, user_uid
+    ) == rollup_handler.rollup_lock_key(EarningRollup, str(user_uid))
+    assert rollup_handler.rollup_lock_key(
+        EarningRollup, user_uid
+    ) != rollup_handler.rollup_lock_key(Earning, user_uid)
+
+
+async def test_rebuild_rollup_chunk_locks_owners_before_rewriting():
+
+    user_uids = [uuid4(), uuid4()]
+    session = get_session()
+
+    with patch.object(rollup_handler, "async_session", return_value=session):
+        await rollup_handler.rebuild_rollup_chunk(
+            base=Earning, rollup=EarningRollup, user_uids=user_uids
+        )
+
+    lock, delete, insert = [str(compiled(stmt)) for stmt in executed(session)]
+
+    assert lock.count("pg_advisory_xact_lock(") == 2
+    assert "_shared" not in lock
+    assert delete.startswith("DELETE FROM earnings_monthly_rollup")
+    assert insert.startswith("INSERT INTO earnings_monthly_rollup")
+    assert "GROUP BY earnings.user_uid" in insert
+    session.commit.assert_awaited_once()
+
+
+async def test_check_rollup_chunk_compares_both_sides():
+
+    drifted = [uuid4()]
+    session = get_session()
+    session.execute.return_value = MagicMock(
+        scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=drifted)))
+    )
+
+    with patch.object(rollup_handler, "async_session", return_value=session):
+        result = await rollup_handler.check_rollup_chunk(
+            base=Earning, rollup=EarningRollup, user_uids=[uuid4()]
+        )
+
+    (stmt,) = executed(session)
+    sql = str(compiled(stmt))
+
+    assert result == drifted
+    # Stale rollup rows with no base rows left must still be compared.
+    assert "FULL OUTER JOIN" in sql
+    assert "entry_count !=" not in sql.split("FULL OUTER JOIN")[0]
+
+
+@patch.object(rollup_handler, "rebuild_rollup_chunk", new_callable=AsyncMock)
+@patch.object(rollup_handler, "check_rollup_chunk", new_callable=AsyncMock)
+@patch.object(rollup_handler, "get_rollup_user_chunk", new_callable=AsyncMock)
+async def test_rebuild_rollup_walks_owner_chunks(mock_chunk, mock_check, mock_rebuild):
+
+    first, second = [uuid4(), uuid4()], [uuid4()]
+    mock_chunk.side_effect = [first, second, []]
+    mock_check.side_effect = [[first[1]], []]
+
+    drifted = await rollup_handler.rebuild_rollup(
+        base=Earning, rollup=EarningRollup, chunk_size=2, check_only=True
+    )
+
+    assert drifted == [first[1]]
+    assert [call.kwargs["after"] for call in mock_chunk.await_args_list] == [
+        None,
+        first[-1],
+        second[-1],
+    ]
+    mock_rebuild.assert_not_awaited()
+
+    mock_chunk.side_effect = [first, []]
+
+    assert await rollup_handler.rebuild_rollup(base=Earning, rollup=EarningRollup) == []
+    mock_rebuild.assert_awaited_once_with(
+        base=Earning, rollup=EarningRollup, user_uids=first
+    )
+
+
+async def test_earning_dashboard_reads_the_rollup():
+
+    session = get_session()
+    session.execute.return_value = MagicMock(
+        all=MagicMock(
+            return_value=[
+                ("Naira", 2024, "May", Decimal("100")),
+                ("Naira", 2024, "June", Decimal("50")),
+            ]
+        )
+    )
+
+    with patch.object(earning_handler, "async_session", return_value=session):
+        dashboard = await earning_handler.earning_dashboard(user_uid=uuid4())
+
+    (stmt,) = executed(session)
+    sql = str(compiled(stmt))
+
+    assert "FROM earnings_monthly_rollup" in sql
+    assert "FROM earnings " not in sql
+    assert "entry_count > " in sql
+    assert dashboard.summary == {"Naira": {2024: 150.0}}
+    assert dashboard.yearly_chart[2024]["Naira"]["May"].amount == 100.0
@@ -0,0 +1,97 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from accountant.root import database
+
+
+def get_request_session(in_transaction: bool):
+    session = AsyncMock()
+    session.in_transaction = MagicMock(return_value=in_transaction)
+    session.begin_nested.return_value = AsyncMock(is_active=True)
+    return session
+
+
+async def test_async_session_outside_request_opens_own_session():
+
+    session = AsyncMock()
+    with patch.object(database, "session_factory", return_value=session):
+        async with database.async_session() as handler_session:
+            assert handler_session is session.__aenter__.return_value
+
+
+async def test_async_session_in_request_commit_only_flushes():
+
+    session = get_request_session(in_transaction=False)
+    token = database.request_session.set(session)
+
+    try:
+        async with database.async_session() as handler_session:
+            await handler_session.commit()
+
+    finally:
+        database.request_session.reset(token)
+
+    session.flush.assert_awaited_once()
+    session.commit.assert_not_awaited()
+    session.begin_nested.assert_not_awaited()
+
+
+async def test_async_session_in_request_rollback_keeps_earlier_work():
+
+    session = get_request_session(in_transaction=True)
+    savepoint = session.begin_nested.return_value
+    token = database.request_session.set(session)
+
+    try:
+        with pytest.raises(ValueError):
+            async with database.async_session() as handler_session:
+                await handler_session.rollback()
+                savepoint.is_active = False
+                raise ValueError
+
+    finally:
+        database.request_session.reset(token)
+
+    savepoint.rollback.assert_awaited_once()
+    session.rollback.assert_not_awaited()
+
+
+async def test_after_commit_waits_for_the_unit_of_work():
+
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+    session.info = {}
+    calls = []
+    session.commit.side_effect = lambda: calls.append("commit")
+
+    with patch.object(database, "session_factory", return_value=session):
+        unit_of_work = database.unit_of_work()
+        await unit_of_work.__anext__()
+
+        await database.after_commit(lambda: calls.append("callback"))
+        assert calls == []
+
+        with pytest.raises(StopAsyncIteration):
+            await unit_of_work.__anext__()
+
+    assert calls == ["commit", "callback"]
+
+
+async def test_after_commit_is_dropped_on_rollback():
+
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+    session.info = {}
+    callback = MagicMock()
+
+    with patch.object(database, "session_factory", return_value=session):
+        unit_of_work = database.unit_of_work()
+        await unit_of_work.__anext__()
+        await database.after_commit(callback)
+
+        with pytest.raises(ValueError):
+            await unit_of_work.athrow(ValueError)
+
+    callback.assert_not_called()
+    session.rollback.assert_awaited_once()
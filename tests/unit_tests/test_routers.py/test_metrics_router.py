@@ -0,0 +1,46 @@
+from unittest.mock import patch
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+import accountant.services.service_utils.auth_utils as auth_utils
+from accountant.root.app import app
+from accountant.root.database import engine, settings
+
+TEST_CLIENT = TestClient(app=app)
+METRICS_URLS = ["/v1/metrics/db-pool", "/v1/metrics/token-cache"]
+OPERATOR = {"Authorization": "Bearer operator-secret"}
+
+
+@patch.object(auth_utils.settings, "metrics_token", "operator-secret")
+def test_metrics_need_the_operator_token():
+
+    user_token = auth_utils.create_access_token(data={"user_uid": str(uuid4())})
+
+    for url in METRICS_URLS:
+        assert TEST_CLIENT.get(url=url).status_code == 403
+        assert (
+            TEST_CLIENT.get(
+                url=url, headers={"Authorization": f"Bearer {user_token}"}
+            ).status_code
+            == 401
+        )
+
+
+@patch.object(auth_utils.settings, "metrics_token", None)
+def test_metrics_are_off_without_a_token_configured():
+
+    for url in METRICS_URLS:
+        assert TEST_CLIENT.get(url=url, headers=OPERATOR).status_code == 404
+
+
+@patch.object(auth_utils.settings, "metrics_token", "operator-secret")
+def test_db_pool_metrics():
+
+    response = TEST_CLIENT.get(url="/v1/metrics/db-pool", headers=OPERATOR)
+    response_json = response.json()
+
+    assert response.status_code == 200
+    assert response_json["size"] == settings.db_pool_size
+    assert response_json["max_overflow"] == settings.db_max_overflow
+    assert response_json == engine.pool.metrics()
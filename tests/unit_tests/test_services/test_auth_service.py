@@ -1,14 +1,19 @@
 from unittest.mock import patch, AsyncMock, Mock
 import pytest
 from fastapi import HTTPException
-from accountant.services.service_utils.accountant_exceptions import NotFoundError
+from accountant.services.service_utils.accountant_exceptions import (
+    NotFoundError,
+    UpdateError,
+)
 from accountant.services.service_utils.token_utils import gr_token_gen
 import tests.utils as general_utils
 from uuid import uuid4
+from datetime import datetime
+import accountant.schemas.user_schemas as schemas
 import accountant.services.auth_service as auth_service
 
 
-@patch("accountant.services.auth_service.send_mail")
+@patch("accountant.services.auth_service.enqueue_mail")
 @patch("accountant.services.auth_service.user_db_handler", new_callable=AsyncMock)
 @patch("accountant.services.auth_service")
 @patch("accountant.services.auth_service.redis_utils")
@@ -39,11 +44,11 @@ async def test_create_user_happy_path(
     mock_auth_service.create_user_group = AsyncMock(return_value=None)
 
     mock_token_gen.return_value = token
-    mock_redis.add_user_verification_token = Mock(return_value=None)
+    mock_redis.add_user_verification_token = AsyncMock(return_value=None)
 
     mock_mailer.return_value = None
 
-    mock_auth_utils.hash_password = Mock(return_value=user.password)
+    mock_auth_utils.hash_password = AsyncMock(return_value=user.password)
     mock_auth_utils.create_access_token = Mock(return_value=access_uid)
     mock_auth_utils.create_refresh_token = Mock(return_value=refresh_uid)
 
@@ -72,3 +77,172 @@ async def test_create_user_sad_path(
     with pytest.raises(HTTPException):
 
         await auth_service.create_user(user=user, user_group_token=None)
+
+
+@patch("accountant.services.auth_service.user_db_handler", new_callable=AsyncMock)
+@patch("accountant.services.auth_service.redis_utils")
+async def test_verify_user_happy_path(mock_redis, mock_auth_db):
+
+    user_uid = uuid4()
+    token = gr_token_gen()
+
+    mock_redis.consume_verification_token = AsyncMock(return_value=str(user_uid))
+
+    await auth_service.verify_user(token=token)
+
+    mock_redis.consume_verification_token.assert_awaited_once_with(token=token)
+    mock_auth_db.update_user.assert_awaited_once()
+
+
+@patch("accountant.services.auth_service.user_db_handler", new_callable=AsyncMock)
+@patch("accountant.services.auth_service.redis_utils")
+async def test_verify_user_sad_path(mock_redis, mock_auth_db):
+
+    mock_redis.consume_verification_token = AsyncMock(return_value=None)
+
+    with pytest.raises(HTTPException):
+        await auth_service.verify_user(token=gr_token_gen())
+
+    mock_auth_db.update_user.assert_not_awaited()
+
+
+@patch("accountant.services.auth_service.enqueue_mails", new_callable=AsyncMock)
+@patch("accountant.services.auth_service.user_db_handler")
+async def test_update_all_to_non_alive_users_mails_each_batch(
+    mock_auth_db, mock_enqueue_mails
+):
+
+    batches = [
+        [Mock(user_uid=uuid4(), email=f"user{i}@example.com") for i in range(3)],
+        [Mock(user_uid=uuid4(), email="last@example.com")],
+    ]
+
+    async def sweep_alive_users(batch_size):
+        for batch in batches:
+            yield batch
+
+    mock_auth_db.sweep_alive_users = sweep_alive_users
+
+    await auth_service.update_all_to_non_alive_users()
+
+    assert mock_enqueue_mails.await_count == 2
+    first_batch = mock_enqueue_mails.await_args_list[0].kwargs["mails"]
+    assert [mail["reciepients"] for mail in first_batch] == [
+        [user.email] for user in batches[0]
+    ]
+
+    token = first_batch[0]["payload"]["token"]
+    assert auth_service.auth_utils.resolve_token(signed_token=token) == str(
+        batches[0][0].user_uid
+    )
+
+
+@patch("accountant.services.auth_service.enqueue_mails", new_callable=AsyncMock)
+@patch("accountant.services.auth_service.user_db_handler")
+async def test_send_invitation_mails_each_pending_dependent(
+    mock_auth_db, mock_enqueue_mails
+):
+
+    groups = [
+        (uuid4(), "Owner One", ["a@example.com", "b@example.com"]),
+        (uuid4(), "Owner Two", ["c@example.com"]),
+    ]
+
+    async def stream_pending_invitations(batch_size):
+        for group in groups:
+            yield group
+
+    mock_auth_db.stream_pending_invitations = stream_pending_invitations
+
+    await auth_service.send_invitation()
+
+    mails = [
+        mail
+        for call in mock_enqueue_mails.await_args_list
+        for mail in call.kwargs["mails"]
+    ]
+    assert [mail["reciepients"] for mail in mails] == [
+        ["a@example.com"],
+        ["b@example.com"],
+        ["c@example.com"],
+    ]
+    assert mails[2]["subject"] == "Owner Two invited you to The Accountant"
+
+    token = mails[0]["payload"]["token"]
+    assert auth_service.auth_utils.resolve_token(signed_token=token) == str(
+        groups[0][0]
+    )
+
+
+@patch("accountant.services.auth_service.user_db_handler", new_callable=AsyncMock)
+async def test_add_dependent_reports_already_invited(mock_auth_db):
+
+    user_group_uid = uuid4()
+    mock_auth_db.create_dependent.return_value = schemas.PaginatedUserGroupIVProfile(
+        result_size=1,
+        result_set=[
+            schemas.UserGroupIVProfile(
+                uid=uuid4(),
+                email="new@example.com",
+                user_group_uid=user_group_uid,
+                date_created_utc=datetime.utcnow(),
+                is_accepted=False,
+            )
+        ],
+    )
+
+    result = await auth_service.add_dependent(
+        emails=["New@example.com", "old@example.com", "new@example.com "],
+        user_group_uid=user_group_uid,
+    )
+
+    mock_auth_db.create_dependent.assert_awaited_once()
+    invited = mock_auth_db.create_dependent.await_args.kwargs["user_g_iv"]
+    assert [invitation.email for invitation in invited] == [
+        "new@example.com",
+        "old@example.com",
+    ]
+    assert result.result_size == 1
+    assert result.already_invited == ["old@example.com"]
+
+
+@patch("accountant.services.auth_service.user_db_handler", new_callable=AsyncMock)
+async def test_add_dependent_all_already_invited(mock_auth_db):
+
+    mock_auth_db.create_dependent.return_value = schemas.PaginatedUserGroupIVProfile()
+
+    with pytest.raises(HTTPException):
+        await auth_service.add_dependent(
+            emails=["old@example.com"], user_group_uid=uuid4()
+        )
+
+
+@patch("accountant.services.auth_service.user_db_handler", new_callable=AsyncMock)
+async def test_update_dependent_maps_missing_and_conflicting_rows(mock_auth_db):
+
+    mock_auth_db.update_dependent.side_effect = NotFoundError
+
+    with pytest.raises(HTTPException) as exc_info:
+        await auth_service.update_dependent(
+            uid=uuid4(),
+            user_group_uid=uuid4(),
+            dependent_invitation=schemas.UserGroupInvitationUpdate(
+                email="Taken@example.com"
+            ),
+        )
+
+    assert exc_info.value.status_code == 404
+    mock_auth_db.get_dependent.assert_not_awaited()
+
+    mock_auth_db.update_dependent.side_effect = UpdateError
+
+    with pytest.raises(HTTPException) as exc_info:
+        await auth_service.update_dependent(
+            uid=uuid4(),
+            user_group_uid=uuid4(),
+            dependent_invitation=schemas.UserGroupInvitationUpdate(
+                email="Taken@example.com"
+            ),
+        )
+
+    assert exc_info.value.status_code == 400
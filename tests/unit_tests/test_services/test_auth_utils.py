@@ -0,0 +1,122 @@
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+import accountant.services.service_utils.auth_utils as auth_utils
+import accountant.services.service_utils.redis_utils as redis_utils
+
+
+def test_token_ttl_follows_the_top_level_signer_max_age():
+
+    data = {"user_uid": str(uuid4())}
+
+    access_token = auth_utils.create_access_token(data=dict(data))
+    refresh_token = auth_utils.create_refresh_token(data=dict(data))
+
+    access_ttl = auth_utils.token_ttl(token=access_token)
+    refresh_ttl = auth_utils.token_ttl(token=refresh_token, refresh=True)
+
+    assert auth_utils.ACCESS_TOKEN_EXPIRE_MINUTES - 5 <= access_ttl
+    assert access_ttl <= auth_utils.ACCESS_TOKEN_EXPIRE_MINUTES
+    assert auth_utils.REFRESH_TOKEN_EXPIRE_MINUTES - 5 <= refresh_ttl
+    assert refresh_ttl <= auth_utils.REFRESH_TOKEN_EXPIRE_MINUTES
+
+
+def test_token_ttl_sad_path():
+
+    assert auth_utils.token_ttl(token="not-a-token") == 0
+
+    # Access token checked against the refresh key.
+    access_token = auth_utils.create_access_token(data={"user_uid": str(uuid4())})
+    assert auth_utils.token_ttl(token=access_token, refresh=True) == 0
+
+
+def test_blacklist_key_is_a_short_digest():
+
+    token = auth_utils.create_access_token(data={"user_uid": str(uuid4())})
+
+    key = redis_utils.black_list_bearer_tokens(access_token=token)
+
+    assert key == redis_utils.black_list_bearer_tokens(access_token=token)
+    assert token not in key
+    assert len(key) < 64
+
+
+@patch.object(auth_utils.blacklist_utils, "is_token_revoked", return_value=False)
+async def test_verify_access_token_caches_verified_tokens(mock_is_token_revoked):
+
+    user_uid = uuid4()
+    token = auth_utils.create_access_token(data={"user_uid": str(user_uid)})
+    hits = auth_utils.VERIFIED_TOKENS.hits
+
+    with patch.object(
+        auth_utils, "resolve_token", wraps=auth_utils.resolve_token
+    ) as mock_resolve_token:
+        first = await auth_utils.verify_access_token(token=token)
+        second = await auth_utils.verify_access_token(token=token)
+
+    assert first.user_uid == second.user_uid == user_uid
+    mock_resolve_token.assert_called_once()
+    assert auth_utils.VERIFIED_TOKENS.hits == hits + 1
+    assert mock_is_token_revoked.await_count == 2
+
+
+@patch.object(auth_utils.blacklist_utils, "is_token_revoked", return_value=True)
+async def test_verify_access_token_revoked_after_caching(mock_is_token_revoked):
+
+    token = auth_utils.create_access_token(data={"user_uid": str(uuid4())})
+    auth_utils.VERIFIED_TOKENS.set(auth_utils.verified_token_key(token=token), object())
+
+    with pytest.raises(HTTPException):
+        await auth_utils.verify_access_token(token=token)
+
+
+async def test_password_hashing_round_trip_and_rehash():
+
+    hashed_password = await auth_utils.hash_password(plain_password="secret")
+
+    assert await auth_utils.verify_password(
+        plain_password="secret", hashed_password=hashed_password
+    )
+    assert await auth_utils.verify_and_update_password(
+        plain_password="secret", hashed_password=hashed_password
+    ) == (True, None)
+
+    # A hash made at a different cost is upgraded on the next successful login.
+    cheaper_hash = auth_utils.pwd_context.hash("secret", rounds=4)
+    is_valid, new_hash = await auth_utils.verify_and_update_password(
+        plain_password="secret", hashed_password=cheaper_hash
+    )
+
+    assert is_valid and new_hash != cheaper_hash
+    assert await auth_utils.verify_and_update_password(
+        plain_password="wrong", hashed_password=cheaper_hash
+    ) == (False, None)
+
+
+async def test_compact_and_legacy_tokens_are_both_accepted():
+
+    user_uid = uuid4()
+
+    with patch.object(auth_utils.settings, "token_format", "compact"):
+        compact_token = auth_utils.create_access_token(data={"user_uid": str(user_uid)})
+    legacy_token = auth_utils.create_access_token(data={"user_uid": str(user_uid)})
+
+    assert compact_token.startswith(auth_utils.COMPACT_TOKEN_PREFIX)
+    assert not legacy_token.startswith(auth_utils.COMPACT_TOKEN_PREFIX)
+    assert len(compact_token) < len(legacy_token)
+
+    for token in [compact_token, legacy_token]:
+        with patch.object(
+            auth_utils.blacklist_utils, "is_token_revoked", return_value=False
+        ):
+            token_data = await auth_utils.verify_access_token(token=token)
+
+        assert token_data.user_uid == user_uid
+        assert (
+            auth_utils.ACCESS_TOKEN_EXPIRE_MINUTES - 5
+            <= auth_utils.token_ttl(token=token)
+            <= auth_utils.ACCESS_TOKEN_EXPIRE_MINUTES
+        )
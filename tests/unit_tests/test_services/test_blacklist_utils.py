@@ -0,0 +1,51 @@
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import accountant.services.service_utils.blacklist_utils as blacklist_utils
+from accountant.root.utils.bloom_filter import BloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [str(uuid4()) for _ in range(1000)]
+
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+
+    false_positives = sum(str(uuid4()) in bloom for _ in range(1000))
+    assert false_positives < 50
+
+
+@patch.object(blacklist_utils.redis_utils, "get_token_blacklist")
+async def test_is_token_revoked_skips_redis_on_filter_miss(mock_get_blacklist):
+
+    mock_get_blacklist.return_value = "1"
+    revoked_token, other_token = str(uuid4()), str(uuid4())
+
+    with patch.object(blacklist_utils, "REVOKED_TOKENS") as revoked_tokens:
+        revoked_tokens.ready = True
+        revoked_tokens.might_contain.side_effect = lambda token: (
+            token == revoked_token
+        )
+
+        assert await blacklist_utils.is_token_revoked(token=other_token) is False
+        mock_get_blacklist.assert_not_awaited()
+
+        assert await blacklist_utils.is_token_revoked(token=revoked_token) is True
+        mock_get_blacklist.assert_awaited_once_with(token=revoked_token)
+
+
+async def test_is_token_revoked_falls_back_to_redis_until_ready():
+
+    with patch.object(
+        blacklist_utils.redis_utils,
+        "get_token_blacklist",
+        new_callable=AsyncMock,
+        return_value=None,
+    ) as mock_get_blacklist:
+        assert not blacklist_utils.REVOKED_TOKENS.ready
+        assert await blacklist_utils.is_token_revoked(token=str(uuid4())) is False
+        mock_get_blacklist.assert_awaited_once()
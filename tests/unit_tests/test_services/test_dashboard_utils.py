@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from accountant.services.service_utils.dashboard_utils import (
+    build_dashboard,
+    build_investment_dashboard,
+)
+
+
+def test_build_dashboard_keeps_every_year():
+
+    rows = [
+        ("Naira", 2023, "January", Decimal("100")),
+        ("Dollars", 2023, "January", Decimal("5")),
+        ("Naira", 2024, "March", Decimal("40")),
+        ("Naira", 2024, "April", Decimal("60")),
+    ]
+
+    summary, year_trend = build_dashboard(rows=rows)
+
+    assert summary == {
+        "Naira": {2023: Decimal("100"), 2024: Decimal("100")},
+        "Dollars": {2023: Decimal("5")},
+    }
+    assert year_trend[2023] == {
+        "Naira": {"January": {"amount": Decimal("100")}},
+        "Dollars": {"January": {"amount": Decimal("5")}},
+    }
+    assert year_trend[2024] == {
+        "Naira": {
+            "March": {"amount": Decimal("40")},
+            "April": {"amount": Decimal("60")},
+        }
+    }
+
+
+def test_build_dashboard_empty():
+
+    assert build_dashboard(rows=[]) == ({}, {})
+
+
+def test_build_investment_dashboard_splits_credit_and_debit():
+
+    rows = [
+        ("Cowrywise", "Naira", Decimal("500"), Decimal("120")),
+        ("Cowrywise", "Dollars", None, Decimal("10")),
+        ("Risevest", "Dollars", Decimal("75"), None),
+        # A second platform with the same name merges into the first.
+        ("Risevest", "Dollars", Decimal("25"), Decimal("5")),
+        ("Bamboo", None, None, None),
+    ]
+
+    assert build_investment_dashboard(rows=rows) == {
+        "Cowrywise": {
+            "cash_in": {"Naira": Decimal("500")},
+            "cash_out": {"Naira": Decimal("120"), "Dollars": Decimal("10")},
+        },
+        "Risevest": {
+            "cash_in": {"Dollars": Decimal("100")},
+            "cash_out": {"Dollars": Decimal("5")},
+        },
+        "Bamboo": {"cash_in": {}, "cash_out": {}},
+    }
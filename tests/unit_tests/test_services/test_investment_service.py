@@ -0,0 +1,215 @@
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+import accountant.schemas.investment_schemas as schemas
+import accountant.services.investment_service as investment_service
+from accountant.services.service_utils.accountant_exceptions import (
+    CreateError,
+    DeleteError,
+    NotFoundError,
+    UpdateError,
+)
+
+
+@patch.object(investment_service, "investment_handler", new_callable=AsyncMock)
+async def test_update_investment_is_scoped_in_the_write(mock_handler):
+
+    mock_handler.update_investment.side_effect = NotFoundError
+
+    with pytest.raises(HTTPException) as exc_info:
+        await investment_service.update_investment(
+            platform_uid=uuid4(),
+            investment_uid=uuid4(),
+            user_group_uid=uuid4(),
+            investment_update=schemas.InvestmentUpdate(),
+        )
+
+    assert exc_info.value.status_code == 404
+    mock_handler.check_platform_owner.assert_not_awaited()
+    mock_handler.get_investment.assert_not_awaited()
+
+
+@patch.object(investment_service, "investment_handler", new_callable=AsyncMock)
+async def test_tracker_writes_are_scoped_to_the_user_group(mock_handler):
+
+    user_group_uid, investment_uid, tracker_uid = uuid4(), uuid4(), uuid4()
+
+    await investment_service.delete_invest_tracker(
+        user_group_uid=user_group_uid,
+        investment_uid=investment_uid,
+        tracker_uid=tracker_uid,
+    )
+
+    mock_handler.delete_investment_tracker.assert_awaited_once_with(
+        user_group_uid=user_group_uid, investment_uid=investment_uid, uid=tracker_uid
+    )
+
+    mock_handler.delete_investment_tracker.side_effect = DeleteError
+
+    with pytest.raises(HTTPException) as exc_info:
+        await investment_service.delete_invest_tracker(
+            user_group_uid=uuid4(),
+            investment_uid=investment_uid,
+            tracker_uid=tracker_uid,
+        )
+
+    assert exc_info.value.status_code == 404
+
+
+@patch.object(investment_service, "investment_handler", new_callable=AsyncMock)
+async def test_create_investment_tracker_404s_for_foreign_investment(mock_handler):
+
+    mock_handler.create_investment_tracker.side_effect = NotFoundError
+
+    with pytest.raises(HTTPException) as exc_info:
+        await investment_service.create_investment_tracker(
+            platform_uid=uuid4(),
+            user_group_uid=uuid4(),
+            investment_uid=uuid4(),
+            investment_tracker=schemas.InvestmentTracker(
+                amount=10, currency="Naira", transaction_type="CREDIT"
+            ),
+        )
+
+    assert exc_info.value.status_code == 404
+
+
+@patch.object(investment_service, "investment_handler", new_callable=AsyncMock)
+async def test_create_platform_rejects_a_name_the_group_uses(mock_handler):
+
+    mock_handler.create_platform_record.side_effect = CreateError
+
+    with pytest.raises(HTTPException) as exc_info:
+        await investment_service.create_platform(
+            user_group_uid=uuid4(),
+            platform=schemas.Platform(
+                platform_website="https://example.com",
+                name="PiggyVest",
+                platform_type="APP",
+            ),
+        )
+
+    assert exc_info.value.status_code == 400
+    assert (
+        mock_handler.create_platform_record.await_args.kwargs["platform"].name
+        == "piggyvest"
+    )
+
+
+@patch.object(investment_service, "investment_handler", new_callable=AsyncMock)
+async def test_renames_reject_a_name_already_in_use(mock_handler):
+
+    mock_handler.update_platform.side_effect = UpdateError
+    mock_handler.update_investment.side_effect = UpdateError
+
+    with pytest.raises(HTTPException) as exc_info:
+        await investment_service.update_platform(
+            user_group_uid=uuid4(),
+            platform_uid=uuid4(),
+            platform_update=schemas.PlatformUpdate(name="PiggyVest"),
+        )
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "platform already exists"
+
+    with pytest.raises(HTTPException) as exc_info:
+        await investment_service.update_investment(
+            platform_uid=uuid4(),
+            investment_uid=uuid4(),
+            user_group_uid=uuid4(),
+            investment_update=schemas.InvestmentUpdate(plan_name="Gold"),
+        )
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "plan already exists"
+
+
+@patch.object(investment_service, "investment_handler", new_callable=AsyncMock)
+async def test_renames_are_normalized_like_creates(mock_handler):
+
+    await investment_service.update_platform(
+        user_group_uid=uuid4(),
+        platform_uid=uuid4(),
+        platform_update=schemas.PlatformUpdate(name="PiggyVest"),
+    )
+    await investment_service.update_investment(
+        platform_uid=uuid4(),
+        investment_uid=uuid4(),
+        user_group_uid=uuid4(),
+        investment_update=schemas.InvestmentUpdate(plan_name="gold"),
+    )
+
+    platform_update = mock_handler.update_platform.await_args.kwargs["platform_update"]
+    investment_update = mock_handler.update_investment.await_args.kwargs[
+        "investment_update"
+    ]
+    assert platform_update.name == "piggyvest"
+    assert investment_update.plan_name == "Gold"
+
+    # Fields left out stay out of the UPDATE.
+    await investment_service.update_platform(
+        user_group_uid=uuid4(),
+        platform_uid=uuid4(),
+        platform_update=schemas.PlatformUpdate(platform_website="https://a.io"),
+    )
+
+    platform_update = mock_handler.update_platform.await_args.kwargs["platform_update"]
+    assert "name" not in platform_update.model_dump(exclude_none=True)
+
+
+@patch.object(investment_service, "investment_handler", new_callable=AsyncMock)
+async def test_create_investment_checks_the_owner_only_on_failure(mock_handler):
+
+    investment = schemas.Investment(
+        plan_name="gold",
+        return_on_investment=5,
+        end_date="2030-01-01",
+        nature="LOW_RISK",
+    )
+
+    await investment_service.create_investment(
+        platform_uid=uuid4(), user_group_uid=uuid4(), investment=investment
+    )
+
+    mock_handler.create_investment.assert_awaited_once()
+    mock_handler.check_platform_owner.assert_not_awaited()
+
+    mock_handler.create_investment.side_effect = CreateError
+
+    with pytest.raises(HTTPException) as exc_info:
+        await investment_service.create_investment(
+            platform_uid=uuid4(), user_group_uid=uuid4(), investment=investment
+        )
+
+    assert exc_info.value.status_code == 400
+
+    mock_handler.check_platform_owner.side_effect = NotFoundError
+
+    with pytest.raises(HTTPException) as exc_info:
+        await investment_service.create_investment(
+            platform_uid=uuid4(), user_group_uid=uuid4(), investment=investment
+        )
+
+    assert exc_info.value.status_code == 404
+
+
+@patch.object(investment_service, "investment_handler", new_callable=AsyncMock)
+async def test_get_investment_trackers_404s_outside_the_scope(mock_handler):
+
+    platform_uid, investment_uid, user_group_uid = uuid4(), uuid4(), uuid4()
+    mock_handler.get_investment_trackers.side_effect = NotFoundError
+
+    with pytest.raises(HTTPException) as exc_info:
+        await investment_service.get_investment_trackers(
+            platform_uid=platform_uid,
+            investment_uid=investment_uid,
+            user_group_uid=user_group_uid,
+        )
+
+    assert exc_info.value.status_code == 404
+    assert mock_handler.get_investment_trackers.await_args.kwargs["platform_uid"] == (
+        platform_uid
+    )
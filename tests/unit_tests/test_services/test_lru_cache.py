@@ -0,0 +1,34 @@
+from unittest.mock import patch
+
+from accountant.root.utils.lru_cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+
+    cache = LRUCache(maxsize=2, ttl=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_lru_cache_expires_entries():
+
+    cache = LRUCache(maxsize=2, ttl=60)
+
+    with patch("accountant.root.utils.lru_cache.time.monotonic", return_value=0):
+        cache.set("a", 1, ttl=10)
+        cache.set("b", 2, ttl=0)
+
+    with patch("accountant.root.utils.lru_cache.time.monotonic", return_value=11):
+        assert cache.get("a") is None
+        assert cache.get("b") is None
+
+    assert len(cache) == 0
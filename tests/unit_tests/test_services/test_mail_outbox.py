@@ -0,0 +1,74 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import aiosmtplib
+
+import accountant.services.service_utils.mail_outbox as mail_outbox
+
+TEMPLATE = "user_auth/token_email_template.html"
+
+
+def outbox_entry(entry_id: str, attempts: int = 0):
+    job = json.loads(
+        mail_outbox.mail_job(
+            subject="Forgot Password",
+            reciepients=["user@example.com"],
+            payload={"token": 123456},
+            template=TEMPLATE,
+        )
+    )
+    job["attempts"] = attempts
+    return entry_id, json.dumps(job)
+
+
+@patch.object(mail_outbox.redis_utils, "settle_mail_jobs", new_callable=AsyncMock)
+async def test_deliver_sends_batch_over_one_session(mock_settle):
+
+    mailer = AsyncMock()
+    worker = mail_outbox.MailOutboxWorker(consumer="test", mailer=mailer)
+
+    await worker.deliver([outbox_entry("1-0"), outbox_entry("2-0")])
+
+    assert mailer.send.await_count == 2
+    message = mailer.send.await_args.args[0]
+    assert message["To"] == "user@example.com"
+    assert "123456" in message.get_content()
+
+    mock_settle.assert_awaited_once_with(entry_ids=["1-0", "2-0"], retries={}, dead=[])
+
+
+@patch.object(mail_outbox.redis_utils, "settle_mail_jobs", new_callable=AsyncMock)
+async def test_deliver_backs_off_then_dead_letters(mock_settle):
+
+    mailer = AsyncMock()
+    mailer.send.side_effect = aiosmtplib.SMTPServerDisconnected("gone")
+    worker = mail_outbox.MailOutboxWorker(consumer="test", mailer=mailer)
+    last_attempt = mail_outbox.settings.mail_outbox_max_attempts - 1
+
+    await worker.deliver(
+        [outbox_entry("1-0", attempts=1), outbox_entry("2-0", attempts=last_attempt)]
+    )
+
+    settled = mock_settle.await_args.kwargs
+    assert settled["entry_ids"] == ["1-0", "2-0"]
+
+    [(retry_job, due_at)] = settled["retries"].items()
+    assert json.loads(retry_job)["attempts"] == 2
+    assert due_at > mail_outbox.time.time() + mail_outbox.retry_delay(2) - 5
+
+    [dead_job] = settled["dead"]
+    assert json.loads(dead_job)["attempts"] == last_attempt + 1
+
+
+@patch.object(mail_outbox.redis_utils, "settle_mail_jobs", new_callable=AsyncMock)
+async def test_deliver_dead_letters_malformed_jobs(mock_settle):
+
+    mailer = AsyncMock()
+    worker = mail_outbox.MailOutboxWorker(consumer="test", mailer=mailer)
+
+    await worker.deliver([("1-0", "not json")])
+
+    mailer.send.assert_not_awaited()
+    mock_settle.assert_awaited_once_with(
+        entry_ids=["1-0"], retries={}, dead=["not json"]
+    )
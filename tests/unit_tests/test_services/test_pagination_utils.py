@@ -0,0 +1,281 @@
+from collections import namedtuple
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import exists, select
+from sqlalchemy.dialects import postgresql
+
+import accountant.database.orms.user_orm  # noqa: F401
+from accountant.database.orms.earnings_orm import Earning
+from accountant.database.orms.user_orm import User
+from accountant.root.utils.abstract_schema import CountMode
+from accountant.services.service_utils import pagination_utils
+from accountant.services.service_utils.accountant_exceptions import NotFoundError
+from accountant.services.service_utils.pagination_utils import (
+    decode_cursor,
+    encode_cursor,
+    page_rows,
+)
+
+
+def test_cursor_round_trip():
+
+    date_created_utc, uid = datetime.utcnow(), uuid4()
+
+    cursor = encode_cursor(date_created_utc=date_created_utc, uid=uid)
+
+    assert decode_cursor(cursor=cursor) == (date_created_utc, uid)
+
+
+def test_decode_cursor_sad_path():
+
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor="not-a-cursor")
+
+
+def test_page_rows_sets_next_cursor_only_when_more_rows():
+
+    rows = [
+        SimpleNamespace(date_created_utc=datetime.utcnow(), uid=uuid4())
+        for _ in range(3)
+    ]
+
+    page, next_cursor = page_rows(rows=rows, limit=3, uid_field="uid")
+    assert page == rows
+    assert next_cursor is None
+
+    page, next_cursor = page_rows(rows=rows, limit=2, uid_field="uid")
+    assert page == rows[:2]
+    assert decode_cursor(cursor=next_cursor) == (
+        rows[1].date_created_utc,
+        rows[1].uid,
+    )
+
+
+PageRow = namedtuple("PageRow", ["earning", "result_size"])
+
+
+def compiled(stmt):
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+def earning_statements(user_uid):
+    return dict(
+        stmt=select(Earning).filter(Earning.user_uid == user_uid),
+        total_stmt=select(Earning.earning_uid).filter(Earning.user_uid == user_uid),
+        created_column=Earning.date_created_utc,
+        uid_column=Earning.earning_uid,
+    )
+
+
+def page_result(rows):
+    return MagicMock(
+        all=MagicMock(return_value=rows),
+        scalars=MagicMock(
+            return_value=MagicMock(all=MagicMock(return_value=[row[0] for row in rows]))
+        ),
+    )
+
+
+async def test_fetch_page_counts_in_the_page_query():
+
+    earning = SimpleNamespace(date_created_utc=datetime.utcnow(), earning_uid=uuid4())
+    session = AsyncMock()
+    session.execute.return_value = page_result([PageRow(earning, 7)])
+
+    rows, next_cursor, result_size = await pagination_utils.fetch_page(
+        session=session, **earning_statements(user_uid=uuid4())
+    )
+
+    assert rows == [earning]
+    assert next_cursor is None
+    assert result_size == 7
+
+    # One round trip: the count is a column of the page query.
+    session.execute.assert_awaited_once()
+    session.scalar.assert_not_awaited()
+    sql = str(compiled(session.execute.await_args.kwargs["statement"]))
+    assert "AS result_size" in sql
+    assert sql.rstrip().endswith("LIMIT %(param_1)s")
+
+
+async def test_fetch_page_past_the_end_still_counts():
+
+    session = AsyncMock()
+    session.execute.side_effect = [
+        page_result([]),
+        MagicMock(one=MagicMock(return_value=(True, 7))),
+    ]
+
+    rows, next_cursor, result_size = await pagination_utils.fetch_page(
+        session=session,
+        after=(datetime.utcnow(), uuid4()),
+        **earning_statements(user_uid=uuid4()),
+    )
+
+    assert (rows, next_cursor, result_size) == ([], None, 7)
+    assert session.execute.await_count == 2
+
+
+async def test_fetch_page_scope_filters_the_page_and_raises_when_it_fails():
+
+    owner_uid = uuid4()
+    scope = exists().where(User.user_uid == owner_uid)
+    session = AsyncMock()
+    session.execute.side_effect = [
+        page_result([]),
+        MagicMock(one=MagicMock(return_value=(False, 0))),
+    ]
+
+    with pytest.raises(NotFoundError):
+        await pagination_utils.fetch_page(
+            session=session, scope=scope, **earning_statements(user_uid=uuid4())
+        )
+
+    page, check = [
+        str(compiled(call.kwargs["statement"]))
+        for call in session.execute.await_args_list
+    ]
+    assert "EXISTS (SELECT * \nFROM users" in page
+    assert check.startswith("SELECT EXISTS")
+
+
+@patch.object(pagination_utils.redis_utils, "set_list_count", new_callable=AsyncMock)
+@patch.object(pagination_utils.redis_utils, "get_list_count", new_callable=AsyncMock)
+async def test_fetch_page_cached_count(mock_get, mock_set):
+
+    earning = SimpleNamespace(date_created_utc=datetime.utcnow(), earning_uid=uuid4())
+    session = AsyncMock()
+    session.execute.return_value = page_result([PageRow(earning, None)])
+
+    # Hit: served from Redis, the page query carries no count.
+    mock_get.return_value = 12
+
+    _, _, result_size = await pagination_utils.fetch_page(
+        session=session,
+        count_mode=CountMode.cached,
+        count_key="earnings-x",
+        **earning_statements(user_uid=uuid4()),
+    )
+
+    assert result_size == 12
+    assert "result_size" not in str(
+        compiled(session.execute.await_args.kwargs["statement"])
+    )
+    mock_set.assert_not_awaited()
+
+    # Miss: counted alongside the page, then stored.
+    mock_get.return_value = None
+    session.execute.return_value = page_result([PageRow(earning, 3)])
+
+    _, _, result_size = await pagination_utils.fetch_page(
+        session=session,
+        count_mode=CountMode.cached,
+        count_key="earnings-x",
+        **earning_statements(user_uid=uuid4()),
+    )
+
+    assert result_size == 3
+    mock_set.assert_awaited_once_with(key="earnings-x", count=3)
+
+
+async def test_estimate_count_explains_with_bound_parameters():
+
+    user_uid = uuid4()
+    session = AsyncMock()
+    session.execute.return_value = MagicMock(
+        scalar=MagicMock(return_value='[{"Plan": {"Plan Rows": 42}}]')
+    )
+
+    total_stmt = earning_statements(user_uid=user_uid)["total_stmt"]
+
+    assert await pagination_utils.estimate_count(session, total_stmt) == 42
+
+    explain = compiled(session.execute.await_args.kwargs["statement"])
+    assert str(explain).startswith("EXPLAIN (FORMAT JSON) SELECT earnings.earning_uid")
+    assert str(user_uid) not in str(explain)
+    assert list(explain.params.values()) == [user_uid]
+
+
+@patch.object(
+    pagination_utils.redis_utils, "delete_list_counts", new_callable=AsyncMock
+)
+async def test_forget_counts_waits_for_commit(mock_delete):
+
+    with patch.object(pagination_utils, "after_commit", new_callable=AsyncMock) as hook:
+        await pagination_utils.forget_counts("earnings-a", "earnings-b")
+
+    (callback,), _ = hook.await_args
+    mock_delete.assert_not_awaited()
+
+    await callback()
+    mock_delete.assert_awaited_once_with(keys=("earnings-a", "earnings-b"))
+
+
+async def test_deletes_and_creates_drop_cached_counts():
+
+    from accountant.database.handlers import earning_handler, will_handler
+
+    user_uid = uuid4()
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+    earning = dict(
+        earning_uid=uuid4(),
+        user_uid=user_uid,
+        amount=1,
+        currency="Naira",
+        year=2024,
+        month="May",
+        pay_date=datetime.utcnow().date(),
+        date_created_utc=datetime.utcnow(),
+    )
+    session.execute.return_value = MagicMock(
+        scalar_one_or_none=MagicMock(
+            return_value=SimpleNamespace(**earning, as_dict=lambda: earning)
+        )
+    )
+
+    with (
+        patch.object(earning_handler, "async_session", return_value=session),
+        patch.object(earning_handler, "apply_rollup_deltas", new_callable=AsyncMock),
+        patch.object(
+            earning_handler, "forget_counts", new_callable=AsyncMock
+        ) as forget,
+    ):
+        await earning_handler.delete_earning(user_uid=user_uid, earning_uid=uuid4())
+
+    forget.assert_awaited_once_with(f"earnings-{user_uid}")
+
+    will = SimpleNamespace(owner_uid=uuid4(), assigned_uid=uuid4())
+
+    with patch.object(will_handler, "forget_counts", new_callable=AsyncMock) as forget:
+        await will_handler.forget_will_counts(will=will)
+
+    # get_wills lists by owner or by assignee, never both.
+    forget.assert_awaited_once_with(
+        will_handler.wills_count_key(owner_uid=will.owner_uid),
+        will_handler.wills_count_key(assigned_uid=will.assigned_uid),
+    )
+
+
+async def test_an_empty_page_keeps_the_total():
+
+    from accountant.database.handlers import earning_handler
+
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+
+    with (
+        patch.object(earning_handler, "async_session", return_value=session),
+        patch.object(
+            earning_handler, "fetch_page", AsyncMock(return_value=([], None, 7))
+        ),
+    ):
+        page = await earning_handler.get_earnings(user_uid=uuid4())
+
+    assert page.result_set == []
+    assert page.result_size == 7
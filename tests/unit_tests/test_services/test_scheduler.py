@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import accountant.root.scheduler as scheduler
+from accountant.root.utils.cron import CronSchedule
+
+
+@pytest.mark.parametrize(
+    "expression, moment, expected",
+    [
+        ("*/15 * * * *", datetime(2026, 1, 1, 10, 7, 30), datetime(2026, 1, 1, 10, 15)),
+        ("0 9 1 * *", datetime(2026, 1, 1, 9, 0), datetime(2026, 2, 1, 9, 0)),
+        ("0 10 * * 1", datetime(2026, 10, 18, 12, 0), datetime(2026, 10, 19, 10, 0)),
+        ("30 23 31 12 *", datetime(2026, 6, 1), datetime(2026, 12, 31, 23, 30)),
+        ("0 0 29 2 *", datetime(2026, 3, 1), datetime(2028, 2, 29, 0, 0)),
+        # Day of month and weekday both restricted: either one fires.
+        ("0 0 13 * 5", datetime(2026, 10, 1), datetime(2026, 10, 2, 0, 0)),
+    ],
+)
+def test_cron_next_after(expression, moment, expected):
+
+    assert CronSchedule(expression).next_after(moment) == expected
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "0 0 31 2 *"])
+def test_cron_rejects_bad_expressions(expression):
+
+    with pytest.raises(ValueError):
+        CronSchedule(expression).next_after(datetime(2026, 1, 1))
+
+
+async def test_execute_enforces_timeout():
+
+    async def slow_job():
+        await asyncio.sleep(1)
+
+    job = scheduler.ScheduledJob(
+        name="slow", cron="* * * * *", func=slow_job, timeout=0.01
+    )
+
+    assert await scheduler.SCHEDULER.execute(job) == "timed_out"
+
+
+@patch.object(scheduler.scheduler_handler, "run_job_tick", new_callable=AsyncMock)
+async def test_run_job_skips_when_another_node_has_the_tick(mock_run_job_tick):
+
+    func = AsyncMock()
+    job = scheduler.ScheduledJob(
+        name="sweep", cron="* * * * *", func=func, timeout=1, jitter=0
+    )
+    mock_run_job_tick.return_value = None
+
+    await scheduler.SCHEDULER.run_job(job=job, tick=datetime(2026, 1, 1))
+
+    mock_run_job_tick.assert_awaited_once()
+    assert mock_run_job_tick.await_args.kwargs["job_name"] == "sweep"
+    func.assert_not_awaited()
+
+
+def lock_connection(locked):
+    connection = AsyncMock()
+    connection.__aenter__.return_value = connection
+    connection.scalar.return_value = locked
+    return MagicMock(connect=MagicMock(return_value=connection))
+
+
+@patch.object(scheduler.scheduler_handler, "finish_job_tick", new_callable=AsyncMock)
+@patch.object(scheduler.scheduler_handler, "claim_job_tick", new_callable=AsyncMock)
+async def test_run_job_tick_runs_under_the_advisory_lock(mock_claim, mock_finish):
+
+    tick = datetime(2026, 1, 1)
+    calls = []
+    mock_claim.side_effect = lambda **kwargs: calls.append("claim") or True
+    mock_finish.side_effect = lambda **kwargs: calls.append("finish")
+
+    async def run():
+        calls.append("run")
+        return "succeeded"
+
+    lock_engine = lock_connection(locked=True)
+
+    with patch.object(scheduler.scheduler_handler, "lock_engine", lock_engine):
+        status = await scheduler.scheduler_handler.run_job_tick(
+            job_name="sweep", tick=tick, run=run
+        )
+
+    connection = lock_engine.connect.return_value
+    lock = connection.scalar.await_args.args[0].compile()
+
+    assert status == "succeeded"
+    assert calls == ["claim", "run", "finish"]
+    assert "pg_try_advisory_lock(" in str(lock)
+    assert list(lock.params.values()) == [
+        scheduler.scheduler_handler.job_lock_key("sweep")
+    ]
+    # Released with the connection, which NullPool closes.
+    connection.__aexit__.assert_awaited_once()
+    mock_finish.assert_awaited_once_with(
+        job_name="sweep", tick=tick, status="succeeded"
+    )
+
+
+@patch.object(scheduler.scheduler_handler, "claim_job_tick", new_callable=AsyncMock)
+async def test_run_job_tick_skips_without_the_lock_or_the_tick(mock_claim):
+
+    run = AsyncMock()
+
+    with patch.object(
+        scheduler.scheduler_handler, "lock_engine", lock_connection(locked=False)
+    ):
+        assert (
+            await scheduler.scheduler_handler.run_job_tick(
+                job_name="sweep", tick=datetime(2026, 1, 1), run=run
+            )
+            is None
+        )
+
+    mock_claim.assert_not_awaited()
+
+    mock_claim.return_value = False
+
+    with patch.object(
+        scheduler.scheduler_handler, "lock_engine", lock_connection(locked=True)
+    ):
+        assert (
+            await scheduler.scheduler_handler.run_job_tick(
+                job_name="sweep", tick=datetime(2026, 1, 1), run=run
+            )
+            is None
+        )
+
+    run.assert_not_awaited()